@@ -21,7 +21,12 @@ from __future__ import division
 
 from sympy import *
 
+from .cache import *
+from .numeric import *
 from .rv import *
+from .lazy import *
+from .frozen import *
+from .sampling import *
 from .stoch import *
 from .appl_plot import *
 from .dist_type import *
@@ -58,12 +63,15 @@ def Menu():
 
     print 'RV Class Procedures'
     print 'X.variate(n,x),X.verifyPDF()'
+    print 'X.freeze() -> pdf,cdf,sf,ppf,rvs,logpdf,mean,var'
+    print 'X.evaluate(kind,values,**parameters)'
     print ""
 
     print 'Functional Form Conversion'
     print 'CDF(X,{x}),CHF(X,{x}),HF(X,{x}),IDF(X,{x})'
     print 'PDF(X,{x}),SF(X,{x}),BootstrapRV([data])'
     print 'Convert(X,{x})'
+    print 'DiscreteArrayRV([probs],[support],{exact})'
     print ""    
 
     print 'Procedures on One Random Variable'
@@ -77,6 +85,8 @@ def Menu():
     print 'Procedures on Two Random Variables'
     print 'Convolution(X,Y),Maximum(X,Y),Minimum(X,Y)'
     print 'Mixture([p1,p2],[X,Y]),Product(X,Y)'
+    print 'Lazy(X),SetLazyMode({enabled})'
+    print 'RegisterRule(operation,class1,class2,rule)'
     print ""
 
     print 'Statistics Procedures'
@@ -87,6 +97,13 @@ def Menu():
     print 'Utilities'
     print 'PlotDist(X,{[x1,x2]}),PlotDisplay([plotlist],{[x1,x2]})'
     print 'PPPlot(X,[sample]),QQPlot(X,[sample])'
+    print 'CacheInfo(),ClearCache(),SetCacheSize(n)'
+    print 'EnableDiskCache({file},{n}),DisableDiskCache()'
+    print 'DiskCacheInfo(),ClearDiskCache()'
+    print 'RandomStream({seed}),SetSeed(seed)'
+    print 'ParallelVariates(X,n,workers)'
+    print 'SetIntegrationMode(mode,{timeout},{abstol},{reltol})'
+    print 'with budget(seconds,{fallback}): ...'
     print ""
 
     print 'Continuous Distributions'
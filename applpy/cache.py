@@ -0,0 +1,457 @@
+"""
+Cache Module
+
+Defines the process-wide caches used by APPLPy procedures to avoid
+    repeating expensive symbolic computations, and an optional on-disk
+    cache of sympy integrate, solve and simplify results that persists
+    between sessions
+
+Classes:
+    1. LRUCache(maxsize)
+    2. PersistentCache(filename,maxsize)
+
+Procedures:
+    1. CacheInfo()
+    2. ClearCache()
+    3. ClearDiskCache()
+    4. DisableDiskCache()
+    5. DiskCacheInfo()
+    6. EnableDiskCache(filename,maxsize)
+    7. SetCacheSize(maxsize)
+"""
+
+from __future__ import division
+from collections import OrderedDict
+from functools import wraps
+from sympy import Basic, srepr
+import os
+import pickle
+import sqlite3
+import time
+
+"""
+    A Probability Progamming Language (APPL) -- Python Edition
+    Copyright (C) 2001,2002,2008,2010,2014 Andrew Glen, Larry
+    Leemis, Diane Evans, Matthew Robinson
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>
+"""
+
+class LRUCache:
+    """
+    LRUCache Class
+    Defines a bounded dictionary that discards the least recently
+        used entry once it holds maxsize entries
+    """
+    def __init__(self,maxsize=256):
+        """
+        Procedure Name: __init__
+        Purpose: Creates an empty cache
+        Arguments:  1. maxsize: the maximum number of entries
+        Output:     1. An empty cache
+        """
+        self.maxsize=maxsize
+        self.data=OrderedDict()
+        self.hits=0
+        self.misses=0
+
+    def __contains__(self,key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def clear(self):
+        """
+        Procedure Name: clear
+        Purpose: Removes every entry and resets the hit/miss counters
+        Arguments:  1. None
+        Output:     1. None
+        """
+        self.data.clear()
+        self.hits=0
+        self.misses=0
+
+    def get(self,key,default=None):
+        """
+        Procedure Name: get
+        Purpose: Retrieves an entry and marks it as the most recently
+                    used entry
+        Arguments:  1. key: the key of the entry
+                    2. default: the value returned if the key is absent
+        Output:     1. The cached value, or default
+        """
+        try:
+            value=self.data.pop(key)
+        except KeyError:
+            self.misses+=1
+            return default
+        self.data[key]=value
+        self.hits+=1
+        return value
+
+    def info(self):
+        """
+        Procedure Name: info
+        Purpose: Reports the usage statistics of the cache
+        Arguments:  1. None
+        Output:     1. A dictionary with the hits, misses, current size
+                        and maximum size of the cache
+        """
+        return {'hits':self.hits,'misses':self.misses,
+                'size':len(self.data),'maxsize':self.maxsize}
+
+    def put(self,key,value):
+        """
+        Procedure Name: put
+        Purpose: Stores an entry, evicting the least recently used
+                    entries if the cache is full
+        Arguments:  1. key: the key of the entry
+                    2. value: the value to store
+        Output:     1. None
+        """
+        if self.maxsize<=0:
+            return
+        if key in self.data:
+            self.data.pop(key)
+        self.data[key]=value
+        while len(self.data)>self.maxsize:
+            self.data.popitem(last=False)
+
+    def resize(self,maxsize):
+        """
+        Procedure Name: resize
+        Purpose: Changes the maximum size of the cache, evicting the
+                    least recently used entries if necessary
+        Arguments:  1. maxsize: the new maximum number of entries
+        Output:     1. None
+        """
+        self.maxsize=maxsize
+        while len(self.data)>max(maxsize,0):
+            self.data.popitem(last=False)
+
+class PersistentCache:
+    """
+    PersistentCache Class
+    Defines a bounded cache stored in a SQLite file, which discards the
+        least recently accessed entries once it holds maxsize entries.
+        The access times of hits are kept in memory and written to the
+        file in batches, so that a hit does not commit a transaction.
+    """
+    def __init__(self,filename,maxsize=10000):
+        """
+        Procedure Name: __init__
+        Purpose: Opens (or creates) the cache file
+        Arguments:  1. filename: the path of the SQLite file
+                    2. maxsize: the maximum number of entries
+        Output:     1. A cache backed by the file
+        """
+        self.filename=filename
+        self.maxsize=maxsize
+        self.hits=0
+        self.misses=0
+        self.pid=None
+        self.connection=None
+        # Access times of hits that have not been written to the file
+        self.accessed={}
+        self.flush_size=100
+        # A running count of the entries, so that storing an entry does
+        #   not count the table
+        self.size=0
+        self.connect()
+
+    def connect(self):
+        """
+        Procedure Name: connect
+        Purpose: Returns a connection to the cache file. SQLite
+                    connections cannot be shared with forked processes,
+                    so each process opens its own.
+        Arguments:  1. None
+        Output:     1. A SQLite connection
+        """
+        if self.connection==None or self.pid!=os.getpid():
+            self.connection=sqlite3.connect(self.filename)
+            self.pid=os.getpid()
+            self.accessed={}
+            self.connection.execute('CREATE TABLE IF NOT EXISTS entries '
+                                    '(key TEXT PRIMARY KEY, value BLOB, '
+                                    'accessed REAL)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS '
+                                    'entries_accessed ON entries (accessed)')
+            self.connection.commit()
+            self.size=len(self)
+        return self.connection
+
+    def __len__(self):
+        connection=self.connect()
+        row=connection.execute('SELECT COUNT(*) FROM entries').fetchone()
+        return row[0]
+
+    def clear(self):
+        """
+        Procedure Name: clear
+        Purpose: Removes every entry and resets the hit/miss counters
+        Arguments:  1. None
+        Output:     1. None
+        """
+        connection=self.connect()
+        connection.execute('DELETE FROM entries')
+        connection.commit()
+        self.size=0
+        self.accessed={}
+        self.hits=0
+        self.misses=0
+
+    def close(self):
+        """
+        Procedure Name: close
+        Purpose: Closes the connection to the cache file
+        Arguments:  1. None
+        Output:     1. None
+        """
+        if self.connection!=None and self.pid==os.getpid():
+            self.flush()
+            self.connection.close()
+        self.connection=None
+
+    def flush(self):
+        """
+        Procedure Name: flush
+        Purpose: Writes the access times of recent hits to the file
+        Arguments:  1. None
+        Output:     1. None
+        """
+        if len(self.accessed)==0:
+            return
+        connection=self.connect()
+        connection.executemany('UPDATE entries SET accessed=? WHERE key=?',
+                               [(accessed,key) for key,accessed
+                                in self.accessed.items()])
+        connection.commit()
+        self.accessed={}
+
+    def get(self,key,default=None):
+        """
+        Procedure Name: get
+        Purpose: Retrieves an entry and records the time it was accessed.
+                    The access times are written to the file in batches
+                    (see flush).
+        Arguments:  1. key: the key of the entry (a string)
+                    2. default: the value returned if the key is absent
+        Output:     1. The cached value, or default
+        """
+        connection=self.connect()
+        row=connection.execute('SELECT value FROM entries WHERE key=?',
+                               (key,)).fetchone()
+        if row==None:
+            self.misses+=1
+            return default
+        try:
+            value=pickle.loads(bytes(row[0]))
+        except Exception:
+            # Entries written by an incompatible version are discarded
+            connection.execute('DELETE FROM entries WHERE key=?',(key,))
+            connection.commit()
+            self.size-=1
+            self.misses+=1
+            return default
+        self.accessed[key]=time.time()
+        if len(self.accessed)>=self.flush_size:
+            self.flush()
+        self.hits+=1
+        return value
+
+    def info(self):
+        """
+        Procedure Name: info
+        Purpose: Reports the usage statistics of the cache
+        Arguments:  1. None
+        Output:     1. A dictionary with the hits, misses, current size,
+                        maximum size and file name of the cache
+        """
+        return {'hits':self.hits,'misses':self.misses,'size':len(self),
+                'maxsize':self.maxsize,'filename':self.filename}
+
+    def put(self,key,value):
+        """
+        Procedure Name: put
+        Purpose: Stores an entry, evicting the least recently accessed
+                    entries if the cache is full
+        Arguments:  1. key: the key of the entry (a string)
+                    2. value: a picklable value to store
+        Output:     1. None
+        """
+        if self.maxsize<=0:
+            return
+        try:
+            blob=sqlite3.Binary(pickle.dumps(value,2))
+        except Exception:
+            return
+        # Record the recent hits first, so that they are not evicted
+        self.flush()
+        connection=self.connect()
+        stored=connection.execute('SELECT 1 FROM entries WHERE key=?',
+                                  (key,)).fetchone()
+        connection.execute('INSERT OR REPLACE INTO entries VALUES (?,?,?)',
+                           (key,blob,time.time()))
+        if stored==None:
+            self.size+=1
+        # Other processes sharing the file may have changed it, so the
+        #   table is counted again before entries are evicted
+        if self.size>self.maxsize:
+            self.size=len(self)
+            excess=self.size-self.maxsize
+            if excess>0:
+                connection.execute('DELETE FROM entries WHERE key IN '
+                                   '(SELECT key FROM entries ORDER BY '
+                                   'accessed LIMIT ?)',(excess,))
+                self.size-=excess
+        connection.commit()
+
+# The process-wide cache shared by the APPLPy procedures
+procedure_cache=LRUCache(256)
+
+# The on-disk cache of symbolic results, None unless enabled
+disk_cache=None
+
+def disk_cached(procedure):
+    # Not intended for use by end user
+    """
+    Procedure Name: disk_cached
+    Purpose: Wraps a sympy procedure (integrate, solve, simplify) so that
+                its results are looked up in the on-disk cache, when the
+                cache is enabled. Keys are the srepr of the arguments.
+                Numbers and symbols are passed straight through, since
+                they are cheaper to compute than to look up.
+    Arguments:  1. procedure: The sympy procedure
+    Output:     1. The wrapped procedure
+    """
+    @wraps(procedure)
+    def cached(*args,**kwargs):
+        if disk_cache==None or len(args)==0:
+            return procedure(*args,**kwargs)
+        if not isinstance(args[0],Basic) or args[0].is_Atom:
+            return procedure(*args,**kwargs)
+        try:
+            key=srepr((procedure.__name__,args,sorted(kwargs.items())))
+        except Exception:
+            return procedure(*args,**kwargs)
+        missing=object()
+        result=disk_cache.get(key,missing)
+        if result is missing:
+            result=procedure(*args,**kwargs)
+            disk_cache.put(key,result)
+        return result
+    return cached
+
+def structure_key(RVar,tag):
+    # Not intended for use by end user
+    """
+    Procedure Name: structure_key
+    Purpose: Builds a cache key from the structure of a random
+                variable, so that two random variables with the same
+                functions, support and type share cache entries
+    Arguments:  1. RVar: A random variable
+                2. tag: A label identifying the cached computation
+    Output:     1. A hashable key, or None if the random variable
+                    cannot be hashed
+    """
+    try:
+        key=(tag,tuple(RVar.func),tuple(RVar.support),tuple(RVar.ftype))
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+def CacheInfo():
+    """
+    Procedure Name: CacheInfo
+    Purpose: Reports the usage statistics of the process-wide cache
+    Arguments:  1. None
+    Output:     1. A dictionary with the hits, misses, current size
+                    and maximum size of the cache
+    """
+    return procedure_cache.info()
+
+def ClearCache():
+    """
+    Procedure Name: ClearCache
+    Purpose: Empties the process-wide cache
+    Arguments:  1. None
+    Output:     1. None
+    """
+    procedure_cache.clear()
+
+def ClearDiskCache():
+    """
+    Procedure Name: ClearDiskCache
+    Purpose: Empties the on-disk cache, if it is enabled
+    Arguments:  1. None
+    Output:     1. None
+    """
+    if disk_cache!=None:
+        disk_cache.clear()
+
+def DisableDiskCache():
+    """
+    Procedure Name: DisableDiskCache
+    Purpose: Stops using the on-disk cache. The cache file is kept.
+    Arguments:  1. None
+    Output:     1. None
+    """
+    global disk_cache
+    if disk_cache!=None:
+        disk_cache.close()
+    disk_cache=None
+
+def DiskCacheInfo():
+    """
+    Procedure Name: DiskCacheInfo
+    Purpose: Reports the usage statistics of the on-disk cache
+    Arguments:  1. None
+    Output:     1. A dictionary with the hits, misses, current size,
+                    maximum size and file name of the cache, or None if
+                    the cache is not enabled
+    """
+    if disk_cache==None:
+        return None
+    return disk_cache.info()
+
+def EnableDiskCache(filename='applpy_cache.db',maxsize=10000):
+    """
+    Procedure Name: EnableDiskCache
+    Purpose: Stores the results of the symbolic integrate, solve and
+                simplify calls made by APPLPy procedures in a SQLite
+                file, so they are reused by later sessions
+    Arguments:  1. filename: The path of the cache file
+                2. maxsize: The maximum number of entries in the file
+    Output:     1. None
+    """
+    global disk_cache
+    if maxsize<0:
+        raise ValueError('the cache size must be non-negative')
+    DisableDiskCache()
+    disk_cache=PersistentCache(filename,maxsize)
+
+def SetCacheSize(maxsize):
+    """
+    Procedure Name: SetCacheSize
+    Purpose: Sets the maximum number of entries held in the
+                process-wide cache
+    Arguments:  1. maxsize: A non-negative integer (0 disables caching)
+    Output:     1. None
+    """
+    if maxsize<0:
+        raise ValueError('the cache size must be non-negative')
+    procedure_cache.resize(maxsize)
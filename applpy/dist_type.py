@@ -22,16 +22,29 @@ Continuous Distributions:
 
 Discrete Distributions
     BenfordRV(),BinomialRV(n,p),GeometricRV(p),PoissonRV(theta)
+
+Distributions with known closed forms declare them with a static
+    properties(*parameter) method (and numpy implementations of the
+    cdf, sf and idf with numeric_properties), which Mean, Variance,
+    Skewness, Kurtosis, MGF, CDF, SF, IDF and compile use first
 """
 
 from __future__ import division
 from sympy import (Symbol, symbols, oo, integrate, summation, diff,
                    exp, pi, sqrt, factorial, ln, floor, simplify,
                    solve, nan, Add, Mul, Integer, function,
-                   binomial,gamma,cos,cot,Rational,atan,log)
+                   binomial,gamma,cos,cot,Rational,atan,log,erf,erfc,
+                   erfinv,lowergamma,uppergamma,Dummy,Basic,sympify)
 from random import random
+import numpy as np
+try:
+    from scipy import special
+except ImportError:
+    special=None
 from .rv import (RV, RVError, CDF, CHF, HF, IDF, IDF, PDF, SF,
-                 BootstrapRV, Convert)
+                 BootstrapRV, Convert, ParallelVariates, RegisterRule)
+from .cache import procedure_cache
+from .sampling import get_stream
 from .bivariate import (BivariateRV)
 x,y,z,t,v=symbols('x y z t v')
 
@@ -55,17 +68,113 @@ x,y,z,t,v=symbols('x y z t v')
 """
 
 def param_check(param):
+    # Not intended for use by end user
+    """
+    Procedure Name: param_check
+    Purpose: Checks that every parameter of a distribution has been
+                given a numerical value
+    Arguments:  1. param: A list of parameters
+    Output:     1. True if no parameter contains a symbol
+                2. False otherwise
+    """
     flag=True
-    count=0
     for element in param:
-        try:
-            if element.__class__.name=='Symbol':
-                flag=False
-        except:
-            if type(element)=='Symbol':
-                flag=False
+        if len(getattr(element,'free_symbols',[]))>0:
+            flag=False
     return flag
 
+# The templates of the distributions, built once per class with
+#   placeholder parameters (see family_template)
+family_templates={}
+
+def family_template(cls,param,build):
+    # Not intended for use by end user
+    """
+    Procedure Name: family_template
+    Purpose: Creates the functions, support and type of a distribution by
+                substituting its parameters into a template. The template
+                is built once per class with placeholder parameters, so
+                new instances do not rebuild the expressions or a
+                throwaway random variable.
+    Arguments:  1. cls: The class of the distribution
+                2. param: The list of parameters
+                3. build: A function of the parameters that returns the
+                    random variable of the distribution
+    Output:     1. The list of functions
+                2. The support
+                3. The type of the random variable
+    """
+    name=cls.__name__
+    if name not in family_templates:
+        placeholders=[Dummy('param%d'%i) for i in range(len(param))]
+        family_templates[name]=(placeholders,build(*placeholders))
+    placeholders,template=family_templates[name]
+    values=dict(zip(placeholders,[sympify(value) for value in param]))
+    # Support values that are parameters keep the type they were given
+    originals=dict(zip(placeholders,param))
+    def substitute(element):
+        if isinstance(element,Dummy) and element in originals:
+            return originals[element]
+        if isinstance(element,Basic):
+            return element.xreplace(values)
+        return element
+    func=[substitute(element) for element in template.func]
+    support=[substitute(element) for element in template.support]
+    return func,support,list(template.ftype)
+
+def family_variate(RVar,n,s,method,stream,workers,sort,generator):
+    # Not intended for use by end user
+    """
+    Procedure Name: family_variate
+    Purpose: Generates variates from a named distribution with a
+                vectorized numpy generator. Percentiles and the inverse
+                method are handled by the compiled idf of the random
+                variable (see RV.variate).
+    Arguments:  1. RVar: A random variable from a named distribution
+                2. n: The number of variates
+                3. s: The percentile of the variates (default is random)
+                4. method: 'special' or 'inverse'
+                5. stream: The random stream or seed to draw from
+                    (default is the default stream)
+                6. workers: The number of worker processes (default is
+                    to generate the variates in this process)
+                7. sort: A binary variable. If True, the variates are
+                    sorted
+                8. generator: A function of a numpy RandomState, the number
+                    of variates and the (numerical) parameters of the
+                    distribution that returns an array of variates
+    Output:     1. A numpy array of n random variates
+    """
+    # If no parameter is specified, return an error
+    if param_check(RVar.parameter)==False:
+        raise RVError('Not all parameters specified')
+
+    # Check to see if the user specified a valid method
+    method_list=['special','inverse']
+    if method not in method_list:
+        error_string='an invalid method was specified'
+        raise RVError(error_string)
+
+    # Split large draws across a pool of worker processes
+    if workers!=None and workers>1:
+        return ParallelVariates(RVar,n,workers,stream,sort=sort,s=s,
+                                method=method)
+
+    # If the inverse method or a percentile is specified, compute variates
+    #   using the compiled functional forms of the random variable
+    if method=='inverse':
+        return RV.variate(RVar,n=n,s=s,method='inverse',stream=stream,
+                          sort=sort)
+    if s!=None:
+        return RV.variate(RVar,n=n,s=s,stream=stream,sort=sort)
+
+    params=[float(param) for param in RVar.parameter]
+    rng=get_stream(stream).generator
+    varlist=np.asarray(generator(rng,n,*params),dtype=float)
+    if sort==True:
+        varlist.sort()
+    return varlist
+
 """
 Continuous Distributions
 
@@ -80,12 +189,19 @@ class ArcSinRV(RV):
     """
     def __init__(self):
         # x = Symbol('x', postive=True)
-        X_dummy=RV(1/(pi*sqrt(x*(1-x))),[0,1])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            ArcSinRV,self.parameter,lambda:
+            RV(1/(pi*sqrt(x*(1-x))),[0,1]))
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate arc sin variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n: rng.beta(0.5,0.5,n))
+
 class ArcTanRV(RV):
     """
     Procedure Name: ArcTanRV
@@ -103,13 +219,24 @@ class ArcTanRV(RV):
         if alpha <= 0:
             err_string='Alpha must be positive'
             raise RVError(err_string)
-        X_dummy=RV(alpha/((atan(alpha*phi)+pi/2)*(1+alpha**2*(x-phi)**2)),
-                   [0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[alpha,phi]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            ArcTanRV,self.parameter,lambda alpha,phi:
+            RV(alpha/((atan(alpha*phi)+pi/2)*(1+alpha**2*(x-phi)**2)),
+               [0,oo]))
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate arc tan variates by inverting the cdf with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,alpha,phi:
+                                  phi+np.tan(rng.random_sample(n)*
+                                             (np.arctan(alpha*phi)+
+                                              np.pi/2)-
+                                             np.arctan(alpha*phi))/alpha)
+
 class BetaRV(RV):
     """
     Procedure Name: BetaRV
@@ -129,13 +256,43 @@ class BetaRV(RV):
                 if beta<=0 and beta.__class__.name__!='Symbol':
                     err_string='Both parameters must be positive'
                     raise RVError(err_string)
-        X_dummy=RV((gamma(alpha+beta)*(x**(alpha-1))*(1-x)**(beta-1))/
-               (gamma(alpha)*gamma(beta)),[0,1])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[alpha,beta]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            BetaRV,self.parameter,lambda alpha,beta:
+            RV((gamma(alpha+beta)*(x**(alpha-1))*(1-x)**(beta-1))/
+           (gamma(alpha)*gamma(beta)),[0,1]))
         self.cache={}
 
+    @staticmethod
+    def properties(alpha,beta):
+        # Closed forms of the moments of the beta distribution
+        total=alpha+beta
+        return {'mean':alpha/total,
+                'variance':alpha*beta/(total**2*(total+1)),
+                'skewness':2*(beta-alpha)*sqrt(total+1)/
+                           ((total+2)*sqrt(alpha*beta)),
+                'kurtosis':3+6*((alpha-beta)**2*(total+1)-
+                                alpha*beta*(total+2))/
+                           (alpha*beta*(total+2)*(total+3))}
+
+    @staticmethod
+    def numeric_properties(alpha,beta):
+        # The cdf, sf and idf of the beta distribution from scipy
+        if special==None:
+            return {}
+        return {'cdf':lambda values:
+                    special.betainc(alpha,beta,np.clip(values,0,1)),
+                'sf':lambda values:
+                    special.betainc(beta,alpha,np.clip(1-values,0,1)),
+                'idf':lambda values: special.betaincinv(alpha,beta,values)}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate beta variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,alpha,beta: rng.beta(alpha,beta,n))
+
 class CauchyRV(RV):
     """
     Procedure Name: CauchyRV
@@ -154,43 +311,19 @@ class CauchyRV(RV):
             if alpha<=0:
                 err_string='alpha must be positive'
                 raise RVError(err_string)
-        X_dummy=RV((1)/(alpha*pi*(1+((x-a)**2/alpha**2))),[-oo,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
         self.parameter=[a,alpha]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            CauchyRV,self.parameter,lambda a,alpha:
+            RV((1)/(alpha*pi*(1+((x-a)**2/alpha**2))),[-oo,oo]))
         self.cache={}
 
-    def variate(self,n=1,s=None,method='special'):        
-        # If no parameter is specified, return an error
-        if param_check(self.parameter)==False:
-            raise RVError('Not all parameters specified')
-
-        # Check to see if the user specified a valid method
-        method_list=['special','inverse']
-        if method not in method_list:
-            error_string='an invalid method was specified'
-            raise RVError(error_string)
-
-        # If the inverse method is specified, compute variates using
-        #   the IDF function
-        if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
-            return varlist
-
-        # Generate cauchy variates
-        idf_func=self.parameter[0]-cot(pi*t)*self.parameter[1]
-        varlist=[]
-        for i in range(n):
-            if s==None:
-                val=random()
-            else:
-                val=s
-            var=idf_func.subs(t,val).evalf()
-            varlist.append(var)
-        varlist.sort()
-        return varlist
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate cauchy variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,a,alpha:
+                                  a+alpha*rng.standard_cauchy(n))
 
 class ChiRV(RV):
     """
@@ -211,8 +344,15 @@ class ChiRV(RV):
         self.func=X_dummy.func
         self.support=X_dummy.support
         self.ftype=X_dummy.ftype
+        self.parameter=[N]
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate chi variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,N: np.sqrt(rng.chisquare(N,n)))
+
 class ChiSquareRV(RV):
     """
     Procedure Name: ChiSquareRV
@@ -232,8 +372,15 @@ class ChiSquareRV(RV):
         self.func=X_dummy.func
         self.support=X_dummy.support
         self.ftype=X_dummy.ftype
+        self.parameter=[N]
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate chi square variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,N: rng.chisquare(N,n))
+
 class ErlangRV(RV):
     """
     Procedure Name: ErlangRV
@@ -256,13 +403,30 @@ class ErlangRV(RV):
         if theta in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV((theta*(theta*x)**(N-1)*exp(-theta*x))/
-                   (factorial(N-1)),[0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[theta,N]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            ErlangRV,self.parameter,lambda theta,N:
+            RV((theta*(theta*x)**(N-1)*exp(-theta*x))/
+               (factorial(N-1)),[0,oo]))
         self.cache={}
 
+    @staticmethod
+    def properties(theta,N):
+        # An erlang random variable is a gamma random variable with an
+        #   integer shape parameter
+        return GammaRV.properties(theta,N)
+
+    @staticmethod
+    def numeric_properties(theta,N):
+        return GammaRV.numeric_properties(theta,N)
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate erlang variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta,N: rng.gamma(N,1/theta,n))
+
 class ErrorRV(RV):
     """
     Procedure Name: ErrorRV
@@ -288,8 +452,17 @@ class ErrorRV(RV):
         self.func=X_dummy.func
         self.support=X_dummy.support
         self.ftype=X_dummy.ftype
+        self.parameter=[mu,alpha,d]
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate error variates from a power of a gamma variate
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,mu,alpha,d:
+                                  d+np.where(rng.random_sample(n)<0.5,-1,1)*
+                                  rng.gamma(1/alpha,1,n)**(1/alpha)/mu)
+
 class ErrorIIRV(RV):
     """
     Procedure Name: ErrorIIRV
@@ -312,6 +485,7 @@ class ErrorIIRV(RV):
         self.func=X_dummy.func
         self.support=X_dummy.support
         self.ftype=X_dummy.ftype
+        self.parameter=[a,b,c]
         self.cache={}
 
 class ExponentialRV(RV):
@@ -330,43 +504,34 @@ class ExponentialRV(RV):
         if theta in [-oo,oo]:
             err_string='theta must be finite'
             raise RVError(err_string)
-        X_dummy=RV([theta*exp(-theta*x)],[0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
         self.parameter=[theta]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            ExponentialRV,self.parameter,lambda theta:
+            RV([theta*exp(-theta*x)],[0,oo]))
         self.cache={}
 
-    def variate(self,n=1,s=None,method='special'):       
-        # If no parameter is specified, return an error
-        if param_check(self.parameter)==False:
-            raise RVError('Not all parameters specified')
-
-        # Check to see if the user specified a valid method
-        method_list=['special','inverse']
-        if method not in method_list:
-            error_string='an invalid method was specified'
-            raise RVError(error_string)
-
-        # If the inverse method is specified, compute variates using
-        #   the IDF function
-        if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
-            return varlist
-
-        # Generate exponential variates
-        idf_func=(-ln(1-t))/(self.parameter[0])
-        varlist=[]
-        for i in range(n):
-            if s==None:
-                val=random()
-            else:
-                val=s
-            var=idf_func.subs(t,val)
-            varlist.append(var)
-        varlist.sort()
-        return varlist
+    @staticmethod
+    def properties(theta):
+        # Closed forms of the properties of the exponential distribution
+        return {'mean':1/theta,'variance':1/theta**2,'skewness':2,
+                'kurtosis':9,'cdf':1-exp(-theta*x),'sf':exp(-theta*x),
+                'idf':-ln(1-x)/theta,'mgf':theta/(theta-t)}
+
+    @staticmethod
+    def numeric_properties(theta):
+        # Numerically stable cdf, sf and idf of the exponential
+        #   distribution
+        return {'cdf':lambda values:
+                    -np.expm1(-theta*np.maximum(values,0)),
+                'sf':lambda values: np.exp(-theta*np.maximum(values,0)),
+                'idf':lambda values: -np.log1p(-values)/theta}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate exponential variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta: rng.exponential(1/theta,n))
 
 class ExponentialPowerRV(RV):
     """
@@ -384,45 +549,21 @@ class ExponentialPowerRV(RV):
                 if theta<=0 or kappa<=0:
                     err_string='both parameters must be positive'
                     raise RVError(err_string)
-        X_dummy=RV(exp(1-exp(theta*x**(kappa)))*exp(theta*x**(kappa))*
-                   theta*kappa*x**(kappa-1),[0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
         self.parameter=[theta,kappa]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            ExponentialPowerRV,self.parameter,lambda theta,kappa:
+            RV(exp(1-exp(theta*x**(kappa)))*exp(theta*x**(kappa))*
+               theta*kappa*x**(kappa-1),[0,oo]))
         self.cache={}
 
-    def variate(self,n=1,s=None,method='special'):
-        # If no parameter is specified, return an error
-        if param_check(self.parameter)==False:
-            raise RVError('Not all parameters specified')
-
-        # Check to see if the user specified a valid method
-        method_list=['special','inverse']
-        if method not in method_list:
-            error_string='an invalid method was specified'
-            raise RVError(error_string)
-
-        # If the inverse method is specified, compute variates using
-        #   the IDF function
-        if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
-            return varlist
-
-        # Generate exponential power variates
-        idf_func=exp((-ln(self.parameter[0])+ln(ln(1-ln(1-s))))/
-                     self.parameter[1])
-        varlist=[]
-        for i in range(n):
-            if s==None:
-                val=random()
-            else:
-                val=s
-            var=idf_func.subs(t,val)
-            varlist.append(var)
-            varlist.sort()
-        return varlist
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate exponential power variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta,kappa:
+                                  (np.log1p(rng.standard_exponential(n))/
+                                   theta)**(1/kappa))
 
 class ExtremeValueRV(RV):
     """
@@ -437,42 +578,21 @@ class ExtremeValueRV(RV):
             if beta in [-oo,oo]:
                 err_string='both parameters must be finite'
                 raise RVError(err_string)
-        X_dummy=RV((beta*exp((x*beta)-((exp(x*beta))/alpha)))/
-                   alpha,[-oo,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
         self.parameter=[alpha,beta]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            ExtremeValueRV,self.parameter,lambda alpha,beta:
+            RV((beta*exp((x*beta)-((exp(x*beta))/alpha)))/
+               alpha,[-oo,oo]))
         self.cache={}
 
-    def variate(self,n=1,s=None,method='special'):
-        if param_check(self.parameter)==False:
-            raise RVError('Not all parameters specified')
-
-        # Check to see if the user specified a valid method
-        method_list=['special','inverse']
-        if method not in method_list:
-            error_string='an invalid method was specified'
-            raise RVError(error_string)
-
-        # If the inverse method is specified, compute variates using
-        #   the IDF function
-        
-        if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
-            return varlist
-
-        idf_func=(ln(self.parameter[0])+ln(ln(-1/(t-1))))/self.parameter[1]
-        varlist=[]
-        for i in range(n):
-            if s==None:
-                val=random()
-            else:
-                val=s
-            var=idf_func.subs(t,val)
-            varlist.append(var)
-        return varlist
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate extreme value variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,alpha,beta:
+                                  np.log(alpha*
+                                         rng.standard_exponential(n))/beta)
 
 class FRV(RV):
     """
@@ -499,8 +619,15 @@ class FRV(RV):
         self.func=X_dummy.func
         self.support=X_dummy.support
         self.ftype=X_dummy.ftype
+        self.parameter=[n1,n2]
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate f variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,n1,n2: rng.f(n1,n2,n))
+
 class GammaRV(RV):
     """
     Procedure Name: GammaRV
@@ -520,14 +647,41 @@ class GammaRV(RV):
         if theta in [-oo,oo] or kappa in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV((theta*(theta*x)**(kappa-1)*exp(-theta*x))/(gamma(kappa)),
-                   [0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
         self.parameter=[theta,kappa]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            GammaRV,self.parameter,lambda theta,kappa:
+            RV((theta*(theta*x)**(kappa-1)*exp(-theta*x))/(gamma(kappa)),
+               [0,oo]))
         self.cache={}
 
+    @staticmethod
+    def properties(theta,kappa):
+        # Closed forms of the properties of the gamma distribution
+        return {'mean':kappa/theta,'variance':kappa/theta**2,
+                'skewness':2/sqrt(kappa),'kurtosis':3+6/kappa,
+                'cdf':lowergamma(kappa,theta*x)/gamma(kappa),
+                'sf':uppergamma(kappa,theta*x)/gamma(kappa),
+                'mgf':(theta/(theta-t))**kappa}
+
+    @staticmethod
+    def numeric_properties(theta,kappa):
+        # The cdf, sf and idf of the gamma distribution from scipy
+        if special==None:
+            return {}
+        return {'cdf':lambda values:
+                    special.gammainc(kappa,theta*np.maximum(values,0)),
+                'sf':lambda values:
+                    special.gammaincc(kappa,theta*np.maximum(values,0)),
+                'idf':lambda values: special.gammaincinv(kappa,values)/theta}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate gamma variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta,kappa:
+                                  rng.gamma(kappa,1/theta,n))
+
 class GeneralizedParetoRV(RV):
     """
     Procedure Name: GeneralizedParetoRV
@@ -547,13 +701,40 @@ class GeneralizedParetoRV(RV):
         if theta in [-oo,oo] or delta in [-oo,oo] or kappa in [-oo,oo]:
             err_string='all parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV((theta+kappa/(x+delta))*(1+x/delta)**(-kappa)*
-                   exp(-theta*x),[0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[theta,delta,kappa]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            GeneralizedParetoRV,self.parameter,lambda theta,delta,kappa:
+            RV((theta+kappa/(x+delta))*(1+x/delta)**(-kappa)*
+               exp(-theta*x),[0,oo]))
         self.cache={}
 
+    @staticmethod
+    def properties(theta,delta,kappa):
+        # Closed forms of the cdf and sf of the generalized pareto
+        #   distribution. The cdf integrated from the pdf is incorrect.
+        sf=(1+x/delta)**(-kappa)*exp(-theta*x)
+        return {'cdf':1-sf,'sf':sf}
+
+    @staticmethod
+    def numeric_properties(theta,delta,kappa):
+        # The cdf and sf of the generalized pareto distribution
+        def log_sf(values):
+            values=np.maximum(values,0)
+            return -kappa*np.log1p(values/delta)-theta*values
+        return {'cdf':lambda values: -np.expm1(log_sf(values)),
+                'sf':lambda values: np.exp(log_sf(values))}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate generalized pareto variates as the minimum of an
+        #   exponential and a lomax variate
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta,delta,kappa:
+                                  np.minimum(rng.standard_exponential(n)/
+                                             theta,
+                                             delta*rng.pareto(kappa,n)))
+
 class GompertzRV(RV):
     """
     Procedure Name: GompertzRV
@@ -572,43 +753,22 @@ class GompertzRV(RV):
         if theta in [-oo,oo] or kappa in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV([theta*kappa**(x)*exp(-(theta*(kappa**(x)-1))/ln(kappa))],
-                   [0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
         self.parameter=[theta,kappa]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            GompertzRV,self.parameter,lambda theta,kappa:
+            RV([theta*kappa**(x)*exp(-(theta*(kappa**(x)-1))/ln(kappa))],
+               [0,oo]))
         self.cache={}
 
-    def variate(self,n=1,s=None,method='special'):
-        if param_check(self.parameter)==False:
-            raise RVError('Not all parameters specified')
-
-        # Check to see if the user specified a valid method
-        method_list=['special','inverse']
-        if method not in method_list:
-            error_string='an invalid method was specified'
-            raise RVError(error_string)
-
-        # If the inverse method is specified, compute variates using
-        #   the IDF function
-        if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
-            return varlist
-
-        idf_func=-((ln(self.parameter[0])-
-                   ln(self.parameter[0]-ln(1-t)*ln(self.parameter[1])))
-                   /ln(self.parameter[1]))
-        varlist=[]
-        for i in range(n):
-            if s==None:
-                val=random()
-            else:
-                val=s
-            var=idf_func.subs(t,val)
-            varlist.append(var)
-        return varlist
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate gompertz variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta,kappa:
+                                  np.log1p(rng.standard_exponential(n)*
+                                           np.log(kappa)/theta)/
+                                  np.log(kappa))
 
 class IDBRV(RV):
     """
@@ -630,6 +790,7 @@ class IDBRV(RV):
         self.func=X_dummy.func
         self.support=X_dummy.support
         self.ftype=X_dummy.ftype
+        self.parameter=[theta,delta,kappa]
         self.cache={}
 
 class InverseGaussianRV(RV):
@@ -651,14 +812,20 @@ class InverseGaussianRV(RV):
         if theta in [-oo,oo] or mu in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV([(1/2)*sqrt(2)*sqrt(theta/(pi*x**3))*
-                    exp(-(1/2)*(theta*(x-mu)**2)/(mu**(2)*x))],
-                   [0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[theta,mu]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            InverseGaussianRV,self.parameter,lambda theta,mu:
+            RV([(1/2)*sqrt(2)*sqrt(theta/(pi*x**3))*
+                exp(-(1/2)*(theta*(x-mu)**2)/(mu**(2)*x))],
+               [0,oo]))
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate inverse gaussian variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta,mu: rng.wald(mu,theta,n))
 
 class InverseGammaRV(RV):
     """
@@ -678,12 +845,13 @@ class InverseGammaRV(RV):
                     raise RVError(err_string)
         if alpha in [-oo,oo] or beta in [-oo,oo]:
             err_string='both parameters must be finite'
-        X_dummy=RV([(x**(1-alpha)*exp(-1/(x*beta)))/
-                    (gamma(alpha)*beta**(alpha))],
-                   [0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[alpha,beta]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            InverseGammaRV,self.parameter,lambda alpha,beta:
+            RV([(x**(1-alpha)*exp(-1/(x*beta)))/
+                (gamma(alpha)*beta**(alpha))],
+               [0,oo]))
         self.cache={}
 
 class KSRV(RV):
@@ -700,6 +868,16 @@ class KSRV(RV):
                 if type(n)!=int:
                     err_string='n must be a positive integer'
                     raise RVError(err_string)
+        self.parameter=[n]
+        self.cache={}
+        # The distribution is expensive to compute, so it is kept in the
+        #   process-wide cache for each value of n
+        entry=procedure_cache.get(('KSRV',n))
+        if entry!=None:
+            self.func=list(entry[0])
+            self.support=list(entry[1])
+            self.ftype=list(entry[2])
+            return
         #Phase 1
         N=n
         m=floor(3*N/2)+(N%2)-1
@@ -852,7 +1030,8 @@ class KSRV(RV):
         self.func=X_dummy.func
         self.support=X_dummy.support
         self.ftype=X_dummy.ftype
-        self.cache={}
+        procedure_cache.put(('KSRV',n),(tuple(self.func),tuple(self.support),
+                                        tuple(self.ftype)))
 
 class LaPlaceRV(RV):
     """
@@ -870,11 +1049,19 @@ class LaPlaceRV(RV):
         if omega in [-oo,oo] or theta in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV(exp(-abs(x-theta)/omega)/(2*omega),[-oo,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[omega,theta]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            LaPlaceRV,self.parameter,lambda omega,theta:
+            RV(exp(-abs(x-theta)/omega)/(2*omega),[-oo,oo]))
         self.cache={}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate LaPlace variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,omega,theta:
+                                  rng.laplace(theta,omega,n))
         
 class LogGammaRV(RV):
     """
@@ -894,13 +1081,21 @@ class LogGammaRV(RV):
         if alpha in [-oo,oo] or beta in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV([(exp(x*beta)*exp(-exp(x)/alpha))/
-                    (alpha**(beta)*gamma(beta))],[-oo,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[alpha,beta]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            LogGammaRV,self.parameter,lambda alpha,beta:
+            RV([(exp(x*beta)*exp(-exp(x)/alpha))/
+                (alpha**(beta)*gamma(beta))],[-oo,oo]))
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate log gamma variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,alpha,beta:
+                                  np.log(rng.gamma(beta,alpha,n)))
+
 class LogisticRV(RV):
     """
     Procedure Name: LogisticRV
@@ -919,42 +1114,20 @@ class LogisticRV(RV):
         if kappa in [-oo,oo] or theta in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV([(theta**(kappa)*kappa*exp(kappa*x))/
-                    (1+(theta*exp(x))**kappa)**2],[-oo,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
         self.parameter=[kappa,theta]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            LogisticRV,self.parameter,lambda kappa,theta:
+            RV([(theta**(kappa)*kappa*exp(kappa*x))/
+                (1+(theta*exp(x))**kappa)**2],[-oo,oo]))
         self.cache={}
 
-    def variate(self,n=1,s=None,method='special'):
-        if param_check(self.parameter)==False:
-            raise RVError('Not all parameters specified')
-
-        # Check to see if the user specified a valid method
-        method_list=['special','inverse']
-        if method not in method_list:
-            error_string='an invalid method was specified'
-            raise RVError(error_string)
-
-        # If the inverse method is specified, compute variates using
-        #   the IDF function
-        if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
-            return varlist
-
-        idf_func=-((ln(-t/(t-1))+self.parameter[0]*ln(self.parameter[1]))/
-                   self.parameter[1])
-        varlist=[]
-        for i in range(n):
-            if s==None:
-                val=random()
-            else:
-                val=s
-            var=idf_func.subs(t,val)
-            varlist.append(var)
-        return varlist
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate logistic variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,kappa,theta:
+                                  rng.logistic(-np.log(theta),1/kappa,n))
 
 class LogLogisticRV(RV):
     """
@@ -975,43 +1148,21 @@ class LogLogisticRV(RV):
         if theta in [-oo,oo] or kappa in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV([(theta*kappa*(theta*x)**(kappa-1))/
-                    (1+(theta*x)**(kappa))**2],[0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
         self.parameter=[theta,kappa]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            LogLogisticRV,self.parameter,lambda theta,kappa:
+            RV([(theta*kappa*(theta*x)**(kappa-1))/
+                (1+(theta*x)**(kappa))**2],[0,oo]))
         self.cache={}
 
-    def variate(self,n=1,s=None,method='special'):
-        if param_check(self.parameter)==False:
-            raise RVError('Not all parameters specified')
-
-        # Check to see if the user specified a valid method
-        method_list=['special','inverse']
-        if method not in method_list:
-            error_string='an invalid method was specified'
-            raise RVError(error_string)
-
-        # If the inverse method is specified, compute variates using
-        #   the IDF function
-        if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
-            return varlist
-
-        idf_func=exp((ln(-t/(t-1))-self.parameter[1]*ln(self.parameter[0]))/
-                     self.parameter[1])
-        varlist=[]
-        for i in range(n):
-            if s==None:
-                val=random()
-            else:
-                val=s
-            var=idf_func.subs(t,val)
-            varlist.append(var)
-        return varlist
-    
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate log logistic variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta,kappa:
+                                  np.exp(rng.logistic(0,1/kappa,n))/theta)
+
 class LogNormalRV(RV):
     """
     Procedure Name: LogNormalRV
@@ -1030,13 +1181,44 @@ class LogNormalRV(RV):
         if mu in [-oo,oo] or sigma in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV([(1/2)*(sqrt(2)*exp((-1/2)*((ln(x)-mu)**2)/(sigma**2)))/
-                  (sqrt(pi)*x*sigma)],[0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[mu,sigma]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            LogNormalRV,self.parameter,lambda mu,sigma:
+            RV([(1/2)*(sqrt(2)*exp((-1/2)*((ln(x)-mu)**2)/(sigma**2)))/
+              (sqrt(pi)*x*sigma)],[0,oo]))
         self.cache={}
 
+    @staticmethod
+    def properties(mu,sigma):
+        # Closed forms of the properties of the log normal distribution
+        spread=exp(sigma**2)
+        return {'mean':exp(mu+sigma**2/2),
+                'variance':(spread-1)*exp(2*mu+sigma**2),
+                'skewness':(spread+2)*sqrt(spread-1),
+                'kurtosis':spread**4+2*spread**3+3*spread**2-3,
+                'cdf':(1+erf((ln(x)-mu)/(sigma*sqrt(2))))/2,
+                'sf':erfc((ln(x)-mu)/(sigma*sqrt(2)))/2,
+                'idf':exp(mu+sigma*sqrt(2)*erfinv(2*x-1))}
+
+    @staticmethod
+    def numeric_properties(mu,sigma):
+        # The cdf, sf and idf of the log normal distribution from scipy
+        if special==None:
+            return {}
+        def standardize(values):
+            with np.errstate(divide='ignore'):
+                return (np.log(np.maximum(values,0))-mu)/sigma
+        return {'cdf':lambda values: special.ndtr(standardize(values)),
+                'sf':lambda values: special.ndtr(-standardize(values)),
+                'idf':lambda values: np.exp(mu+sigma*special.ndtri(values))}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate log normal variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,mu,sigma: rng.lognormal(mu,sigma,n))
+
 class LomaxRV(RV):
     """
     Procedure Name: LomaxRV
@@ -1056,40 +1238,19 @@ class LomaxRV(RV):
         if kappa in [-oo,oo] or theta in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV([theta*kappa*(1+theta*x)**(-kappa-1)],[0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
-        self.parameters=[kappa,theta]
+        self.parameter=[kappa,theta]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            LomaxRV,self.parameter,lambda kappa,theta:
+            RV([theta*kappa*(1+theta*x)**(-kappa-1)],[0,oo]))
         self.cache={}
 
-    def variate(self,n=1,s=None,method='special'):
-        if param_check(self.parameter)==False:
-            raise RVError('Not all parameters specified')
-
-        # Check to see if the user specified a valid method
-        method_list=['special','inverse']
-        if method not in method_list:
-            error_string='an invalid method was specified'
-            raise RVError(error_string)
-
-        # If the inverse method is specified, compute variates using
-        #   the IDF function
-        if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
-            return varlist
-
-        idf_func=((1-t)**(1/self.parameter[0])-1)/self.parameter[1]
-        varlist=[]
-        for i in range(n):
-            if s==None:
-                val=random()
-            else:
-                val=s
-            var=idf_func.subs(t,val)
-            varlist.append(var)
-        return varlist
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate lomax variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,kappa,theta:
+                                  rng.pareto(kappa,n)/theta)
 
 class MakehamRV(RV):
     """
@@ -1112,13 +1273,26 @@ class MakehamRV(RV):
         if theta in [-oo,oo] or delta in [-oo,oo] or kappa in [-oo,oo]:
             err_string='all parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV((theta+delta*kappa**x)*
-                   exp(-theta*x-delta*(kappa**x-1)/log(kappa)),[0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[theta,delta,kappa]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            MakehamRV,self.parameter,lambda theta,delta,kappa:
+            RV((theta+delta*kappa**x)*
+               exp(-theta*x-delta*(kappa**x-1)/log(kappa)),[0,oo]))
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate makeham variates as the minimum of an exponential
+        #   and a gompertz variate
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta,delta,kappa:
+                                  np.fmin(rng.standard_exponential(n)/theta,
+                                          np.log1p(
+                                              rng.standard_exponential(n)*
+                                              np.log(kappa)/delta)/
+                                          np.log(kappa)))
+
 class MuthRV(RV):
     """
     Procedure Name: MuthRV
@@ -1141,6 +1315,7 @@ class MuthRV(RV):
         self.func=X_dummy.func
         self.support=X_dummy.support
         self.ftype=X_dummy.ftype
+        self.parameter=[kappa]
         self.cache={}
 
 class NormalRV(RV):
@@ -1160,46 +1335,37 @@ class NormalRV(RV):
         if sigma in [-oo,oo] or mu in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV((exp((-(x-mu)**2)/(2*sigma**2))*sqrt(2))/(2*sigma*sqrt(pi))
-                   ,[-oo,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
         self.parameter=[mu,sigma]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            NormalRV,self.parameter,lambda mu,sigma:
+            RV((exp((-(x-mu)**2)/(2*sigma**2))*sqrt(2))/(2*sigma*sqrt(pi))
+               ,[-oo,oo]))
         self.cache={}
 
-    def variate(self,n=1,s=None,method='special'):
-        # If no parameter is specified, return an error
-        if param_check(self.parameter)==False:
-            raise RVError('Not all parameters specified')
-
-        # Check to see if the user specified a valid method
-        method_list=['special','inverse']
-        if method not in method_list:
-            error_string='an invalid method was specified'
-            raise RVError(error_string)
-
-        # If the inverse method is specified, compute variates using
-        #   the IDF function
-        if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
-            return varlist
-
-        if s != None and n == 1:
-            return [IDF(self,s)]
-
-        # Otherwise, use the Box-Muller method to compute variates
-        mean=self.parameter[0];var=self.parameter[1]
-        U=UniformRV(0,1)
-        Z1=lambda (val1,val2): sqrt(-2*ln(val1))*cos(2*pi*val2).evalf()
-        gen_uniform=lambda x: U.variate(n=1)[0]
-        val_pairs=[(gen_uniform(1),gen_uniform(1)) for i in range(1,n+1)]
-        varlist=[Z1(pair) for pair in val_pairs]
-        normlist=[(mean+sqrt(var)*val).evalf() for val in varlist]
-        return normlist
-        
-        
+    @staticmethod
+    def properties(mu,sigma):
+        # Closed forms of the properties of the normal distribution
+        return {'mean':mu,'variance':sigma**2,'skewness':0,'kurtosis':3,
+                'cdf':(1+erf((x-mu)/(sigma*sqrt(2))))/2,
+                'sf':erfc((x-mu)/(sigma*sqrt(2)))/2,
+                'idf':mu+sigma*sqrt(2)*erfinv(2*x-1),
+                'mgf':exp(mu*t+sigma**2*t**2/2)}
+
+    @staticmethod
+    def numeric_properties(mu,sigma):
+        # The cdf, sf and idf of the normal distribution from scipy
+        if special==None:
+            return {}
+        return {'cdf':lambda values: special.ndtr((values-mu)/sigma),
+                'sf':lambda values: special.ndtr((mu-values)/sigma),
+                'idf':lambda values: mu+sigma*special.ndtri(values)}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate normal variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,mu,sigma: rng.normal(mu,sigma,n))
 
 class ParetoRV(RV):
     """
@@ -1220,12 +1386,40 @@ class ParetoRV(RV):
         if theta in [-oo,oo] or kappa in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV([(kappa*theta**(kappa))/(x**(kappa+1))],[theta,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[theta,kappa]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            ParetoRV,self.parameter,lambda theta,kappa:
+            RV([(kappa*theta**(kappa))/(x**(kappa+1))],[theta,oo]))
         self.cache={}
 
+    @staticmethod
+    def properties(theta,kappa):
+        # Closed forms of the properties of the pareto distribution. The
+        #   mean and variance are only finite for large enough kappa
+        table={'cdf':1-(theta/x)**kappa,'sf':(theta/x)**kappa,
+               'idf':theta*(1-x)**(-1/kappa)}
+        if (kappa>1)==True:
+            table['mean']=kappa*theta/(kappa-1)
+        if (kappa>2)==True:
+            table['variance']=kappa*theta**2/((kappa-1)**2*(kappa-2))
+        return table
+
+    @staticmethod
+    def numeric_properties(theta,kappa):
+        # The cdf, sf and idf of the pareto distribution
+        return {'cdf':lambda values:
+                    1-(theta/np.maximum(values,theta))**kappa,
+                'sf':lambda values: (theta/np.maximum(values,theta))**kappa,
+                'idf':lambda values: theta*(1-values)**(-1/kappa)}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate pareto variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta,kappa:
+                                  theta*(1+rng.pareto(kappa,n)))
+
 class RayleighRV(RV):
     """
     Procedure Name: RayleighRV
@@ -1241,12 +1435,20 @@ class RayleighRV(RV):
                 raise RVError(err_string)
         if theta in [-oo,oo]:
             err_string='both parameters must be finite'
-        X_dummy=RV([2*theta**(2)*x*exp(-theta**(2)*x**2)],[0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[theta]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            RayleighRV,self.parameter,lambda theta:
+            RV([2*theta**(2)*x*exp(-theta**(2)*x**2)],[0,oo]))
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate Rayleigh variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta:
+                                  np.sqrt(rng.standard_exponential(n))/theta)
+
 class TriangularRV(RV):
     """
     Procedure Name: TriangularRV
@@ -1267,14 +1469,19 @@ class TriangularRV(RV):
         if a in [-oo,oo] or b in [-oo,oo] or c in [-oo,oo]:
             err_string='all parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV([(2*(x-a))/((c-a)*(b-a)),(2*(c-x))/((c-a)*(c-b))],[a,b,c])
-        self.func=X_dummy.func
-        a=Symbol('a');b=Symbol('b');c=Symbol('c')
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
         self.parameter=[a,b,c]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            TriangularRV,self.parameter,lambda a,b,c:
+            RV([(2*(x-a))/((c-a)*(b-a)),(2*(c-x))/((c-a)*(c-b))],[a,b,c]))
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate triangular variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,a,b,c: rng.triangular(a,b,c,n))
+
 class TRV(RV):
     """
     Procedure Name: TRV
@@ -1293,8 +1500,15 @@ class TRV(RV):
         self.func=X_dummy.func
         self.support=X_dummy.support
         self.ftype=X_dummy.ftype
+        self.parameter=[N]
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate t variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,N: rng.standard_t(N,n))
+
 class UniformRV(RV):
     """
     Procedure Name: UniformRV
@@ -1320,36 +1534,25 @@ class UniformRV(RV):
         self.parameter=[a,b]
         self.cache={}
 
-    def variate(self,n=1,s=None,method='special'):
-        # If no parameter is specified, return an error
-        if param_check(self.parameter)==False:
-            raise RVError('Not all parameters specified')
-
-        # Check to see if the user specified a valid method
-        method_list=['special','inverse']
-        if method not in method_list:
-            error_string='an invalid method was specified'
-            raise RVError(error_string)
-
-        # If the inverse method is specified, compute variates using
-        #   the IDF function
-        if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
-            return varlist
-
-        # Generate uniform variates
-        idf_func=-t*self.parameter[0]+t*self.parameter[1]+self.parameter[0]
-        varlist=[]
-        for i in range(n):
-            if s==None:
-                val=random()
-            else:
-                val=s
-            var=idf_func.subs(t,val)
-            varlist.append(var)
-        varlist.sort()
-        return varlist
+    @staticmethod
+    def properties(a,b):
+        # Closed forms of the properties of the uniform distribution
+        return {'mean':(a+b)/2,'variance':(b-a)**2/12,'skewness':0,
+                'kurtosis':Rational(9,5),'cdf':(x-a)/(b-a),'sf':(b-x)/(b-a),
+                'idf':a+(b-a)*x,'mgf':(exp(t*b)-exp(t*a))/(t*(b-a))}
+
+    @staticmethod
+    def numeric_properties(a,b):
+        # The cdf, sf and idf of the uniform distribution
+        return {'cdf':lambda values: np.clip((values-a)/(b-a),0,1),
+                'sf':lambda values: np.clip((b-values)/(b-a),0,1),
+                'idf':lambda values: a+(b-a)*values}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate uniform variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,a,b: rng.uniform(a,b,n))
 
 class WeibullRV(RV):
     """
@@ -1370,47 +1573,37 @@ class WeibullRV(RV):
         if theta in [-oo,oo] or kappa in [-oo,oo]:
             err_string='both parameters must be finite'
             raise RVError(err_string)
-        X_dummy=RV(kappa*theta**(kappa)*x**(kappa-1)*exp(-(theta*x)**kappa),
-                   [0,oo])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
         self.parameter=[theta,kappa]
-        self.cdf = 1 - exp( - (x*theta)**kappa)
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            WeibullRV,self.parameter,lambda theta,kappa:
+            RV(kappa*theta**(kappa)*x**(kappa-1)*exp(-(theta*x)**kappa),
+               [0,oo]))
         self.cache={}
 
-
-    def variate(self,n=1,s=None,method='special'):
-        # If no parameter is specified, return an error
-        if param_check(self.parameter)==False:
-            raise RVError('Not all parameters specified')
-
-        # Check to see if the user specified a valid method
-        method_list=['special','inverse']
-        if method not in method_list:
-            error_string='an invalid method was specified'
-            raise RVError(error_string)
-
-        # If the inverse method is specified, compute variates using
-        #   the IDF function
-        if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
-            return varlist
-
-        # Generate weibull variates
-        idf_func=exp(-(-ln(-ln(1-t))+self.parameter[1]*ln(self.parameter[0]))/
-                     self.parameter[1])
-        varlist=[]
-        for i in range(n):
-            if s==None:
-                val=random()
-            else:
-                val=s
-            var=idf_func.subs(t,val)
-            varlist.append(var)
-        varlist.sort()
-        return varlist
+    @staticmethod
+    def properties(theta,kappa):
+        # Closed forms of the properties of the weibull distribution
+        return {'mean':gamma(1+1/kappa)/theta,
+                'variance':(gamma(1+2/kappa)-gamma(1+1/kappa)**2)/theta**2,
+                'cdf':1-exp(-(theta*x)**kappa),'sf':exp(-(theta*x)**kappa),
+                'idf':(-ln(1-x))**(1/kappa)/theta}
+
+    @staticmethod
+    def numeric_properties(theta,kappa):
+        # Numerically stable cdf, sf and idf of the weibull distribution
+        return {'cdf':lambda values:
+                    -np.expm1(-(theta*np.maximum(values,0))**kappa),
+                'sf':lambda values:
+                    np.exp(-(theta*np.maximum(values,0))**kappa),
+                'idf':lambda values: (-np.log1p(-values))**(1/kappa)/theta}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate weibull variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta,kappa:
+                                  rng.weibull(kappa,n)/theta)
 
 """
 Discrete Distributions
@@ -1425,12 +1618,20 @@ class BenfordRV(RV):
     Output:     1. A Benford random variable
     """
     def __init__(self):
-        X_dummy=RV([(ln((1/x)+1))/(ln(10))],[1,9],['Discrete','pdf'])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            BenfordRV,self.parameter,lambda:
+            RV([(ln((1/x)+1))/(ln(10))],[1,9],['Discrete','pdf']))
         self.cache={}
 
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate Benford variates from the leading digit of 10**U
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n:
+                                  np.floor(10**rng.random_sample(n)))
+
 class BinomialRV(RV):
     """
     Procedure Name: BinomialRV
@@ -1450,14 +1651,29 @@ class BinomialRV(RV):
             if p<=0 or p>=1:
                 err_string='p must be between 0 and 1'
                 raise RVError(err_string)
-        X_dummy=RV([(factorial(N)*p**(x)*(1-p)**(N-x))/
-                    (factorial(N-x)*factorial(x))],[0,N],
-                   ['Discrete','pdf'])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[N,p]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            BinomialRV,self.parameter,lambda N,p:
+            RV([(factorial(N)*p**(x)*(1-p)**(N-x))/
+                (factorial(N-x)*factorial(x))],[0,N],
+               ['Discrete','pdf']))
         self.cache={}
 
+    @staticmethod
+    def properties(N,p):
+        # Closed forms of the moments of the binomial distribution
+        return {'mean':N*p,'variance':N*p*(1-p),
+                'skewness':(1-2*p)/sqrt(N*p*(1-p)),
+                'kurtosis':3+(1-6*p*(1-p))/(N*p*(1-p)),
+                'mgf':(1-p+p*exp(t))**N}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate binomial variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,N,p: rng.binomial(int(N),p,n))
+
 class BernoulliRV(BinomialRV):
     """
     Procedure Name: BernoulliRV
@@ -1470,6 +1686,7 @@ class BernoulliRV(BinomialRV):
         self.func=X_dummy.func
         self.support=X_dummy.support
         self.ftype=X_dummy.ftype
+        self.parameter=X_dummy.parameter
         self.cache={}
 
 class GeometricRV(RV):
@@ -1484,12 +1701,26 @@ class GeometricRV(RV):
             if p<=0 or p>=1:
                 err_string='p must be between 0 and 1'
                 raise RVError(err_string)
-        X_dummy=RV([p*(1-p)**(x-1)],[1,oo],['Discrete','pdf'])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[p]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            GeometricRV,self.parameter,lambda p:
+            RV([p*(1-p)**(x-1)],[1,oo],['Discrete','pdf']))
         self.cache={}
 
+    @staticmethod
+    def properties(p):
+        # Closed forms of the moments of the geometric distribution
+        return {'mean':1/p,'variance':(1-p)/p**2,
+                'skewness':(2-p)/sqrt(1-p),'kurtosis':9+p**2/(1-p),
+                'mgf':p*exp(t)/(1-(1-p)*exp(t))}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate geometric variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,p: rng.geometric(p,n))
+
 class PoissonRV(RV):
     """
     Procedure Name: PoissonRV
@@ -1505,13 +1736,26 @@ class PoissonRV(RV):
         if theta in [-oo,oo]:
             err_string='theta must be finite'
             raise RVError(err_string)
-        X_dummy=RV([(theta**(x)*exp(-theta))/factorial(x)],
-                   [0,oo],['Discrete','pdf'])
-        self.func=X_dummy.func
-        self.support=X_dummy.support
-        self.ftype=X_dummy.ftype
+        self.parameter=[theta]
+        # Substitute the parameters into the template of the distribution
+        self.func,self.support,self.ftype=family_template(
+            PoissonRV,self.parameter,lambda theta:
+            RV([(theta**(x)*exp(-theta))/factorial(x)],
+               [0,oo],['Discrete','pdf']))
         self.cache={}
 
+    @staticmethod
+    def properties(theta):
+        # Closed forms of the moments of the poisson distribution
+        return {'mean':theta,'variance':theta,'skewness':1/sqrt(theta),
+                'kurtosis':3+1/theta,'mgf':exp(theta*(exp(t)-1))}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate poisson variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,theta: rng.poisson(theta,n))
+
 class UniformDiscreteRV(RV):
     """
     Procedure Name: UniformDiscreteRV
@@ -1533,11 +1777,106 @@ class UniformDiscreteRV(RV):
         self.func=X_dummy.func
         self.support=X_dummy.support
         self.ftype=X_dummy.ftype
+        self.parameter=[a,b,k]
         self.cache={}
+
+    def variate(self,n=1,s=None,method='special',stream=None,
+                workers=None,sort=True):
+        # Generate uniform discrete variates with numpy
+        return family_variate(self,n,s,method,stream,workers,sort,
+                              lambda rng,n,a,b,k:
+                                  a+k*rng.randint(0,int(round((b-a)/k))+1,n))
         
         
 
 
+"""
+Closed-Form Rules
+
+Rules for sums, products and minimums of independent random variables
+    from the distributions above, which are consulted by Convolution,
+    Product, Maximum and Minimum (see RegisterRule)
+"""
+
+def normal_sum(param1,param2):
+    # Not intended for use by end user
+    # The sum of two normals is normal
+    return NormalRV(param1[0]+param2[0],sqrt(param1[1]**2+param2[1]**2))
+
+def exponential_sum(param1,param2):
+    # Not intended for use by end user
+    # The sum of two exponentials with the same rate is erlang
+    if param1[0]!=param2[0]:
+        return None
+    return ErlangRV(param1[0],2)
+
+def erlang_sum(param1,param2):
+    # Not intended for use by end user
+    # The sum of two erlangs with the same rate is erlang
+    if param1[0]!=param2[0]:
+        return None
+    return ErlangRV(param1[0],param1[1]+param2[1])
+
+def erlang_exponential_sum(param1,param2):
+    # Not intended for use by end user
+    # An exponential is an erlang with one phase
+    return erlang_sum(param1,[param2[0],1])
+
+def gamma_sum(param1,param2):
+    # Not intended for use by end user
+    # The sum of two gammas with the same scale is gamma
+    if param1[0]!=param2[0]:
+        return None
+    return GammaRV(param1[0],param1[1]+param2[1])
+
+def gamma_exponential_sum(param1,param2):
+    # Not intended for use by end user
+    return gamma_sum(param1,[param2[0],1])
+
+def chisquare_sum(param1,param2):
+    # Not intended for use by end user
+    # Degrees of freedom add
+    return ChiSquareRV(param1[0]+param2[0])
+
+def poisson_sum(param1,param2):
+    # Not intended for use by end user
+    # Poisson rates add
+    return PoissonRV(param1[0]+param2[0])
+
+def binomial_sum(param1,param2):
+    # Not intended for use by end user
+    # The sum of two binomials with the same probability is binomial
+    if param1[1]!=param2[1]:
+        return None
+    return BinomialRV(param1[0]+param2[0],param1[1])
+
+def exponential_minimum(param1,param2):
+    # Not intended for use by end user
+    # The minimum of two exponentials is exponential, and rates add
+    return ExponentialRV(param1[0]+param2[0])
+
+def lognormal_product(param1,param2):
+    # Not intended for use by end user
+    # The product of two log normals is log normal
+    return LogNormalRV(param1[0]+param2[0],
+                       sqrt(param1[1]**2+param2[1]**2))
+
+RegisterRule('convolution',NormalRV,NormalRV,normal_sum)
+RegisterRule('convolution',ExponentialRV,ExponentialRV,exponential_sum)
+RegisterRule('convolution',ErlangRV,ErlangRV,erlang_sum)
+RegisterRule('convolution',ErlangRV,ExponentialRV,erlang_exponential_sum)
+RegisterRule('convolution',GammaRV,GammaRV,gamma_sum)
+RegisterRule('convolution',GammaRV,ErlangRV,gamma_sum)
+RegisterRule('convolution',GammaRV,ExponentialRV,gamma_exponential_sum)
+RegisterRule('convolution',ChiSquareRV,ChiSquareRV,chisquare_sum)
+RegisterRule('convolution',PoissonRV,PoissonRV,poisson_sum)
+for class1 in [BinomialRV,BernoulliRV]:
+    for class2 in [BinomialRV,BernoulliRV]:
+        RegisterRule('convolution',class1,class2,binomial_sum)
+RegisterRule('minimum',ExponentialRV,ExponentialRV,exponential_minimum)
+RegisterRule('product',LogNormalRV,LogNormalRV,lognormal_product)
+
+
 """
 Bivariate Distributions
 """
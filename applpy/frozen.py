@@ -0,0 +1,209 @@
+"""
+Frozen Module
+
+Defines frozen random variables, which evaluate a fully specified random
+    variable with vectorized numpy code for applications that only need
+    numbers. The symbolic random variable remains available for exact
+    work.
+
+Classes:
+    1. FrozenRV(RVar)
+"""
+
+from __future__ import division
+from sympy import Symbol
+import numpy as np
+from .rv import RVError, Mean, Variance
+
+"""
+    A Probability Progamming Language (APPL) -- Python Edition
+    Copyright (C) 2001,2002,2008,2010,2014 Andrew Glen, Larry
+    Leemis, Diane Evans, Matthew Robinson
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>
+"""
+
+x=Symbol('x')
+
+class FrozenRV:
+    """
+    FrozenRV Class
+    Defines a numerical view of a fully specified random variable. The
+        functional forms are compiled on first use (see RV.compile), and
+        the mean and variance are computed once, from the closed forms of
+        named distributions when they are known.
+    """
+
+    def __init__(self,RVar):
+        """
+        Creates a frozen random variable. Raises an error if the random
+            variable has symbolic parameters.
+        """
+        for element in list(RVar.func)+list(RVar.support):
+            symbols=getattr(element,'free_symbols',set())
+            if len(symbols-set([x]))>0:
+                err_string='a random variable can only be frozen if it is'
+                err_string+=' fully specified'
+                raise RVError(err_string)
+        self.rv=RVar
+        self.evaluators={}
+        self.moments=None
+
+    def __repr__(self):
+        parameter=getattr(self.rv,'parameter',None)
+        if parameter==None:
+            return 'FrozenRV(%s %s)'%(self.rv.ftype[0],self.rv.ftype[1])
+        return 'FrozenRV(%s%s)'%(self.rv.__class__.__name__,
+                                 tuple(parameter))
+
+    """
+    Numerical Methods
+
+    Procedures:
+        1. cdf(self,values)
+        2. logpdf(self,values)
+        3. mean(self)
+        4. pdf(self,values)
+        5. ppf(self,values)
+        6. rvs(self,size,stream)
+        7. sf(self,values)
+        8. std(self)
+        9. var(self)
+    """
+
+    def evaluator(self,kind):
+        # Not intended for use by end user
+        """
+        Procedure Name: evaluator
+        Purpose: Finds the compiled evaluator of a functional form
+        Arguments:  1. self: the frozen random variable
+                    2. kind: 'pdf','cdf','sf' or 'idf'
+        Output:     1. A function of a number, list or numpy array
+        """
+        if kind not in self.evaluators:
+            self.evaluators[kind]=self.rv.compile(kind)
+        return self.evaluators[kind]
+
+    def cdf(self,values):
+        """
+        Procedure Name: cdf
+        Purpose: Evaluates the cdf
+        Arguments:  1. self: the frozen random variable
+                    2. values: a number, list or numpy array
+        Output:     1. A numpy array of cdf values
+        """
+        return self.evaluator('cdf')(values)
+
+    def logpdf(self,values):
+        """
+        Procedure Name: logpdf
+        Purpose: Evaluates the logarithm of the pdf
+        Arguments:  1. self: the frozen random variable
+                    2. values: a number, list or numpy array
+        Output:     1. A numpy array of log pdf values (-inf outside the
+                        support)
+        """
+        with np.errstate(divide='ignore'):
+            return np.log(self.evaluator('pdf')(values))
+
+    def mean(self):
+        """
+        Procedure Name: mean
+        Purpose: Computes the mean
+        Arguments:  1. self: the frozen random variable
+        Output:     1. The mean as a float
+        """
+        return self.summary()[0]
+
+    def pdf(self,values):
+        """
+        Procedure Name: pdf
+        Purpose: Evaluates the pdf (or the probability mass function of a
+                    discrete random variable)
+        Arguments:  1. self: the frozen random variable
+                    2. values: a number, list or numpy array
+        Output:     1. A numpy array of pdf values
+        """
+        return self.evaluator('pdf')(values)
+
+    def ppf(self,values):
+        """
+        Procedure Name: ppf
+        Purpose: Evaluates the percent point function (the idf)
+        Arguments:  1. self: the frozen random variable
+                    2. values: a number, list or numpy array of
+                        probabilities
+        Output:     1. A numpy array of quantiles (nan for values outside
+                        of [0,1])
+        """
+        return self.evaluator('idf')(values)
+
+    def rvs(self,size=1,stream=None):
+        """
+        Procedure Name: rvs
+        Purpose: Generates random variates
+        Arguments:  1. self: the frozen random variable
+                    2. size: the number of variates (default is 1)
+                    3. stream: the random stream (or seed) the variates
+                        are drawn from (default is the default stream)
+        Output:     1. A numpy array of variates in the order they were
+                        generated
+        """
+        return self.rv.variate(n=size,stream=stream,sort=False)
+
+    def sf(self,values):
+        """
+        Procedure Name: sf
+        Purpose: Evaluates the survivor function
+        Arguments:  1. self: the frozen random variable
+                    2. values: a number, list or numpy array
+        Output:     1. A numpy array of sf values
+        """
+        return self.evaluator('sf')(values)
+
+    def std(self):
+        """
+        Procedure Name: std
+        Purpose: Computes the standard deviation
+        Arguments:  1. self: the frozen random variable
+        Output:     1. The standard deviation as a float
+        """
+        return np.sqrt(self.var())
+
+    def summary(self):
+        # Not intended for use by end user
+        """
+        Procedure Name: summary
+        Purpose: Computes the mean and variance once, from the closed
+                    forms of a named distribution if they are known and
+                    from the numerical moments otherwise. A moment that
+                    does not exist (such as the mean of a cauchy random
+                    variable) is nan.
+        Arguments:  1. self: the frozen random variable
+        Output:     1. The mean and the variance as floats
+        """
+        if self.moments==None:
+            meanval=Mean(self.rv,mode='numeric')
+            var=Variance(self.rv,mode='numeric')
+            self.moments=(float(meanval),float(var))
+        return self.moments
+
+    def var(self):
+        """
+        Procedure Name: var
+        Purpose: Computes the variance
+        Arguments:  1. self: the frozen random variable
+        Output:     1. The variance as a float
+        """
+        return self.summary()[1]
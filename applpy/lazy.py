@@ -0,0 +1,361 @@
+"""
+Lazy Module
+
+Defines lazy random variables, which record arithmetic on random
+    variables as an expression graph and only compute the distribution
+    when one of its properties is requested
+
+Classes:
+    1. LazyRV(operation,operands)
+
+Procedures:
+    1. Lazy(RVar)
+    2. SetLazyMode(enabled)
+"""
+
+from __future__ import division
+from sympy import Symbol, oo
+import weakref
+from .cache import structure_key
+from .rv import (RVError, Convolution, ConvolutionIID, Pow, Product,
+                 ProductIID, Transform)
+
+"""
+    A Probability Progamming Language (APPL) -- Python Edition
+    Copyright (C) 2001,2002,2008,2010,2014 Andrew Glen, Larry
+    Leemis, Diane Evans, Matthew Robinson
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>
+"""
+
+x=Symbol('x')
+
+# If enabled, the arithmetic operators of RV build lazy expressions
+lazy_settings={'enabled':False}
+
+# Every live node of the expression graph, keyed by its structure, so
+#   that identical subexpressions are represented by one node
+lazy_nodes=weakref.WeakValueDictionary()
+
+# The transformations applied by the single operand nodes
+def transformations(operation,constant):
+    # Not intended for use by end user
+    """
+    Procedure Name: transformations
+    Purpose: Finds the transformation applied by a node with a single
+                random variable operand
+    Arguments:  1. operation: The operation of the node
+                2. constant: The constant operand of the node, if any
+    Output:     1. A transformation in list of two lists format
+    """
+    if operation=='shift':
+        return [[x+constant],[-oo,oo]]
+    if operation=='scale':
+        return [[x*constant],[-oo,oo]]
+    if operation=='divide':
+        return [[x/constant],[-oo,oo]]
+    if operation=='neg':
+        return [[-x],[-oo,oo]]
+    if operation=='abs':
+        return [[abs(x)],[-oo,oo]]
+    if operation=='inverse':
+        return [[1/x,1/x],[-oo,0,oo]]
+    raise RVError('%s is not a valid lazy operation'%operation)
+
+class LazyRV(object):
+    """
+    LazyRV Class
+    Defines a node in an expression graph of random variables. The
+        distribution of the node is computed the first time one of its
+        attributes (func, support, ftype, ...) or methods is used, and
+        is then kept for later use. Nodes are shared between identical
+        subexpressions, so each is computed only once.
+    """
+
+    def __init__(self,operation,operands,key,value=None):
+        """
+        Creates a node of the expression graph. Nodes are created with
+            the lazy_node procedure, which shares identical nodes.
+        """
+        self.operation=operation
+        self.operands=operands
+        self.key=key
+        self.value=value
+
+    def __getattr__(self,name):
+        """
+        Procedure Name: __getattr__
+        Purpose: Evaluates the node when an attribute of the random
+                    variable is requested
+        Arguments:  1. self: the lazy random variable
+                    2. name: the name of the attribute
+        Output:     1. The attribute of the evaluated random variable
+        """
+        if name.startswith('__') or name in ['operation','operands',
+                                             'key','value']:
+            raise AttributeError(name)
+        return getattr(self.compute(),name)
+
+    def __repr__(self):
+        return repr(self.compute())
+
+    def __len__(self):
+        return len(self.compute())
+
+    """
+    Special Class Methods
+
+    Procedures:
+        1. __pos__(self)
+        2. __neg__(self)
+        3. __abs__(self)
+        4. __add__(self,other)
+        5. __radd__(self,other)
+        6. __sub__(self,other)
+        7. __rsub__(self,other)
+        8. __mul__(self,other)
+        9. __rmul__(self,other)
+        10. __truediv__(self,other)
+        11. __rtruediv__(self,other)
+        12. __pow__(self,n)
+    """
+
+    def __pos__(self):
+        return self
+
+    def __neg__(self):
+        return lazy_node('neg',(self,))
+
+    def __abs__(self):
+        return lazy_node('abs',(self,))
+
+    def __add__(self,other):
+        if 'RV' in other.__class__.__name__:
+            return lazy_node('convolution',(self,Lazy(other)))
+        return lazy_node('shift',(self,other))
+
+    def __radd__(self,other):
+        return self.__add__(other)
+
+    def __sub__(self,other):
+        if 'RV' in other.__class__.__name__:
+            return self.__add__(-Lazy(other))
+        return lazy_node('shift',(self,-other))
+
+    def __rsub__(self,other):
+        return (-self).__add__(other)
+
+    def __mul__(self,other):
+        if 'RV' in other.__class__.__name__:
+            return lazy_node('product',(self,Lazy(other)))
+        return lazy_node('scale',(self,other))
+
+    def __rmul__(self,other):
+        return self.__mul__(other)
+
+    def __truediv__(self,other):
+        if 'RV' in other.__class__.__name__:
+            return self.__mul__(lazy_node('inverse',(Lazy(other),)))
+        return lazy_node('divide',(self,other))
+
+    def __rtruediv__(self,other):
+        return lazy_node('inverse',(self,)).__mul__(other)
+
+    __div__=__truediv__
+    __rdiv__=__rtruediv__
+
+    def __pow__(self,n):
+        if type(n)!=int:
+            error_string='a random variable can only be raised to an'
+            error_string+=' integer value'
+            raise RVError(error_string)
+        return lazy_node('pow',(self,n))
+
+    """
+    Evaluation Methods
+
+    Procedures:
+        1. compute(self)
+        2. expression(self)
+    """
+
+    def compute(self):
+        """
+        Procedure Name: compute
+        Purpose: Computes the distribution of the node, reusing the
+                    distributions of nodes that have already been
+                    computed
+        Arguments:  1. self: the lazy random variable
+        Output:     1. The random variable represented by the node
+        """
+        if self.value is None:
+            self.value=evaluate_node(self)
+        return self.value
+
+    def expression(self):
+        """
+        Procedure Name: expression
+        Purpose: Describes the expression represented by the node
+        Arguments:  1. self: the lazy random variable
+        Output:     1. A string describing the expression
+        """
+        if self.operation=='leaf':
+            return 'X%d'%(id(self)%10000)
+        terms=[]
+        for operand in self.operands:
+            if isinstance(operand,LazyRV):
+                terms.append(operand.expression())
+            else:
+                terms.append(str(operand))
+        return '%s(%s)'%(self.operation,','.join(terms))
+
+def node_key(operand):
+    # Not intended for use by end user
+    """
+    Procedure Name: node_key
+    Purpose: Finds the key of an operand of a node
+    Arguments:  1. operand: A lazy random variable or a constant
+    Output:     1. A hashable key
+    """
+    if isinstance(operand,LazyRV):
+        return operand.key
+    return ('constant',operand)
+
+def lazy_node(operation,operands):
+    # Not intended for use by end user
+    """
+    Procedure Name: lazy_node
+    Purpose: Finds the node for an operation on the given operands,
+                creating it if no identical node exists. The operands
+                of convolutions and products are ordered, so X+Y and Y+X
+                share a node.
+    Arguments:  1. operation: The operation
+                2. operands: A tuple of lazy random variables and
+                    constants
+    Output:     1. A lazy random variable
+    """
+    if operation in ['convolution','product']:
+        operands=tuple(sorted(operands,key=lambda operand:
+                              repr(node_key(operand))))
+    key=(operation,)+tuple([node_key(operand) for operand in operands])
+    node=lazy_nodes.get(key)
+    if node is None:
+        node=LazyRV(operation,operands,key)
+        lazy_nodes[key]=node
+    return node
+
+def collect_terms(node,operation,terms):
+    # Not intended for use by end user
+    """
+    Procedure Name: collect_terms
+    Purpose: Flattens nested convolutions (or products) into a list of
+                terms. Nodes that have already been computed are kept as
+                single terms so that their results are reused.
+    Arguments:  1. node: A lazy random variable
+                2. operation: 'convolution' or 'product'
+                3. terms: The list the terms are added to
+    Output:     1. None
+    """
+    if node.operation!=operation or node.value is not None:
+        terms.append(node)
+        return
+    for operand in node.operands:
+        collect_terms(operand,operation,terms)
+
+def evaluate_node(node):
+    # Not intended for use by end user
+    """
+    Procedure Name: evaluate_node
+    Purpose: Computes the random variable represented by a node. Sums and
+                products are planned as a whole: identical terms are
+                grouped into iid operations (which use repeated squaring
+                and the process-wide cache), and the groups are combined
+                starting with the random variables with the fewest
+                segments, which keeps the intermediate results small.
+    Arguments:  1. node: A lazy random variable
+    Output:     1. A random variable
+    """
+    operation=node.operation
+    if operation in ['convolution','product']:
+        terms=[]
+        for operand in node.operands:
+            collect_terms(operand,operation,terms)
+        groups=[]
+        counts={}
+        for term in terms:
+            if term.key in counts:
+                counts[term.key]+=1
+            else:
+                counts[term.key]=1
+                groups.append(term)
+        results=[]
+        for term in groups:
+            count=counts[term.key]
+            if count==1:
+                results.append(term.compute())
+            elif operation=='convolution':
+                results.append(ConvolutionIID(term.compute(),count))
+            else:
+                results.append(ProductIID(term.compute(),count))
+        results.sort(key=lambda RVar: len(RVar.func))
+        result=results[0]
+        for RVar in results[1:]:
+            if operation=='convolution':
+                result=Convolution(result,RVar)
+            else:
+                result=Product(result,RVar)
+        return result
+    RVar=node.operands[0].compute()
+    if operation=='pow':
+        return Pow(RVar,node.operands[1])
+    if len(node.operands)>1:
+        constant=node.operands[1]
+    else:
+        constant=None
+    return Transform(RVar,transformations(operation,constant))
+
+def Lazy(RVar):
+    """
+    Procedure Name: Lazy
+    Purpose: Creates a lazy random variable. Arithmetic on lazy random
+                variables builds an expression, which is only computed
+                when a property of the result (its pdf, mean, variates,
+                ...) is requested.
+    Arguments:  1. RVar: A random variable
+    Output:     1. A lazy random variable
+    """
+    if isinstance(RVar,LazyRV):
+        return RVar
+    # Structurally identical random variables share a node
+    key=structure_key(RVar,('leaf',RVar.__class__.__name__))
+    if key==None:
+        key=('leaf',id(RVar))
+    node=lazy_nodes.get(key)
+    if node is None:
+        node=LazyRV('leaf',(),key,RVar)
+        # Leaves keyed by id must keep the random variable alive
+        node.operands=(RVar,)
+        lazy_nodes[key]=node
+    return node
+
+def SetLazyMode(enabled=True):
+    """
+    Procedure Name: SetLazyMode
+    Purpose: Turns lazy mode on or off. In lazy mode, the arithmetic
+                operators on random variables return lazy random
+                variables (see Lazy).
+    Arguments:  1. enabled: A binary variable
+    Output:     1. None
+    """
+    lazy_settings['enabled']=enabled
@@ -0,0 +1,811 @@
+"""
+Numeric Module
+
+Defines the numerical integration used by APPLPy procedures when
+    symbolic integration fails or takes too long, and the time budgets
+    that bound long symbolic operations
+
+Classes:
+    1. ArrayPrinter(settings)
+    2. BudgetError(token)
+    3. NumericValue(value,error,method)
+
+Procedures:
+    1. budget(seconds,fallback)
+    2. checkpoint()
+    3. combine_values(value,terms)
+    4. integrate_mode(integrand,limits,mode)
+    5. integrate_moments(funclist,support,powers)
+    6. integrate_points(funclist,support,values)
+    7. integrate_segments(funclist,support,lower,upper,mode)
+    8. lambdify_array(args,expr)
+    9. SetIntegrationMode(mode,timeout,abstol,reltol)
+"""
+
+from __future__ import division
+from contextlib import contextmanager
+from functools import wraps
+from sympy import (Abs, Heaviside, Integral, Max, Min, S, Symbol, integrate,
+                   lambdify, sign, solve)
+import mpmath
+import multiprocessing
+import numpy as np
+import signal
+import threading
+import time
+from .cache import disk_cached
+try:
+    import scipy.special
+    from sympy.printing.pycode import SciPyPrinter as BasePrinter
+    array_modules=['numpy','scipy']
+except ImportError:
+    from sympy.printing.pycode import NumPyPrinter as BasePrinter
+    array_modules=['numpy']
+
+"""
+    A Probability Progamming Language (APPL) -- Python Edition
+    Copyright (C) 2001,2002,2008,2010,2014 Andrew Glen, Larry
+    Leemis, Diane Evans, Matthew Robinson
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>
+"""
+
+x=Symbol('x')
+
+# Consult the on-disk cache (when it is enabled) before integrating
+cached_integrate=disk_cached(integrate)
+
+# The integration mode used when a procedure is not given one
+#   1. 'symbolic': integrate with sympy (the default)
+#   2. 'numeric': integrate with mpmath.quad
+#   3. 'auto': integrate with sympy, falling back to mpmath.quad if
+#       sympy times out or returns an unevaluated integral
+integration_settings={'mode':'symbolic','timeout':10,
+                      'abstol':1e-10,'reltol':1e-8}
+
+# The point at which the tail of an integrand over an infinite interval
+#   is checked for decay
+tail_point=mpmath.mpf(10)**15
+
+class NumericValue(float):
+    """
+    NumericValue Class
+    Defines a floating point result of a numerical integration, which
+        carries an estimate of its absolute error and the method used
+    """
+    def __new__(cls,value,error=0.0,method='quad'):
+        """
+        Procedure Name: __new__
+        Purpose: Creates a numerical result
+        Arguments:  1. value: the value of the result
+                    2. error: an estimate of the absolute error
+                    3. method: 'quad' for numerical integration, 'mixed'
+                        for a sum of symbolic and numerical results
+        Output:     1. A float carrying the error estimate
+        """
+        result=float.__new__(cls,value)
+        result.error=error
+        result.method=method
+        return result
+
+    def __repr__(self):
+        return '%s (error %.2g, %s)'%(float.__repr__(self),self.error,
+                                      self.method)
+
+class ArrayPrinter(BasePrinter):
+    """
+    ArrayPrinter Class
+    Prints sympy expressions as numpy (and scipy) code for lambdify. The
+        sympy printers omit the parentheses around the incomplete gamma
+        functions, so 1/lowergamma(a,x) would be evaluated as
+        1/gamma(a)*gammainc(a,x), and they do not translate cot, sec
+        and csc.
+    """
+    def _print_lowergamma(self,expr):
+        return '(%s)'%BasePrinter._print_lowergamma(self,expr)
+
+    def _print_uppergamma(self,expr):
+        return '(%s)'%BasePrinter._print_uppergamma(self,expr)
+
+    def _print_cot(self,expr):
+        return '(1/%s(%s))'%(self._module_format('numpy.tan'),
+                             self._print(expr.args[0]))
+
+    def _print_sec(self,expr):
+        return '(1/%s(%s))'%(self._module_format('numpy.cos'),
+                             self._print(expr.args[0]))
+
+    def _print_csc(self,expr):
+        return '(1/%s(%s))'%(self._module_format('numpy.sin'),
+                             self._print(expr.args[0]))
+
+class BudgetError(Exception):
+    """
+    BudgetError Class
+    Raised when an operation exceeds its time budget
+    """
+    def __init__(self,token):
+        self.budget=token
+        self.value='the time budget of %s seconds was exceeded'%token.seconds
+    def __str__(self):
+        return repr(self.value)
+
+class Budget:
+    """
+    Budget Class
+    Defines a time budget opened by the budget procedure
+    """
+    def __init__(self,seconds,fallback=False):
+        """
+        Procedure Name: __init__
+        Purpose: Starts a time budget
+        Arguments:  1. seconds: the time allowed
+                    2. fallback: a binary variable. If True, integrals
+                        are computed numerically once the time runs out
+        Output:     1. A time budget
+        """
+        self.seconds=seconds
+        self.deadline=time.time()+seconds
+        self.fallback=fallback
+        self.expired=False
+
+    def remaining(self):
+        """
+        Procedure Name: remaining
+        Purpose: Finds the time left in the budget
+        Arguments:  1. None
+        Output:     1. The seconds left (negative once the budget expires)
+        """
+        return self.deadline-time.time()
+
+# The budgets opened in each thread, from the outermost to the innermost
+budget_state=threading.local()
+
+def active_budgets():
+    # Not intended for use by end user
+    """
+    Procedure Name: active_budgets
+    Purpose: Finds the budgets opened in the current thread
+    Arguments:  1. None
+    Output:     1. A list of budgets, from the outermost to the innermost
+    """
+    if not hasattr(budget_state,'stack'):
+        budget_state.stack=[]
+    return budget_state.stack
+
+def integration_depth():
+    # Not intended for use by end user
+    """
+    Procedure Name: integration_depth
+    Purpose: Finds the number of symbolic integrals in progress in the
+                current thread that can be abandoned for numerical ones
+    Arguments:  1. None
+    Output:     1. The number of integrals
+    """
+    return getattr(budget_state,'integrating',0)
+
+def signals_available():
+    # Not intended for use by end user
+    """
+    Procedure Name: signals_available
+    Purpose: Checks if a budget can interrupt the running code with
+                SIGALRM, which is only possible in the main thread on
+                platforms that provide the signal. Elsewhere, budgets are
+                enforced by checkpoints and by subprocesses.
+    Arguments:  1. None
+    Output:     1. True if SIGALRM can be used, False otherwise
+    """
+    if not hasattr(signal,'SIGALRM') or not hasattr(signal,'setitimer'):
+        return False
+    return isinstance(threading.current_thread(),threading._MainThread)
+
+def arm_timer():
+    # Not intended for use by end user
+    """
+    Procedure Name: arm_timer
+    Purpose: Sets the alarm for the earliest deadline of the budgets that
+                have not yet expired
+    Arguments:  1. None
+    Output:     1. None
+    """
+    if not signals_available():
+        return
+    pending=[token.deadline for token in active_budgets()
+             if token.expired==False]
+    if len(pending)==0:
+        signal.setitimer(signal.ITIMER_REAL,0)
+    else:
+        signal.setitimer(signal.ITIMER_REAL,
+                         max(min(pending)-time.time(),1e-3))
+
+def expire_budget(signum,frame):
+    # Not intended for use by end user
+    """
+    Procedure Name: expire_budget
+    Purpose: Handles SIGALRM by expiring the budget whose deadline has
+                passed (see checkpoint)
+    Arguments:  1. signum: The signal number
+                2. frame: The interrupted stack frame
+    Output:     1. None
+    """
+    checkpoint()
+    # The alarm went off early, so wait for the next deadline
+    arm_timer()
+
+def checkpoint():
+    """
+    Procedure Name: checkpoint
+    Purpose: Raises BudgetError if a time budget has run out. Long loops
+                call it so budgets are enforced even where signals are
+                not available. A budget with a fallback is only marked
+                as expired, unless a symbolic integral is in progress,
+                which is then abandoned for a numerical one.
+    Arguments:  1. None
+    Output:     1. None
+    """
+    now=time.time()
+    for token in active_budgets():
+        if token.expired==False and token.deadline<=now+1e-3:
+            token.expired=True
+            arm_timer()
+            if token.fallback==False or integration_depth()>0:
+                raise BudgetError(token)
+
+@contextmanager
+def budget(seconds,fallback=False):
+    """
+    Procedure Name: budget
+    Purpose: Bounds the time spent in the enclosed block. When the time
+                runs out, BudgetError is raised inside the block (or, with
+                fallback=True, integrals still to be computed switch to
+                numerical integration). Budgets may be nested.
+    Arguments:  1. seconds: The time allowed
+                2. fallback: A binary variable. If True, integrals are
+                    computed numerically once the time runs out, and
+                    integrals in progress are abandoned for numerical ones
+    Output:     1. A context manager yielding the budget
+    """
+    token=Budget(seconds,fallback)
+    stack=active_budgets()
+    installed=signals_available() and len(stack)==0
+    if installed==True:
+        previous=signal.signal(signal.SIGALRM,expire_budget)
+    stack.append(token)
+    arm_timer()
+    try:
+        yield token
+    finally:
+        stack.remove(token)
+        if installed==True:
+            signal.setitimer(signal.ITIMER_REAL,0)
+            signal.signal(signal.SIGALRM,previous)
+        else:
+            arm_timer()
+
+def fallback_budget():
+    # Not intended for use by end user
+    """
+    Procedure Name: fallback_budget
+    Purpose: Finds the innermost open budget that allows a numerical
+                fallback
+    Arguments:  1. None
+    Output:     1. The budget, or None
+    """
+    for token in reversed(active_budgets()):
+        if token.fallback==True:
+            return token
+    return None
+
+# The worker process that runs procedures with a timeout where signals
+#   are not available. It is shared by all threads, one call at a time.
+timeout_pool={'pool':None}
+timeout_lock=threading.Lock()
+
+def timeout_worker():
+    # Not intended for use by end user
+    """
+    Procedure Name: timeout_worker
+    Purpose: Finds the worker process for procedures with a timeout,
+                starting it on first use
+    Arguments:  1. None
+    Output:     1. A multiprocessing pool with one worker
+    """
+    if timeout_pool['pool']==None:
+        timeout_pool['pool']=multiprocessing.Pool(1)
+    return timeout_pool['pool']
+
+def time_limited(procedure):
+    # Not intended for use by end user
+    """
+    Procedure Name: time_limited
+    Purpose: Adds a timeout keyword to a procedure. The procedure runs
+                under a budget of that many seconds, or, where signals
+                are not available, in a worker process that is replaced
+                when the time runs out.
+    Arguments:  1. procedure: The procedure
+    Output:     1. The procedure with a timeout keyword
+    """
+    @wraps(procedure)
+    def limited(*args,**kwargs):
+        timeout=kwargs.pop('timeout',None)
+        if timeout==None:
+            return procedure(*args,**kwargs)
+        if signals_available():
+            with budget(timeout):
+                return procedure(*args,**kwargs)
+        # The worker runs the module level procedure, which is found by
+        #   name when it is unpickled
+        with timeout_lock:
+            pool=timeout_worker()
+            result=pool.apply_async(limited,args,kwargs)
+            try:
+                return result.get(timeout)
+            except multiprocessing.TimeoutError:
+                # The worker is still busy, so it is replaced
+                pool.terminate()
+                pool.join()
+                timeout_pool['pool']=None
+                raise BudgetError(Budget(timeout))
+    return limited
+
+def numeric_quad(integrand,limits):
+    # Not intended for use by end user
+    """
+    Procedure Name: numeric_quad
+    Purpose: Integrates a fully specified integrand with mpmath.quad to
+                the absolute and relative tolerances in
+                integration_settings
+    Arguments:  1. integrand: A sympy expression
+                2. limits: A tuple (variable,lower,upper)
+    Output:     1. A NumericValue, which is nan if the tolerances could
+                    not be met, or None if the integrand or the limits
+                    contain unspecified parameters
+    """
+    var,lower,upper=limits
+    integrand=S(integrand)
+    # Replace any copy of the variable carrying assumptions with it
+    for symbol in integrand.free_symbols:
+        if symbol.name==var.name and symbol!=var:
+            integrand=integrand.subs(symbol,var)
+    if len(integrand.free_symbols-set([var]))>0:
+        return None
+    try:
+        lower=float(lower)
+        upper=float(upper)
+    except TypeError:
+        return None
+    finite=np.isfinite(lower) and np.isfinite(upper)
+    function=quad_function(var,integrand,finite)
+    points=kink_points(var,integrand,lower,upper)
+    with mpmath.workdps(quad_digits()), np.errstate(all='ignore'):
+        value,error=quad_interval(function,lower,upper,points)
+    return NumericValue(value,error,'quad')
+
+def quad_function(var,integrand,finite):
+    # Not intended for use by end user
+    """
+    Procedure Name: quad_function
+    Purpose: Compiles an integrand for mpmath.quad. Over a finite
+                interval it is evaluated with mpmath, so that singular
+                end points are resolved to the working precision. Over
+                an infinite interval it is evaluated in floating point
+                (see float_function), where tails such as exp(-exp(x))
+                underflow instead of being computed to arbitrary
+                precision.
+    Arguments:  1. var: The variable of integration
+                2. integrand: A sympy expression
+                3. finite: A binary variable. True if the interval of
+                    integration is finite
+    Output:     1. A function of an mpmath number
+    """
+    if finite==True:
+        return lambdify(var,integrand,'mpmath')
+    return float_function(lambdify_array(var,integrand))
+
+def kink_points(var,integrand,lower,upper):
+    # Not intended for use by end user
+    """
+    Procedure Name: kink_points
+    Purpose: Finds the points inside an interval where an integrand may
+                have a kink or a jump, at the zeros of the arguments of
+                Abs, sign, Heaviside, Max and Min. mpmath.quad converges
+                quickly only for integrands that are smooth inside the
+                interval, so the quadrature is split at these points.
+    Arguments:  1. var: The variable of integration
+                2. integrand: A sympy expression
+                3. lower: The lower limit of integration
+                4. upper: The upper limit of integration
+    Output:     1. A sorted list of the points, as floats
+    """
+    points=set()
+    for atom in S(integrand).atoms(Abs,sign,Heaviside,Max,Min):
+        if atom.func in [Max,Min]:
+            args=[atom.args[0]-arg for arg in atom.args[1:]]
+        else:
+            args=[atom.args[0]]
+        for arg in args:
+            try:
+                roots=solve(arg,var)
+            except NotImplementedError:
+                continue
+            for root in roots:
+                try:
+                    value=float(root)
+                except TypeError:
+                    continue
+                if lower<value<upper:
+                    points.add(value)
+    return sorted(points)
+
+def quad_digits():
+    # Not intended for use by end user
+    """
+    Procedure Name: quad_digits
+    Purpose: Finds the working precision of numerical integration
+    Arguments:  1. None
+    Output:     1. The number of digits needed to resolve the smaller of
+                    the tolerances in integration_settings
+    """
+    abstol=integration_settings['abstol']
+    reltol=integration_settings['reltol']
+    return max(15,int(-mpmath.log10(min(abstol,reltol)))+5)
+
+def quad_interval(function,lower,upper,points=()):
+    # Not intended for use by end user
+    """
+    Procedure Name: quad_interval
+    Purpose: Integrates a numerical function over an interval with
+                mpmath.quad, using a higher degree quadrature if the
+                tolerances in integration_settings are not met. The
+                error estimate of mpmath.quad misses integrals over an
+                infinite interval whose integrand does not decay faster
+                than 1/x, so these are checked far out in the tail.
+    Arguments:  1. function: A function of an mpmath number
+                2. lower: The lower limit of integration
+                3. upper: The upper limit of integration
+                4. points: Points inside the interval at which the
+                    quadrature is split (default is none)
+    Output:     1. The value of the integral as a float, which is nan
+                    if the tolerances are still not met (as for an
+                    integral that diverges)
+                2. An estimate of its absolute error
+    """
+    abstol=integration_settings['abstol']
+    reltol=integration_settings['reltol']
+    lower=mpmath.mpf(lower)
+    upper=mpmath.mpf(upper)
+    interval=[lower]+[mpmath.mpf(point) for point in points]+[upper]
+    value,error=mpmath.quad(function,interval,error=True)
+    if error>max(abstol,reltol*abs(value)):
+        value,error=mpmath.quad(function,interval,error=True,maxdegree=10)
+    tolerance=max(abstol,reltol*abs(value))
+    if not error<=tolerance:
+        return float('nan'),float(error)
+    for end in [lower,upper]:
+        if mpmath.isinf(end):
+            far=mpmath.sign(end)*tail_point
+            if not abs(far*function(far))<=tolerance:
+                return float('nan'),float(error)
+    return float(value),float(error)
+
+def lambdify_array(args,expr):
+    """
+    Procedure Name: lambdify_array
+    Purpose: Converts a sympy expression to a function that evaluates it
+                over numpy arrays. Functions that numpy and scipy do not
+                provide are evaluated element by element with mpmath.
+    Arguments:  1. args: A symbol or a list of symbols
+                2. expr: A sympy expression without unevaluated integrals
+    Output:     1. A function of numpy arrays
+    """
+    expr=S(expr)
+    settings={'fully_qualified_modules':False,'inline':True}
+    # Print the expression once to find the unsupported functions
+    printer=ArrayPrinter(settings)
+    printer.doprint(expr)
+    if len(getattr(printer,'_not_supported',()))==0:
+        return lambdify(args,expr,modules=array_modules,
+                        printer=ArrayPrinter(settings))
+    function=lambdify(args,expr,'mpmath')
+    return np.vectorize(lambda *values: float(function(*values)),
+                        otypes=[float])
+
+def integrate_points(funclist,support,values):
+    """
+    Procedure Name: integrate_points
+    Purpose: Integrates a fully specified piecewise function numerically
+                from the start of its support to each of an array of
+                points. The points are sorted and the integrals between
+                consecutive points (and the kinks of the functions, see
+                kink_points) are accumulated, so each part of the
+                support is integrated once.
+    Arguments:  1. funclist: The functions on each segment
+                2. support: The end points of the segments
+                3. values: A one dimensional numpy array of points
+    Output:     1. A numpy array of the integrals, with the integral over
+                    the whole support for points beyond it
+    """
+    breaks=np.array([float(value) for value in support])
+    functions=[(quad_function(x,func,True),quad_function(x,func,False))
+               for func in funclist]
+    # Integrate between the points, the break points of the support and
+    #   the kinks of the functions
+    grid=values[(values>breaks[0])&(values<breaks[-1])]
+    kinks=[kink_points(x,funclist[i],breaks[i],breaks[i+1])
+           for i in range(len(funclist))]
+    grid=np.unique(np.concatenate([grid,breaks[1:]]+kinks))
+    totals=np.zeros(len(grid))
+    start=breaks[0]
+    total=0.0
+    with mpmath.workdps(quad_digits()), np.errstate(all='ignore'):
+        for i in range(len(grid)):
+            segment=np.searchsorted(breaks,grid[i],side='left')-1
+            segment=min(max(segment,0),len(functions)-1)
+            if np.isfinite(start) and np.isfinite(grid[i]):
+                function=functions[segment][0]
+            else:
+                function=functions[segment][1]
+            value,error=quad_interval(function,start,grid[i])
+            total+=value
+            totals[i]=total
+            start=grid[i]
+    result=np.empty(values.shape)
+    idx=np.minimum(np.searchsorted(grid,values,side='left'),len(grid)-1)
+    result[:]=totals[idx]
+    result[values<=breaks[0]]=0.0
+    result[values>=breaks[-1]]=total
+    result[np.isnan(values)]=np.nan
+    return result
+
+def integrate_moments(funclist,support,powers):
+    """
+    Procedure Name: integrate_moments
+    Purpose: Integrates x**j times a fully specified piecewise density
+                numerically for several powers j in one pass over the
+                segments. Each segment is compiled once and the density
+                is evaluated once at each quadrature node, so all of the
+                powers share its evaluations.
+    Arguments:  1. funclist: The functions on each segment
+                2. support: The end points of the segments
+                3. powers: A list of the powers j
+    Output:     1. A list of NumericValues, one for each power, or None
+                    if the functions or the support contain unspecified
+                    parameters
+    """
+    try:
+        breaks=[float(value) for value in support]
+    except TypeError:
+        return None
+    funclist=[S(func) for func in funclist]
+    for i in range(len(funclist)):
+        # Replace any copy of x carrying assumptions with x
+        for symbol in funclist[i].free_symbols:
+            if symbol.name==x.name and symbol!=x:
+                funclist[i]=funclist[i].subs(symbol,x)
+        if len(funclist[i].free_symbols-set([x]))>0:
+            return None
+    values=[0.0]*len(powers)
+    errors=[0.0]*len(powers)
+    with mpmath.workdps(quad_digits()), np.errstate(all='ignore'):
+        for i in range(len(funclist)):
+            finite=np.isfinite(breaks[i]) and np.isfinite(breaks[i+1])
+            density=quad_function(x,funclist[i],finite)
+            points=kink_points(x,funclist[i],breaks[i],breaks[i+1])
+            nodes={}
+            def evaluate(value):
+                if value not in nodes:
+                    nodes[value]=density(value)
+                return nodes[value]
+            for m in range(len(powers)):
+                def moment(value,power=powers[m]):
+                    return value**power*evaluate(value)
+                integral,error=quad_interval(moment,breaks[i],breaks[i+1],
+                                             points)
+                values[m]+=integral
+                errors[m]+=error
+    return [NumericValue(values[m],errors[m],'quad')
+            for m in range(len(powers))]
+
+def float_function(function):
+    # Not intended for use by end user
+    """
+    Procedure Name: float_function
+    Purpose: Adapts a function of numpy arrays to the mpmath numbers used
+                by mpmath.quad. The function is evaluated in floating
+                point, where the tails of densities such as exp(-exp(x))
+                underflow instead of being computed to arbitrary
+                precision. Values that are not finite, which occur at
+                singular end points, are taken as zero.
+    Arguments:  1. function: A function of numpy arrays
+    Output:     1. A function of an mpmath number
+    """
+    def evaluate(value):
+        result=float(function(np.float64(value)))
+        if np.isfinite(result):
+            return result
+        return 0.0
+    return evaluate
+
+def resolve_mode(mode):
+    # Not intended for use by end user
+    """
+    Procedure Name: resolve_mode
+    Purpose: Finds the integration mode for a procedure call
+    Arguments:  1. mode: The mode given to the procedure, or None
+    Output:     1. The mode to use
+    """
+    if mode==None:
+        return integration_settings['mode']
+    if mode not in ['symbolic','numeric','auto']:
+        raise ValueError("mode must be 'symbolic', 'numeric' or 'auto'")
+    return mode
+
+def integrate_mode(integrand,limits,mode=None,**kwargs):
+    """
+    Procedure Name: integrate_mode
+    Purpose: Integrates an expression symbolically, numerically or
+                symbolically with a numerical fallback
+    Arguments:  1. integrand: A sympy expression
+                2. limits: A tuple (variable,lower,upper)
+                3. mode: 'symbolic','numeric' or 'auto' (default is the
+                    mode set by SetIntegrationMode)
+                4. kwargs: Keyword arguments passed to integrate
+    Output:     1. A sympy expression, or a NumericValue if the integral
+                    was computed numerically
+    """
+    mode=resolve_mode(mode)
+    # Inside a budget with a fallback, integrate as in auto mode, and
+    #   numerically straight away once the budget has expired
+    fallback=fallback_budget()
+    if fallback!=None:
+        mode='auto'
+        if fallback.expired==True:
+            result=numeric_quad(integrand,limits)
+            if result!=None:
+                return result
+    if mode=='symbolic':
+        return cached_integrate(integrand,limits,**kwargs)
+    if mode=='numeric':
+        result=numeric_quad(integrand,limits)
+        if result!=None:
+            return result
+        return cached_integrate(integrand,limits,**kwargs)
+    # In auto mode, try sympy within the time allowed, and integrate
+    #   numerically if it fails
+    result=None
+    token=None
+    try:
+        with budget(integration_settings['timeout']) as token:
+            budget_state.integrating=integration_depth()+1
+            try:
+                result=cached_integrate(integrand,limits,**kwargs)
+            finally:
+                budget_state.integrating-=1
+    except BudgetError as error:
+        if error.budget is not token and error.budget.fallback==False:
+            raise
+    if result!=None and not result.has(Integral):
+        return result
+    numeric=numeric_quad(integrand,limits)
+    if numeric!=None:
+        return numeric
+    if result!=None:
+        return result
+    return cached_integrate(integrand,limits,**kwargs)
+
+def integrate_segments(funclist,support,lower=None,upper=None,mode=None):
+    """
+    Procedure Name: integrate_segments
+    Purpose: Integrates a piecewise function over its support, or over
+                the part of its support between lower and upper
+    Arguments:  1. funclist: The functions on each segment
+                2. support: The end points of the segments
+                3. lower: The lower limit of integration (default is the
+                    start of the support)
+                4. upper: The upper limit of integration (default is the
+                    end of the support)
+                5. mode: 'symbolic','numeric' or 'auto'
+    Output:     1. The integral, as a sympy expression or a NumericValue
+    """
+    values=[]
+    for i in range(len(funclist)):
+        start=support[i]
+        end=support[i+1]
+        if lower!=None:
+            if lower>=end:
+                continue
+            if lower>start:
+                start=lower
+        if upper!=None:
+            if upper<=start:
+                continue
+            if upper<end:
+                end=upper
+        values.append(integrate_mode(funclist[i],(x,start,end),mode))
+    return sum_values(values)
+
+def sum_values(values):
+    # Not intended for use by end user
+    """
+    Procedure Name: sum_values
+    Purpose: Adds symbolic and numerical results, accumulating the error
+                estimates of the numerical results
+    Arguments:  1. values: A list of sympy expressions and NumericValues
+    Output:     1. The sum, as a NumericValue if any of the values are
+                    numerical and all of them are numbers
+    """
+    numeric=[value for value in values if isinstance(value,NumericValue)]
+    if len(numeric)==0:
+        return sum(values,S(0))
+    try:
+        total=sum([float(value) for value in values])
+    except TypeError:
+        return sum(values,S(0))
+    if len(numeric)==len(values):
+        method='quad'
+    else:
+        method='mixed'
+    return NumericValue(total,sum([value.error for value in numeric]),method)
+
+def combine_values(value,terms):
+    """
+    Procedure Name: combine_values
+    Purpose: Attaches an error estimate to a value computed from
+                numerical results, by first order propagation of their
+                errors
+    Arguments:  1. value: The value computed from the terms
+                2. terms: A list of (term,sensitivity) pairs, where the
+                    sensitivity is the absolute value of the derivative
+                    of the value with respect to the term
+    Output:     1. A NumericValue if any of the terms is numerical,
+                    otherwise the value unchanged
+    """
+    numeric=[term for term,sensitivity in terms
+             if isinstance(term,NumericValue)]
+    if len(numeric)==0:
+        return value
+    try:
+        value=float(value)
+    except TypeError:
+        return value
+    error=sum([float(sensitivity)*term.error for term,sensitivity in terms
+               if isinstance(term,NumericValue)])
+    if len(numeric)==len(terms):
+        method='quad'
+    else:
+        method='mixed'
+    return NumericValue(value,error,method)
+
+def SetIntegrationMode(mode,timeout=None,abstol=None,reltol=None):
+    """
+    Procedure Name: SetIntegrationMode
+    Purpose: Sets how APPLPy procedures integrate when they are not
+                given a mode
+    Arguments:  1. mode: 'symbolic' (sympy only), 'numeric' (mpmath.quad)
+                    or 'auto' (sympy with a numerical fallback)
+                2. timeout: The seconds allowed for symbolic integration
+                    in 'auto' mode
+                3. abstol: The absolute tolerance of numerical integration
+                4. reltol: The relative tolerance of numerical integration
+    Output:     1. None
+    """
+    if mode not in ['symbolic','numeric','auto']:
+        raise ValueError("mode must be 'symbolic', 'numeric' or 'auto'")
+    integration_settings['mode']=mode
+    if timeout!=None:
+        integration_settings['timeout']=timeout
+    if abstol!=None:
+        integration_settings['abstol']=abstol
+    if reltol!=None:
+        integration_settings['reltol']=reltol
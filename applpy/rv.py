@@ -1,7 +1,7 @@
 """
 Main Random Variable Module
 
-1. The Random Variable class
+1. The Random Variable class, and the array backed DiscreteArrayRV class
 2. Procedures for changing functional form
 3. Operations on one random variable
 4. Operations on two random variables
@@ -11,6 +11,11 @@ Class Procedures:
     1. display()
     1. verifyPDF()
     2. variate(n)
+    3. compile(kind)
+    4. build_sampler(tol)
+    5. variate_stream(chunk_size)
+    6. freeze()
+    7. evaluate(kind,values,**parameters)
 
 Functional Form Conversion:
     1. CDF(RVar,value)
@@ -22,6 +27,10 @@ Functional Form Conversion:
     7. BootstrapRV(varlist)
     8. Convert(RVar,inc)
 
+    Conversions of an entire random variable are stored in a
+    process-wide cache (see cache.py), so structurally identical
+    random variables only pay for each conversion once.
+
 Procedures On One Random Variable:
     1. ConvolutionIID(RVar,n)
     2. CoefOfVar(RVar)
@@ -49,6 +58,7 @@ Procedures On Two Random Variables:
     3. Minimum(RVar1,RVar2)
     4. Mixture(MixParameters,MixRVs)
     5. Product(RVar1,RVar2)
+    6. RegisterRule(operation,class1,class2,rule)
 
 Plotting Procedures:
     1. Histogram(Sample,bins)
@@ -64,11 +74,23 @@ from sympy import (Symbol, symbols, oo, integrate, summation, diff,
                    exp, pi, sqrt, factorial, ln, floor, simplify,
                    solve, nan, Add, Mul, Integer, function,
                    binomial, pprint,log,expand,zoo,latex,Piecewise,Rational,
-                   Sum,S,Float,limit)
+                   Sum,S,Float,limit,lambdify,sympify,Integral)
 from sympy.plotting.plot import plot
 from random import random
+from functools import wraps
+import copy
+import inspect
 import numpy as np
+import multiprocessing
+import multiprocessing.sharedctypes
 import pickle
+from .cache import disk_cached, procedure_cache, structure_key
+from .numeric import (BudgetError, NumericValue, budget, checkpoint,
+                      combine_values, integrate_mode, integrate_moments,
+                      integrate_points, integrate_segments,
+                      integration_settings,
+                      lambdify_array, resolve_mode, time_limited)
+from .sampling import InverseTable, get_stream, numeric_inverse
 try:
     import seaborn
 except:
@@ -76,6 +98,12 @@ except:
 import matplotlib.pylab as plt
 x,y,z,t=symbols('x y z t')
 
+# Consult the on-disk cache (when it is enabled, see EnableDiskCache)
+#   before the expensive sympy procedures
+cached_integrate=disk_cached(integrate)
+cached_solve=disk_cached(solve)
+cached_simplify=disk_cached(simplify)
+
 """
     A Probability Progamming Language (APPL) -- Python Edition
     Copyright (C) 2001,2002,2008,2010,2014 Andrew Glen, Larry
@@ -106,6 +134,21 @@ class RVError(Exception):
     def __str__(self):
         return repr(self.value)
 
+def lazy_operand(RVar):
+    # Not intended for use by end user
+    """
+    Procedure Name: lazy_operand
+    Purpose: Wraps a random variable in a lazy random variable if lazy
+                mode is enabled (see SetLazyMode)
+    Arguments:  1. RVar: A random variable
+    Output:     1. A lazy random variable, or None if lazy mode is off
+    """
+    # Imported here because the lazy module builds on this one
+    from .lazy import Lazy, lazy_settings
+    if lazy_settings['enabled']==True:
+        return Lazy(RVar)
+    return None
+
 class RV:
     """
     RV Class
@@ -234,6 +277,10 @@ class RV:
         Arguments:  1. self: the random variable
         Output:     1. The negative transformation of the random variable
         """
+        # In lazy mode, record the operation instead of computing it
+        lazy=lazy_operand(self)
+        if lazy is not None:
+            return -lazy
         gX=[[-x],[-oo,oo]]
         neg=Transform(self,gX)
         return(neg)
@@ -246,6 +293,10 @@ class RV:
         Arguments:  1. self: the random variable
         Output:     1. The absolute value of the random variable
         """
+        # In lazy mode, record the operation instead of computing it
+        lazy=lazy_operand(self)
+        if lazy is not None:
+            return abs(lazy)
         gX=[[abs(x)],[-oo,oo]]
         abs_rv=Transform(self,gX)
         return(abs_rv)
@@ -261,6 +312,10 @@ class RV:
                     2. other: a constant or random variable
         Output:     1. A new random variable
         """
+        # In lazy mode, record the operation instead of computing it
+        lazy=lazy_operand(self)
+        if lazy is not None:
+            return lazy+other
         # If the random variable is added to another random variable,
         #   return the convolution of the two random variables
         if 'RV' in other.__class__.__name__:
@@ -303,6 +358,10 @@ class RV:
                     2. other: a constant or random variable
         Output:     1. A new random variable
         """
+        # In lazy mode, record the operation instead of computing it
+        lazy=lazy_operand(self)
+        if lazy is not None:
+            return lazy-other
         # If the random variable is subtracted by another random variable,
         #   return the difference of the two random variables
         if 'RV' in other.__class__.__name__:
@@ -343,6 +402,10 @@ class RV:
                     2. other: a constant or random variable
         Output:     1. A new random variable
         """
+        # In lazy mode, record the operation instead of computing it
+        lazy=lazy_operand(self)
+        if lazy is not None:
+            return lazy*other
         # If the random variable is multiplied by another random variable,
         #   return the product of the two random variables
         if 'RV' in other.__class__.__name__:
@@ -382,6 +445,10 @@ class RV:
                     2. other: a constant or random variable
         Output:     1. A new random variable
         """
+        # In lazy mode, record the operation instead of computing it
+        lazy=lazy_operand(self)
+        if lazy is not None:
+            return lazy/other
         # If the random variable is divided by another random variable,
         #   return the quotient of the two random variables
         if 'RV' in other.__class__.__name__:
@@ -405,6 +472,10 @@ class RV:
                     2. other: a constant or random variable
         Output:     1. A new random variable
         """
+        # In lazy mode, record the operation instead of computing it
+        lazy=lazy_operand(self)
+        if lazy is not None:
+            return other/lazy
         ## Invert the random variable
         gX=[[1/x,1/x],[-oo,0,oo]]
         invert=Transform(self,gX)
@@ -426,6 +497,10 @@ class RV:
             error_string='a random variable can only be raised to an'
             error_string+=' integer value'
             raise RVError(error_string)
+        # In lazy mode, record the operation instead of computing it
+        lazy=lazy_operand(self)
+        if lazy is not None:
+            return lazy**n
 
         pow_rv=Pow(self,n)
         return pow_rv
@@ -460,7 +535,7 @@ class RV:
         #   simplifies to zero
         for i in range(len(self.func)):
             difference=self.func[i]-other.func[i]
-            difference=simplify(difference)
+            difference=cached_simplify(difference)
             difference=expand(difference)
             if not difference==0:
                 return False
@@ -474,14 +549,19 @@ class RV:
     Procedures:
         1. add_assumptions(self,option)
         2. add_to_cache(self,object_name,object)
-        3. display(self)
-        4. drop_assumptions(self)
-        5. init_cache(self)
-        6. latex(self)
-        7. save(self,filename)
-        8. simplify(self,assumption)
-        9. verifyPDF(self)
-        10. variate(self,n)
+        3. build_sampler(self,tol)
+        4. compile(self,kind)
+        5. display(self)
+        6. drop_assumptions(self)
+        7. evaluate(self,kind,values,**parameters)
+        8. freeze(self)
+        9. init_cache(self)
+        10. latex(self)
+        11. save(self,filename)
+        12. simplify(self,assumption)
+        13. verifyPDF(self)
+        14. variate(self,n)
+        15. variate_stream(self,chunk_size)
     """
     def add_assumptions(self, option):
         """
@@ -529,6 +609,59 @@ class RV:
         # Add an object to the cache dictionary
         self.cache[object_name]=obj
 
+    def build_sampler(self,tol=1e-10):
+        """
+        Procedure Name: build_sampler
+        Purpose: Precomputes a monotone cubic Hermite interpolation table
+                    of the inverse cdf, accurate to tol in the probability
+                    scale, and stores it in the cache of the random
+                    variable. Once the table is built, variate generates
+                    variates by table lookup.
+        Arguments:  1. self: the random variable
+                    2. tol: the maximum error |F(X(u))-u| of the table
+                        (default is 1e-10)
+        Output:     1. The interpolation table
+        """
+        if self.ftype[0]!='continuous':
+            err_string='sampling tables can only be built for continuous'
+            err_string+=' random variables'
+            raise RVError(err_string)
+        if tol<=0:
+            raise RVError('the tolerance must be positive')
+        table=InverseTable(self,tol)
+        self.add_to_cache('sampler',table)
+        return table
+
+    def compile(self,kind='pdf'):
+        """
+        Procedure Name: compile
+        Purpose: Builds a vectorized numerical evaluator for a functional
+                    form of the random variable. Each segment is
+                    lambdified once, so evaluating the random variable at
+                    many points avoids repeated calls to subs and simplify.
+                    Forms of continuous random variables that sympy
+                    cannot find within the integration timeout are
+                    computed numerically from the pdf. Evaluators are
+                    stored in the process-wide cache.
+        Arguments:  1. self: the random variable
+                    2. kind: 'pdf','cdf','sf','hf','chf' or 'idf'
+                        (default is 'pdf')
+        Output:     1. A function that accepts a number, list or numpy
+                        array and returns a numpy array of the same shape
+        """
+        if kind not in ['pdf','cdf','sf','hf','chf','idf']:
+            err_string='kind must be pdf, cdf, sf, hf, chf or idf'
+            raise RVError(err_string)
+        key=structure_key(self,('compile',kind))
+        if key!=None:
+            evaluator=procedure_cache.get(key)
+            if evaluator!=None:
+                return evaluator
+        evaluator=compile_form(self,kind)
+        if key!=None:
+            procedure_cache.put(key,evaluator)
+        return evaluator
+
     def display(self,opt='repr'):
         """
         Procedure Name: display
@@ -574,6 +707,54 @@ class RV:
             function = function.subs(Symbol('x', nonpositive = True), x)
             function = function.subs(Symbol('x', positive = True), x)
             self.func[i] = function
+
+    def evaluate(self,kind,values,**parameters):
+        """
+        Procedure Name: evaluate
+        Purpose: Evaluates a functional form of a random variable with
+                    symbolic parameters over arrays of values and
+                    parameters at once. The functional form is lambdified
+                    over x and the parameters (once, the result is kept
+                    in the process-wide cache), and all of the arrays are
+                    broadcast against each other with numpy, so a grid of
+                    parameter values and points is a single call.
+        Arguments:  1. self: the random variable
+                    2. kind: 'pdf','cdf','sf','hf','chf' or 'idf'
+                    3. values: A number, list or numpy array of points
+                    4. parameters: The values of the symbolic parameters,
+                        given as keywords named after the symbols (for
+                        instance mu=array, sigma=array)
+        Output:     1. A numpy array with the broadcast shape of the
+                        values and the parameters
+        """
+        if kind not in ['pdf','cdf','sf','hf','chf','idf']:
+            err_string='kind must be pdf, cdf, sf, hf, chf or idf'
+            raise RVError(err_string)
+        names=tuple(sorted(parameters))
+        key=structure_key(self,('evaluate',kind,names))
+        evaluator=None
+        if key!=None:
+            evaluator=procedure_cache.get(key)
+        if evaluator==None:
+            evaluator=compile_parametric(self,kind,names)
+            if key!=None:
+                procedure_cache.put(key,evaluator)
+        return evaluator(values,*[parameters[name] for name in names])
+
+    def freeze(self):
+        """
+        Procedure Name: freeze
+        Purpose: Creates a numerical view of a fully specified random
+                    variable, with vectorized pdf, cdf, sf, ppf, rvs,
+                    logpdf, mean and var methods. The random variable
+                    itself is unchanged and remains available for exact
+                    work.
+        Arguments:  1. self: the random variable
+        Output:     1. A frozen random variable (see FrozenRV)
+        """
+        # Imported here because the frozen module builds on this one
+        from .frozen import FrozenRV
+        return FrozenRV(self)
                 
     
     def init_cache(self):
@@ -660,7 +841,7 @@ class RV:
             else:
                 x2 = Symbol('x2')
             new_func = segment.subs(x,x2)
-            new_func = simplify(new_func)
+            new_func = cached_simplify(new_func)
             self.func[i] = new_func.subs(x2,x)
         new_func = []
         new_support = []
@@ -705,7 +886,7 @@ class RV:
             print 'Now checking for area...'
             area=0
             for i in range(len(X_dummy.func)):
-                val=integrate(X_dummy.func[i],(x,X_dummy.support[i],
+                val=cached_integrate(X_dummy.func[i],(x,X_dummy.support[i],
                                                X_dummy.support[i+1]))
                 area+=val
             print 'The area under f(x) is: %s'%(area)
@@ -795,7 +976,8 @@ class RV:
                 print 'is not valid'
 
 
-    def variate(self,n=1,s=None,sensitivity=None,method='newton-raphson'):
+    def variate(self,n=1,s=None,sensitivity=None,method='newton-raphson',
+                stream=None,workers=None,sort=True):
         """
         Procedure Name: variate
         Purpose: Generates a list of n random variates from the random variable
@@ -809,7 +991,17 @@ class RV:
                                 2. 'inverse'
                     5. sensitivity: value indicating how close two interations
                             must be for the variate generator to reach
-                            convergence. (default is .1% of the mean)
+                            convergence. (default is a relative tolerance
+                            of 1e-12)
+                    6. stream: the random stream (or seed) the uniform
+                            random numbers are drawn from (default is the
+                            default stream, see SetSeed)
+                    7. workers: the number of worker processes used to
+                            generate the variates (default is to generate
+                            them in this process, see ParallelVariates)
+                    8. sort: a binary variable. If True (default), the
+                            variates are returned in increasing order
+        Output:     1. A numpy array of n random variates
         """
 
         # Check to see if the user specified a valid method
@@ -818,61 +1010,340 @@ class RV:
             error_string='an invalid method was specified'
             raise RVError(error_string)
 
+        # Split large draws across a pool of worker processes
+        if workers!=None and workers>1:
+            return ParallelVariates(self,n,workers,stream,sort=sort,s=s,
+                                    sensitivity=sensitivity,method=method)
+
+        # Draw the uniform random numbers, or use the given percentile
+        if s==None:
+            probs=get_stream(stream).random(n)
+        else:
+            if s<0 or s>1:
+                error_string='the percentile must be between 0 and 1'
+                raise RVError(error_string)
+            probs=np.repeat(float(s),n)
+
         # If the inverse method is specified, compute variates using
-        #   the IDF function
+        #   the compiled IDF function
         if method=='inverse':
-            Xidf=IDF(self)
-            varlist=[IDF(Xidf,random()) for i in range(1,n+1)]
+            varlist=self.compile('idf')(probs)
+            if sort==True:
+                varlist.sort()
             return varlist
-        
-        # Find the cdf and pdf functions (to avoid integrating for
-            # each variate
-        cdf=CDF(self)
-        pdf=PDF(self)
-        mean=Mean(self)
-        if sensitivity==None:
-            # If sensitivity is not specified, set the sensitivity to be
-            #   .1% of the mean value for random variates
-            if s==None:
-                sensitivity=abs(0000.1*mean)
-            # If a percentile is specified, set sensitivity to be .01%
-            #   of the mean value
-            else:
-                sensitivity=abs(0000.1*mean)
-        # Create a list of variates
-        varlist=[]
-        for i in range(n):
-            guess_last = oo
-            guess=mean
-            if s==None:
-                val=random()
-            else:
-                val=s
-            while abs(guess_last - guess) > sensitivity:
-                guess_last = guess
-                try:
-                    if len(self.func)==1:
-                        guess=(guess-
-                               ((cdf.func[0].subs(x,guess)-val)/
-                                     pdf.func[0].subs(x,guess)))
-                        guess=guess.evalf()
-                    else:
-                        guess=(guess-((CDF(cdf,guess)-val)/
-                                      PDF(pdf,guess))).evalf()
-                except:
-                    if guess>self.support[len(self.support)-1]:
-                        cfunc=cdf.func[len(self.func)-1].subs(x,guess)
-                        pfunc=pdf.func[len(self.func)-1].subs(x,guess)
-                        guess=(guess-((cfunc-val)/pfunc)).evalf()
-                    if guess<self.support[0]:
-                        cfunc=cdf.func[0].subs(x,guess)
-                        pfunc=pdf.func[0].subs(x,guess)
-                        guess=(guess-((cfunc-val)/pfunc)).evalf()
-                #print guess
-            varlist.append(guess)            
-        varlist.sort()
+
+        # Use the interpolation table if one has been built, otherwise
+        #   invert the compiled cdf numerically for all of the variates
+        #   at once, using a safeguarded Newton-Raphson iteration
+        if self.cache!=None and 'sampler' in self.cache:
+            varlist=self.cache['sampler'].inverse(self,probs)
+        else:
+            varlist=numeric_inverse(self,probs,sensitivity)
+        if sort==True:
+            varlist.sort()
         return varlist
 
+    def variate_stream(self,chunk_size=10000,n=None,stream=None,
+                       sort=False,**kwargs):
+        """
+        Procedure Name: variate_stream
+        Purpose: Generates random variates in chunks, so that large
+                    simulations can consume the variates without holding
+                    all of them in memory at once
+        Arguments:  1. self: the random variable
+                    2. chunk_size: the number of variates in each chunk
+                    3. n: the total number of variates (default is to
+                            generate chunks indefinitely)
+                    4. stream: the random stream (or seed) the variates
+                            are drawn from (default is the default stream)
+                    5. sort: a binary variable. If True, each chunk is
+                            sorted (default is unsorted output)
+                    6. kwargs: keyword arguments passed to variate (s,
+                            method, and sensitivity for random variables
+                            that are not named distributions)
+        Output:     1. A generator of numpy arrays of at most chunk_size
+                        random variates
+        """
+        if chunk_size<1:
+            raise RVError('the chunk size must be positive')
+        # Reject keywords that the variate method of the random variable
+        #   does not accept (the named distributions take no sensitivity)
+        accepted=inspect.getargspec(self.variate).args
+        for key in kwargs:
+            if key not in accepted:
+                err_string='variate does not accept the keyword %s'%key
+                raise RVError(err_string)
+        # Draw every chunk from one stream, so that the concatenated
+        #   chunks match a single draw of the same size
+        return variate_chunks(self,chunk_size,n,get_stream(stream),sort,
+                              kwargs)
+
+def variate_chunks(RVar,chunk_size,n,stream,sort,kwargs):
+    # Not intended for use by end user
+    """
+    Procedure Name: variate_chunks
+    Purpose: Generates the chunks of variates for RV.variate_stream
+    Arguments:  1. RVar: A random variable
+                2. chunk_size: The number of variates in each chunk
+                3. n: The total number of variates (or None)
+                4. stream: The random stream
+                5. sort: A binary variable. If True, each chunk is sorted
+                6. kwargs: The keyword arguments for variate
+    Output:     1. A generator of numpy arrays of variates
+    """
+    remaining=n
+    while remaining==None or remaining>0:
+        if remaining==None:
+            size=chunk_size
+        else:
+            size=min(chunk_size,remaining)
+            remaining-=size
+        yield RVar.variate(n=size,stream=stream,sort=sort,**kwargs)
+
+class DiscreteArrayRV(RV):
+    """
+    DiscreteArrayRV Class
+    Defines an explicit discrete random variable whose support and
+        function values are held in numpy arrays, for distributions
+        with large supports. The values are float64 unless exact=True,
+        in which case they are kept as exact (sympy) numbers.
+    """
+
+    def __init__(self,func,support,ftype=['discrete','pdf'],exact=False):
+        """
+        Creates an instance of the array backed random variable class
+            Repeated support values of a pdf are combined and the
+            support is sorted
+        """
+        if ftype[0]!='discrete':
+            raise RVError('DiscreteArrayRV must be discrete')
+        if ftype[1] not in ['pdf','cdf','sf','hf','chf','idf']:
+            raise RVError('an invalid functional form was specified')
+        if exact==True:
+            func=np.array([S(value) for value in func],dtype=object)
+            support=np.asarray(support)
+        else:
+            func=np.asarray(func,dtype=float)
+            support=np.asarray(support)
+            if support.dtype.kind not in 'iuf':
+                support=support.astype(float)
+        if func.ndim!=1 or support.shape!=func.shape:
+            string='Support has incorrect number of elements'
+            raise RVError(string)
+        if ftype[1]=='pdf':
+            support,func=combine_arrays(support,func)
+        elif len(support)>1 and (support[1:]<support[:-1]).any():
+            raise RVError('Support is not in ascending order')
+        self.func=func
+        self.support=support
+        self.ftype=list(ftype)
+        self.exact=exact
+        self.cache=None
+        self.filename=None
+
+    def __eq__(self,other):
+        """
+        Procedure Name: __eq__
+        Purpose: Checks for equality of the two random variables by
+                    comparing the support and function arrays element
+                    by element
+        Arguments:  1. self: the random variable
+                    2. other: a second random variable
+        Output:     1. True if the random variables are equal, False
+                        otherwise
+        """
+        if 'RV' not in other.__class__.__name__:
+            error_string='a random variable can only be checked for'
+            error_string+=' equality with another random variable'
+            raise RVError(error_string)
+        if not np.array_equal(self.support,np.asarray(other.support)):
+            return False
+        # Exact values are compared with floats one element at a time
+        func=np.asarray(other.func)
+        if self.func.dtype==object or func.dtype==object:
+            return bool(np.array_equal(self.func.astype(object),
+                                       func.astype(object)))
+        return bool(np.array_equal(self.func,func))
+
+    """
+    Array Methods
+
+    Procedures:
+        1. compile(self,kind)
+        2. convert(self,form)
+        3. lookup(self,form,value)
+        4. probabilities(self)
+    """
+
+    def compile(self,kind='pdf'):
+        """
+        Procedure Name: compile
+        Purpose: Builds a vectorized numerical evaluator of a functional
+                    form directly from the arrays of the random variable
+        Arguments:  1. self: the random variable
+                    2. kind: 'pdf','cdf','sf','hf','chf' or 'idf'
+        Output:     1. A function mapping a number, list or array to a
+                        numpy array of the same shape
+        """
+        if kind not in ['pdf','cdf','sf','hf','chf','idf']:
+            raise RVError('an invalid functional form was specified')
+        return compile_form(self,kind)
+
+    def convert(self,form):
+        """
+        Procedure Name: convert
+        Purpose: Converts the random variable to another functional form,
+                    using cumulative sums of the probabilities
+        Arguments:  1. self: the random variable
+                    2. form: 'pdf','cdf','sf','hf','chf' or 'idf'
+        Output:     1. The random variable in the requested form
+        """
+        if form==self.ftype[1]:
+            return self
+        if self.ftype[1]=='idf':
+            points=self.func
+        else:
+            points=self.support
+        pdf=self.probabilities()
+        cdf=np.cumsum(pdf)
+        if form=='pdf':
+            values=pdf
+        elif form=='cdf':
+            values=cdf
+        elif form=='sf':
+            values=1-cdf
+        elif form=='hf':
+            values=pdf/(1-cdf+pdf)
+        elif form=='chf':
+            if self.exact==True:
+                values=[-ln(1-value) for value in cdf]
+            else:
+                values=-np.log(1-cdf)
+        elif form=='idf':
+            return DiscreteArrayRV(points,cdf,['discrete','idf'],self.exact)
+        else:
+            raise RVError('an invalid functional form was specified')
+        return DiscreteArrayRV(values,points,['discrete',form],self.exact)
+
+    def lookup(self,form,value):
+        """
+        Procedure Name: lookup
+        Purpose: Evaluates a functional form at a single value by a
+                    binary search of the support
+        Arguments:  1. self: the random variable
+                    2. form: 'pdf','cdf','sf','hf','chf' or 'idf'
+                    3. value: the point at which the form is evaluated
+        Output:     1. The value of the functional form
+        """
+        X_dummy=self.convert('cdf')
+        points=X_dummy.support
+        cdf=X_dummy.func
+        if form=='idf':
+            if value<0 or value>1:
+                raise RVError('the percentile must be between 0 and 1')
+            idx=min(np.searchsorted(cdf,value,side='left'),len(points)-1)
+            return points[idx]
+        pdf=self.convert('pdf').func
+        idx=np.searchsorted(points,value,side='left')
+        if idx<len(points) and points[idx]==value:
+            fx=pdf[idx]
+        else:
+            fx=0
+        idx=np.searchsorted(points,value,side='right')-1
+        if idx<0:
+            Fx=0
+        else:
+            Fx=cdf[idx]
+        if form=='pdf':
+            return fx
+        if form=='cdf':
+            return Fx
+        if form=='sf':
+            return 1-Fx
+        if form=='hf':
+            return fx/(1-Fx+fx)
+        if form=='chf':
+            if self.exact==True:
+                return -ln(1-Fx)
+            return -np.log(1-Fx)
+        raise RVError('an invalid functional form was specified')
+
+    def probabilities(self):
+        """
+        Procedure Name: probabilities
+        Purpose: Computes the probability of each support value from the
+                    functional form of the random variable
+        Arguments:  1. self: the random variable
+        Output:     1. An array of the probabilities of the support values
+        """
+        form=self.ftype[1]
+        if form=='pdf':
+            return self.func
+        if form=='hf':
+            # The probability of reaching each support value is the
+            #   product of the complements of the earlier hazards
+            reach=np.cumprod(np.concatenate([[1],1-self.func[:-1]]))
+            return self.func*reach
+        if form=='idf':
+            cdf=self.support
+        elif form=='cdf':
+            cdf=self.func
+        elif form=='sf':
+            cdf=1-self.func
+        elif self.exact==True:
+            cdf=np.array([1-exp(-value) for value in self.func],dtype=object)
+        else:
+            cdf=1-np.exp(-self.func)
+        return np.diff(np.concatenate([[0],cdf]))
+
+def as_array_rv(RVar):
+    # Not intended for use by end user
+    """
+    Procedure Name: as_array_rv
+    Purpose: Converts an explicit discrete random variable (or a discrete
+                random variable in functional form with finite support)
+                to an array backed pdf. The probabilities are kept exact
+                unless they are all floats.
+    Arguments:  1. RVar: A discrete random variable
+    Output:     1. An array backed random variable in pdf form
+    """
+    if isinstance(RVar,DiscreteArrayRV):
+        return RVar.convert('pdf')
+    if RVar.ftype[0]=='Discrete':
+        if oo in RVar.support or -oo in RVar.support:
+            err_string='the support of the random variable'
+            err_string+=' must be finite'
+            raise RVError(err_string)
+        RVar=Convert(RVar)
+    if RVar.ftype[0]!='discrete':
+        raise RVError('the random variable must be discrete')
+    X_dummy=PDF(RVar)
+    exact=False
+    for prob in X_dummy.func:
+        if not is_float_value(prob):
+            exact=True
+            break
+    return DiscreteArrayRV(X_dummy.func,X_dummy.support,exact=exact)
+
+def combine_arrays(support,probs):
+    # Not intended for use by end user
+    """
+    Procedure Name: combine_arrays
+    Purpose: Sorts a support array and combines the probabilities of
+                repeated support values
+    Arguments:  1. support: An array of support values
+                2. probs: An array of the corresponding probabilities
+    Output:     1. A sorted array of the distinct support values
+                2. An array of the total probability of each value
+    """
+    points,index=np.unique(support,return_inverse=True)
+    if probs.dtype==object:
+        totals=np.zeros(len(points),dtype=object)
+        np.add.at(totals,index,probs)
+    else:
+        totals=np.bincount(index,weights=probs,minlength=len(points))
+    return points,totals
+
 """
 Conversion Procedures:
     1. CDF(RVar,value)
@@ -885,6 +1356,63 @@ Conversion Procedures:
     8. Convert(RVar,inc)
 """
 
+def memoize_conversion(form):
+    # Not intended for use by end user
+    """
+    Procedure Name: memoize_conversion
+    Purpose: Wraps a functional form conversion procedure so that the
+                converted random variable is stored in the process-wide
+                cache, keyed by the structure (func, support, ftype) of
+                the random variable being converted. Structurally
+                identical random variables share the stored conversion.
+    Arguments:  1. form: The functional form produced by the procedure
+    Output:     1. A decorator for the conversion procedure
+    """
+    def decorator(procedure):
+        @wraps(procedure)
+        def conversion(RVar,value=x,cache=False,**kwargs):
+            # Lists and arrays of values are evaluated all at once with
+            #   the compiled form of the random variable
+            if isinstance(value,(list,tuple,np.ndarray)):
+                return RVar.compile(form)(value)
+            # Array backed random variables convert themselves
+            if isinstance(RVar,DiscreteArrayRV):
+                if value.__class__.__name__=='Symbol' and value==x:
+                    return RVar.convert(form)
+                return RVar.lookup(form,value)
+            # Values at a point are computed by the procedure itself, which
+            #   relies on the (memoized) conversion of the entire function
+            if value.__class__.__name__!='Symbol' or value!=x:
+                return procedure(RVar,value,cache,**kwargs)
+            # Nothing is gained when the random variable is already in the
+            #   requested form or the conversion is cached on the instance
+            if RVar.ftype[1]==form:
+                return procedure(RVar,value,cache,**kwargs)
+            if RVar.cache != None and form in RVar.cache:
+                return procedure(RVar,value,cache,**kwargs)
+            # Keywords such as the integration mode are part of the key,
+            #   so conversions made in different ways are stored apart
+            tag=(form,)+tuple(sorted(kwargs.items()))
+            key=structure_key(RVar,tag)
+            if key==None:
+                return procedure(RVar,value,cache,**kwargs)
+            # The cache holds immutable copies, so a fresh random variable
+            #   is returned on every hit and callers are free to modify it
+            entry=procedure_cache.get(key)
+            if entry!=None:
+                result=RV(list(entry[0]),list(entry[1]),list(entry[2]))
+                if cache==True:
+                    RVar.add_to_cache(form,result)
+                return result
+            result=procedure(RVar,value,cache,**kwargs)
+            if isinstance(result,RV) and result is not RVar:
+                procedure_cache.put(key,(tuple(result.func),
+                                         tuple(result.support),
+                                         tuple(result.ftype)))
+            return result
+        return conversion
+    return decorator
+
 def check_value(value,sup):
     # Not intended for use by end user
     """
@@ -905,17 +1433,543 @@ def check_value(value,sup):
         else:
             return True
 
-def CDF(RVar,value=x,cache=False):
+def closed_form(RVar,name,numeric=False):
+    # Not intended for use by end user
+    """
+    Procedure Name: closed_form
+    Purpose: Looks up a known closed form for a named distribution, as
+                declared by the properties (or numeric_properties) method
+                of its class in dist_type. The table for each class and
+                parameter list is kept in the process-wide cache.
+    Arguments:  1. RVar: A random variable
+                2. name: 'mean','variance','skewness','kurtosis','cdf',
+                    'sf','idf' or 'mgf'
+                3. numeric: A binary variable. If True, look up a numpy
+                    function for the cdf, sf or idf instead. These
+                    require numerical parameters. (default is False)
+    Output:     1. The closed form, or None if it is not known
+    """
+    if numeric==True:
+        table_name='numeric_properties'
+    else:
+        table_name='properties'
+    properties=getattr(RVar,table_name,None)
+    if properties==None:
+        return None
+    parameters=list(RVar.parameter)
+    # The numpy functions need floats, not sympy numbers such as
+    #   Rational(1,2) or sqrt(2)
+    if numeric==True:
+        try:
+            parameters=[float(param) for param in parameters]
+        except (TypeError,ValueError):
+            return None
+    # The symbolic closed forms need sympy numbers, so that integer
+    #   parameters such as 1/kappa give exact rationals instead of floats
+    else:
+        parameters=[sympify(param) for param in parameters]
+    key=(table_name,RVar.__class__.__name__,tuple(parameters))
+    try:
+        table=procedure_cache.get(key)
+    except TypeError:
+        key=None
+        table=None
+    if table==None:
+        table=properties(*parameters)
+        if key!=None:
+            procedure_cache.put(key,table)
+    return table.get(name)
+
+def closed_form_conversion(RVar,kind,value,cache):
+    # Not intended for use by end user
+    """
+    Procedure Name: closed_form_conversion
+    Purpose: Computes a functional form of a named distribution (or its
+                value at a point) from a known closed form
+    Arguments:  1. RVar: A random variable
+                2. kind: 'cdf','sf' or 'idf'
+                3. value: The point, or x for the entire function
+                4. cache: A binary variable. If True, the result will be
+                    stored in memory for later use.
+    Output:     1. The functional form or its value at the point, or
+                    None if no closed form is known
+    """
+    if RVar.ftype[0]!='continuous':
+        return None
+    form=closed_form(RVar,kind)
+    if form is None:
+        return None
+    if value.__class__.__name__!='Symbol' or value!=x:
+        return cached_simplify(form.subs(x,value))
+    if kind=='idf':
+        support=[0,1]
+    else:
+        support=RVar.support
+    result=RV([form],support,['continuous',kind])
+    if cache==True:
+        RVar.add_to_cache(kind,result)
+    return result
+
+def compile_form(RVar,kind):
+    # Not intended for use by end user
+    """
+    Procedure Name: compile_form
+    Purpose: Builds a vectorized numerical evaluator for one functional
+                form of a random variable. Each segment is lambdified
+                once (see lambdify_array) and values are assigned to
+                segments with np.searchsorted on the support breakpoints.
+    Arguments:  1. RVar: A fully specified random variable
+                2. kind: 'pdf','cdf','sf','hf','chf' or 'idf'
+    Output:     1. A function mapping a number, list or array to a
+                    numpy array of the same shape
+    """
+    conversions={'pdf':PDF,'cdf':CDF,'sf':SF,'hf':HF,'chf':CHF,'idf':IDF}
+    # Values assigned to points below and above the support
+    bounds={'pdf':(0,0),'cdf':(0,1),'sf':(1,0),'hf':(0,np.nan),
+            'chf':(0,np.inf),'idf':(np.nan,np.nan)}
+
+    # Named distributions with a numerical closed form are evaluated
+    #   with it directly
+    function=closed_form(RVar,kind,numeric=True)
+    if function is not None:
+        def evaluate(values):
+            if kind!='idf':
+                return function(values)
+            inside=(values>=0)&(values<=1)
+            return np.where(inside,function(np.clip(values,0,1)),np.nan)
+        return vectorize_evaluator(evaluate)
+
+    # Compile an explicit discrete random variable by looking up its
+    #   support points
+    if RVar.ftype[0]=='Discrete':
+        if oo not in RVar.support and -oo not in RVar.support:
+            return compile_form(Convert(RVar),kind)
+    if RVar.ftype[0]=='discrete':
+        X_dummy=PDF(RVar)
+        points=np.asarray(X_dummy.support,dtype=float)
+        probs=np.asarray(X_dummy.func,dtype=float)
+        cumprobs=np.cumsum(probs)
+        def pmf(values):
+            idx=np.searchsorted(points,values,side='left')
+            idx=np.minimum(idx,len(points)-1)
+            return np.where(points[idx]==values,probs[idx],0.0)
+        def cmf(values):
+            idx=np.searchsorted(points,values,side='right')-1
+            return np.where(idx>=0,cumprobs[np.maximum(idx,0)],0.0)
+        def evaluate(values):
+            if kind=='pdf':
+                return pmf(values)
+            if kind=='cdf':
+                return cmf(values)
+            if kind=='sf':
+                return 1-cmf(values)
+            if kind=='hf':
+                return pmf(values)/(1-cmf(values)+pmf(values))
+            if kind=='chf':
+                return -np.log(1-cmf(values))
+            # The idf is the smallest support value whose cdf is at
+            #   least the given probability
+            idx=np.searchsorted(cumprobs,values,side='left')
+            idx=np.minimum(idx,len(points)-1)
+            return np.where((values>=0)&(values<=1),points[idx],np.nan)
+        return vectorize_evaluator(evaluate)
+
+    # Compile a continuous random variable, or a discrete random variable
+    #   with infinite support, segment by segment
+    if RVar.ftype[0]=='Discrete' and kind in ['sf','hf','chf','idf']:
+        # Discrete forms with infinite support are assembled from the
+        #   compiled pdf and cdf
+        pmf=compile_form(RVar,'pdf')
+        cmf=compile_form(RVar,'cdf')
+        def evaluate(values):
+            if kind=='sf':
+                return 1-cmf(values)
+            # The hf is the pdf over the sf, as in HF
+            if kind=='hf':
+                return pmf(values)/(1-cmf(values))
+            if kind=='chf':
+                return -np.log(1-cmf(values))
+            return discrete_inverse(cmf,values,float(RVar.support[0]),
+                                    float(RVar.support[-1]))
+        return vectorize_evaluator(evaluate)
+    if RVar.ftype[0]=='continuous' and kind!='pdf':
+        X_dummy=symbolic_form(RVar,kind)
+        if X_dummy is None:
+            return numeric_form(RVar,kind)
+    else:
+        X_dummy=conversions[kind](RVar)
+    pieces=[]
+    for piece in X_dummy.func:
+        piece=S(piece)
+        # Replace any copy of x carrying assumptions with x
+        for symbol in piece.free_symbols:
+            if symbol.name=='x' and symbol!=x:
+                piece=piece.subs(symbol,x)
+        if len(piece.free_symbols-set([x]))>0:
+            err_string='distribution must be fully specified'
+            raise RVError(err_string)
+        pieces.append(lambdify_array(x,piece))
+    breaks=np.array([float(value) for value in X_dummy.support])
+    below,above=bounds[kind]
+    integer=RVar.ftype[0]=='Discrete'
+    def evaluate(values):
+        if integer==True:
+            points=np.floor(values)
+        else:
+            points=values
+        idx=np.searchsorted(breaks,points,side='right')-1
+        # The right end point of the support belongs to the last segment
+        idx[points==breaks[-1]]=len(pieces)-1
+        result=np.empty(points.shape)
+        result[idx<0]=below
+        result[idx>=len(pieces)]=above
+        for i in range(len(pieces)):
+            mask=idx==i
+            if mask.any():
+                result[mask]=pieces[i](points[mask])
+        if integer==True and kind=='pdf':
+            result[points!=values]=0
+        return result
+    return vectorize_evaluator(evaluate)
+
+def symbolic_form(RVar,kind):
+    # Not intended for use by end user
+    """
+    Procedure Name: symbolic_form
+    Purpose: Finds a functional form of a continuous random variable for
+                compile_form, allowing sympy the integration timeout (see
+                SetIntegrationMode)
+    Arguments:  1. RVar: A fully specified continuous random variable
+                2. kind: 'cdf','sf','hf','chf' or 'idf'
+    Output:     1. The functional form, or None if sympy fails, runs out
+                    of time or leaves an integral unevaluated
+    """
+    conversions={'cdf':CDF,'sf':SF,'hf':HF,'chf':CHF,'idf':IDF}
+    # Every form starts from the cdf, so once sympy has run out of time
+    #   on a random variable its other forms are not tried again (until
+    #   the timeout is changed)
+    key=structure_key(RVar,('symbolic_timeout',
+                            integration_settings['timeout']))
+    if key!=None and procedure_cache.get(key)!=None:
+        return None
+    token=None
+    try:
+        with budget(integration_settings['timeout']) as token:
+            X_dummy=conversions[kind](RVar)
+    except BudgetError as error:
+        if error.budget is not token:
+            raise
+        if key!=None:
+            procedure_cache.put(key,True)
+        return None
+    except (RVError,NotImplementedError):
+        return None
+    for piece in X_dummy.func:
+        if S(piece).has(Integral):
+            return None
+    return X_dummy
+
+def numeric_form(RVar,kind):
+    # Not intended for use by end user
+    """
+    Procedure Name: numeric_form
+    Purpose: Builds a vectorized evaluator for a functional form of a
+                continuous random variable from its compiled pdf, by
+                numerical integration (see integrate_points) and, for the
+                idf, by numerical inversion of the cdf (see
+                numeric_inverse)
+    Arguments:  1. RVar: A fully specified continuous random variable
+                2. kind: 'cdf','sf','hf','chf' or 'idf'
+    Output:     1. A function mapping a number, list or array to a
+                    numpy array of the same shape
+    """
+    X_dummy=PDF(RVar)
+    pdf=compile_form(RVar,'pdf')
+    def evaluate(values):
+        if kind=='idf':
+            result=np.empty(values.shape)
+            result[:]=np.nan
+            inside=(values>=0)&(values<=1)
+            result[inside]=numeric_inverse(RVar,values[inside])
+            return result
+        cdf=integrate_points(X_dummy.func,X_dummy.support,values)
+        # The cdf is one beyond the support, whatever the quadrature
+        #   error over the whole support
+        cdf[values>=float(X_dummy.support[-1])]=1.0
+        if kind=='cdf':
+            return cdf
+        if kind=='sf':
+            return 1-cdf
+        with np.errstate(divide='ignore',invalid='ignore'):
+            if kind=='hf':
+                return pdf(values)/(1-cdf)
+            return -np.log(1-cdf)
+    return vectorize_evaluator(evaluate)
+
+def discrete_inverse(cmf,values,lower,upper):
+    # Not intended for use by end user
+    """
+    Procedure Name: discrete_inverse
+    Purpose: Inverts the compiled cdf of an integer valued random
+                variable by a vectorized doubling and bisection search
+    Arguments:  1. cmf: The compiled cdf of the random variable
+                2. values: An array of probabilities
+                3. lower: The lower end point of the support (a number,
+                    or an array with the shape of the values)
+                4. upper: The upper end point of the support (likewise)
+    Output:     1. An array with the smallest support values whose cdf
+                    is at least the given probabilities
+    """
+    lw=np.zeros(values.shape)+lower-1
+    up=np.zeros(values.shape)+lower
+    upper=np.zeros(values.shape)+upper
+    # Widen the bracket until the cdf at the upper end reaches the
+    #   probability, giving up where floating point error prevents it
+    for i in range(64):
+        short=(cmf(up)<values)&(up<upper)
+        if not short.any():
+            break
+        width=up[short]-lw[short]
+        lw[short]=up[short]
+        up[short]=np.minimum(up[short]+2*width,upper[short])
+    while (up-lw>1).any():
+        mid=np.floor((lw+up)/2)
+        high=cmf(mid)>=values
+        up=np.where(high,mid,up)
+        lw=np.where(high,lw,mid)
+    return np.where((values>=0)&(values<=1),up,np.nan)
+
+def compile_parametric(RVar,kind,names):
+    # Not intended for use by end user
+    """
+    Procedure Name: compile_parametric
+    Purpose: Builds a vectorized evaluator of a functional form of a
+                random variable with symbolic parameters. Each segment
+                and each support breakpoint is compiled over x and the
+                parameters (see lambdify_array), and every point is
+                assigned to its segment by comparing it with the
+                breakpoints for its own parameters. The idf of a discrete
+                function is found by searching the cdf, and a form that
+                sympy cannot find in closed form is compiled numerically
+                for each combination of parameter values.
+    Arguments:  1. RVar: A random variable
+                2. kind: 'pdf','cdf','sf','hf','chf' or 'idf'
+                3. names: The names of the parameter symbols, in the
+                    order their values are passed to the evaluator
+    Output:     1. A function of the values and the parameter values
+                    that returns the broadcast numpy array
+    """
+    conversions={'pdf':PDF,'cdf':CDF,'sf':SF,'hf':HF,'chf':CHF,'idf':IDF}
+    bounds={'pdf':(0,0),'cdf':(0,1),'sf':(1,0),'hf':(0,np.nan),
+            'chf':(0,np.inf),'idf':(np.nan,np.nan)}
+    if RVar.ftype[0]=='discrete':
+        if len(names)>0:
+            err_string='the random variable does not have symbolic'
+            err_string+=' parameters'
+            raise RVError(err_string)
+        compiled=RVar.compile(kind)
+        return lambda values: compiled(values)
+    # Collect the parameter symbols of the random variable
+    symbols={}
+    for element in list(RVar.func)+list(RVar.support):
+        for symbol in getattr(S(element),'free_symbols',[]):
+            if symbol.name!='x':
+                symbols[symbol.name]=symbol
+    for name in names:
+        if name not in symbols:
+            err_string='%s is not a parameter of the random variable'%name
+            raise RVError(err_string)
+    missing=[name for name in symbols if name not in names]
+    if len(missing)>0:
+        err_string='no values were given for the parameters %s'%missing
+        raise RVError(err_string)
+    params=[symbols[name] for name in names]
+    integer=RVar.ftype[0]=='Discrete'
+    if integer==True and kind=='idf':
+        return parametric_inverse(RVar,names,params)
+    # sympy may be unable to find (or to invert) the form in the
+    #   parameters, such as the cdf of a laplace random variable
+    try:
+        X_dummy=conversions[kind](RVar)
+    except (NotImplementedError,RVError):
+        X_dummy=None
+    if X_dummy is None or any([S(piece).has(Integral)
+                               for piece in X_dummy.func]):
+        return substituted_evaluator(RVar,kind,params)
+    pieces=[]
+    for piece in X_dummy.func:
+        piece=S(piece)
+        # Replace any copy of x carrying assumptions with x
+        for symbol in piece.free_symbols:
+            if symbol.name=='x' and symbol!=x:
+                piece=piece.subs(symbol,x)
+        pieces.append(lambdify_array([x]+params,piece))
+    breaks=parametric_breaks(X_dummy.support,params)
+    below,above=bounds[kind]
+    def evaluate(values,*param_values):
+        arrays=broadcast_parameters(values,param_values)
+        points=arrays[0]
+        if integer==True:
+            points=np.floor(points)
+        edges=[np.broadcast_to(np.asarray(edge(*arrays[1:]),dtype=float),
+                               points.shape) for edge in breaks]
+        result=np.empty(points.shape)
+        result[points<edges[0]]=below
+        result[points>edges[-1]]=above
+        for i in range(len(pieces)):
+            inside=(points>=edges[i])&(points<edges[i+1])
+            # The right end point of the support belongs to the last
+            #   segment
+            if i==len(pieces)-1:
+                inside|=points==edges[i+1]
+            if inside.any():
+                result[inside]=pieces[i](points[inside],*[array[inside]
+                                          for array in arrays[1:]])
+        # The pdf of a discrete function is zero between the integers
+        if integer==True and kind=='pdf':
+            result[points!=arrays[0]]=0
+        return result
+    return evaluate
+
+def broadcast_parameters(values,param_values):
+    # Not intended for use by end user
+    """
+    Procedure Name: broadcast_parameters
+    Purpose: Broadcasts the points and the parameter values passed to a
+                parametric evaluator against each other
+    Arguments:  1. values: A number, list or array of points
+                2. param_values: A list of numbers, lists or arrays of
+                    parameter values
+    Output:     1. A list of float arrays of the broadcast shape, the
+                    points first
+    """
+    return np.broadcast_arrays(*([np.asarray(values,dtype=float)]+
+                                 [np.asarray(value,dtype=float)
+                                  for value in param_values]))
+
+def parametric_breaks(support,params):
+    # Not intended for use by end user
+    """
+    Procedure Name: parametric_breaks
+    Purpose: Compiles the end points of the segments of a support that
+                depends on symbolic parameters
+    Arguments:  1. support: The end points of the segments
+                2. params: The parameter symbols
+    Output:     1. A list of functions of the parameter values
+    """
+    breaks=[]
+    for value in support:
+        if value==oo:
+            value=np.inf
+        elif value==-oo:
+            value=-np.inf
+        breaks.append(lambdify_array(params,S(value)))
+    return breaks
+
+def parametric_inverse(RVar,names,params):
+    # Not intended for use by end user
+    """
+    Procedure Name: parametric_inverse
+    Purpose: Builds the idf evaluator of a discrete function with
+                symbolic parameters for compile_parametric, by searching
+                its compiled cdf (see discrete_inverse)
+    Arguments:  1. RVar: A discrete random variable in functional form
+                2. names: The names of the parameter symbols
+                3. params: The parameter symbols, in the same order
+    Output:     1. A function of the probabilities and the parameter
+                    values
+    """
+    cmf=compile_parametric(RVar,'cdf',names)
+    lower,upper=parametric_breaks([RVar.support[0],RVar.support[-1]],
+                                  params)
+    def evaluate(values,*param_values):
+        arrays=broadcast_parameters(values,param_values)
+        probs=arrays[0]
+        result=np.empty(probs.shape)
+        result[:]=np.nan
+        inside=(probs>=0)&(probs<=1)
+        if inside.any():
+            inner=[array[inside] for array in arrays[1:]]
+            bottom=np.zeros(probs.shape)+lower(*arrays[1:])
+            top=np.zeros(probs.shape)+upper(*arrays[1:])
+            result[inside]=discrete_inverse(lambda points:
+                                            cmf(points,*inner),
+                                            probs[inside],bottom[inside],
+                                            top[inside])
+        return result
+    return evaluate
+
+def substituted_evaluator(RVar,kind,params):
+    # Not intended for use by end user
+    """
+    Procedure Name: substituted_evaluator
+    Purpose: Builds an evaluator for compile_parametric when sympy cannot
+                find a functional form in closed form in the parameters
+                (it leaves an integral unevaluated or cannot invert the
+                cdf). The random variable is compiled (see compile_form,
+                which integrates and inverts numerically) once for each
+                distinct combination of parameter values.
+    Arguments:  1. RVar: A random variable with symbolic parameters
+                2. kind: 'pdf','cdf','sf','hf','chf' or 'idf'
+                3. params: The parameter symbols
+    Output:     1. A function of the values and the parameter values
+    """
+    def evaluate(values,*param_values):
+        arrays=broadcast_parameters(values,param_values)
+        points=arrays[0].ravel()
+        result=np.empty(points.shape)
+        if len(params)==0 or len(points)==0:
+            combos=np.zeros((1,len(params)))
+            index=np.zeros(len(points),dtype=int)
+        else:
+            combos,index=np.unique(np.stack([array.ravel()
+                                             for array in arrays[1:]],
+                                            axis=1),
+                                   axis=0,return_inverse=True)
+        for i in range(len(combos)):
+            values=dict(zip(params,combos[i]))
+            X_dummy=RV([S(func).subs(values) for func in RVar.func],
+                       [S(value).subs(values) for value in RVar.support],
+                       RVar.ftype)
+            mask=index==i
+            result[mask]=compile_form(X_dummy,kind)(points[mask])
+        return result.reshape(arrays[0].shape)
+    return evaluate
+
+def vectorize_evaluator(evaluate):
+    # Not intended for use by end user
+    """
+    Procedure Name: vectorize_evaluator
+    Purpose: Wraps a function of a one dimensional float array so that
+                it accepts numbers, lists and arrays of any shape
+    Arguments:  1. evaluate: A function of a one dimensional array
+    Output:     1. A function returning an array with the shape of
+                    its argument
+    """
+    def evaluator(values):
+        values=np.asarray(values,dtype=float)
+        result=evaluate(values.ravel())
+        return np.asarray(result,dtype=float).reshape(values.shape)
+    return evaluator
+
+@memoize_conversion('cdf')
+def CDF(RVar,value=x,cache=False,mode=None):
     """
     Procedure Name: CDF
     Purpose: Compute the cdf of a random variable
     Arguments:  1. RVar: A random variable
-                2. value: An integer or floating point number
+                2. value: An integer or floating point number, or a
+                    list or numpy array of numbers
                 3. cache: A binary variable. If True, the result will
                     be stored in memory for later use. (default is False)
+                4. mode: 'symbolic','numeric' or 'auto', the integration
+                    mode used for the value of the cdf of a continuous
+                    random variable (default is set by SetIntegrationMode)
     Output:     1. CDF of a random variable (if value not specified)
                 2. Value of the CDF at a given point
                     (if value is specified)
+                3. A numpy array of CDF values (if a list or array of
+                    values is specified)
     """
 
     # Check to make sure the value given is within the random
@@ -934,18 +1988,22 @@ def CDF(RVar,value=x,cache=False):
         else:
             return CDF(RVar.cache['cdf'],value)
 
+    # Use the closed form of a named distribution, if there is one
+    result=closed_form_conversion(RVar,'cdf',value,cache)
+    if result is not None:
+        return result
+
+    # If the value of the cdf of a continuous random variable is to be
+    #   found numerically, integrate the pdf up to the value
+    if value.__class__.__name__!='Symbol' and RVar.ftype[0]=='continuous':
+        if RVar.ftype[1]!='cdf' and resolve_mode(mode)!='symbolic':
+            X_dummy=PDF(RVar)
+            return integrate_segments(X_dummy.func,X_dummy.support,
+                                      upper=value,mode=mode)
+
     # If the distribution is continous, find and return the distribution
     #   of the random variable
     if RVar.ftype[0]=='continuous':
-        # Short-cut for Weibull, jump straight to the closed form CDF
-        if 'Weibull' in RVar.__class__.__name__:
-            if value == x:
-                Fx = RV(RVar.cdf,[0,oo],['continuous','cdf'])
-                return Fx
-            else:
-                return simplify(RVar.cdf.subs(x,value))
-
-        
         # If the random variable is already a cdf, nothing needs to
         #   be done
         if RVar.ftype[1]=='cdf':
@@ -955,7 +2013,7 @@ def CDF(RVar,value=x,cache=False):
                 for i in range(len(RVar.support)):
                     if value>=RVar.support[i] and value<=RVar.support[i+1]:
                         cdfvalue=RVar.func[i].subs(x,value)
-                        return simplify(cdfvalue)
+                        return cached_simplify(cdfvalue)
         # If the random variable is a sf, find and return the cdf of the
         #   random variable
         if RVar.ftype[0]=='sf':
@@ -975,7 +2033,7 @@ def CDF(RVar,value=x,cache=False):
                 for i in range(len(X_dummy.support)):
                     if value>=X_dummy.support[i] and value<=X_dummy.support[i+1]:
                         cdfvalue=cdflist[i].subs(x,value)
-                        return simplify(cdfvalue)
+                        return cached_simplify(cdfvalue)
         # If the random variable is not a cdf or sf, compute the pdf of
         #   the random variable, and then compute the cdf by integrating
         #   over each segment of the random variable
@@ -993,7 +2051,7 @@ def CDF(RVar,value=x,cache=False):
             # Integrate to find the cdf
             cdflist=[]
             for i in range(len(funclist)):
-                cdffunc=integrate(funclist[i],(t,X_dummy.support[i],x))
+                cdffunc=cached_integrate(funclist[i],(t,X_dummy.support[i],x))
                 # Adjust the constant of integration
                 if i!=0:
                     const=(cdflist[i-1].subs(x,X_dummy.support[i])-
@@ -1002,7 +2060,7 @@ def CDF(RVar,value=x,cache=False):
                 if i==0:
                     const=0-cdffunc.subs(x,X_dummy.support[i])
                     cdffunc=cdffunc+const
-                cdflist.append(simplify(cdffunc))
+                cdflist.append(cached_simplify(cdffunc))
             # If no value is specified, return the cdf
             if value==x:
                 cdffunc=RV(cdflist,X_dummy.support,['continuous','cdf'])
@@ -1014,7 +2072,7 @@ def CDF(RVar,value=x,cache=False):
                 for i in range(len(RVar.support)):
                     if value>=RVar.support[i] and value<=RVar.support[i+1]:
                         cdfvalue=cdflist[i].subs(x,value)
-                        return simplify(cdfvalue)
+                        return cached_simplify(cdfvalue)
 
     # If the distribution is in discrete functional, find and return the
     #   distribution of the random variable
@@ -1034,7 +2092,7 @@ def CDF(RVar,value=x,cache=False):
                 for i in range(len(RVar.support)):
                     if value>=RVar.support[i] and value<=RVar.support[i+1]:
                         cdfvalue=RVar.func[i].subs(x,value)
-                        return simplify(cdfvalue)
+                        return cached_simplify(cdfvalue)
         # If the random variable is a sf, find and return the cdf of the
         #   random variable
         if RVar.ftype[0]=='sf':
@@ -1054,7 +2112,7 @@ def CDF(RVar,value=x,cache=False):
                 for i in range(len(X_dummy.support)):
                     if value>=X_dummy.support[i] and value<=X_dummy.support[i+1]:
                         cdfvalue=cdflist[i].subs(x,value)
-                        return simplify(cdfvalue)
+                        return cached_simplify(cdfvalue)
         # If the random variable is not a cdf or sf, compute the pdf of
         #   the random variable, and then compute the cdf by summing
         #   over each segment of the random variable
@@ -1077,7 +2135,7 @@ def CDF(RVar,value=x,cache=False):
                 if i==0:
                     const=0-cdffunc.subs(x,X_dummy.support[i])
                     #cdffunc=cdffunc+const
-                cdflist.append(simplify(cdffunc))
+                cdflist.append(cached_simplify(cdffunc))
             # If no value is specified, return the cdf
             if value==x:
                 cdffunc=RV(cdflist,X_dummy.support,['Discrete','cdf'])
@@ -1089,7 +2147,7 @@ def CDF(RVar,value=x,cache=False):
                 for i in range(len(RVar.support)):
                     if value>=RVar.support[i] and value<=RVar.support[i+1]:
                         cdfvalue=cdflist[i].subs(x,value)
-                        return simplify(cdfvalue)
+                        return cached_simplify(cdfvalue)
                     
     # If the distribution is discrete, find and return the cdf of
     #   the random variable
@@ -1150,16 +2208,19 @@ def CDF(RVar,value=x,cache=False):
                             return X_dummy.func[i]
                 
 
+@memoize_conversion('chf')
 def CHF(RVar,value=x,cache=False):
     """
     Procedure Name: CHF
     Purpose: Compute the chf of a random variable
     Arguments:  1. RVar: A random variable
-                2. value: An integer or floating point number
-                    (optional)
+                2. value: An integer or floating point number, or a
+                    list or numpy array of numbers (optional)
     Output:     1. CHF of a random variable (if value not specified)
                 2. Value of the CHF at a given point
                     (if value is specified)
+                3. A numpy array of CHF values (if a list or array of
+                    values is specified)
     """
     
     # Check to make sure the value given is within the random
@@ -1190,7 +2251,7 @@ def CHF(RVar,value=x,cache=False):
                     if value>=RVar.support[i]:
                         if value<=RVar.support[i+1]:
                             chfvalue=RVar.func[i].subs(x,value)
-                            return simplify(chfvalue)
+                            return cached_simplify(chfvalue)
         # Otherwise, find and return the chf
         else:
             X_dummy=SF(RVar)
@@ -1202,7 +2263,7 @@ def CHF(RVar,value=x,cache=False):
             chffunc=[]
             for i in range(len(sflist)):
                 newfunc=-ln(sflist[i])
-                chffunc.append(simplify(newfunc))
+                chffunc.append(cached_simplify(newfunc))
             # If a value is not specified, return the chf of the
             #   random variable
             if value==x:
@@ -1212,10 +2273,10 @@ def CHF(RVar,value=x,cache=False):
                 return chffunc
             if value!=x:
                 for i in range(len(RVar.support)):
-                    if value>=RVar.func[i]:
+                    if value>=RVar.support[i]:
                         if value<=RVar.support[i+1]:
                             chfvalue=chffunc[i].subs(x,value)
-                            return simplify(chfvalue)
+                            return cached_simplify(chfvalue)
 
     # If the distribution is a discrete function, find and return the chf of
     #   the random variable
@@ -1236,7 +2297,7 @@ def CHF(RVar,value=x,cache=False):
                     if value>=RVar.support[i]:
                         if value<=RVar.support[i+1]:
                             chfvalue=RVar.func[i].subs(x,value)
-                            return simplify(chfvalue)
+                            return cached_simplify(chfvalue)
         # Otherwise, find and return the chf
         else:
             X_dummy=SF(RVar)
@@ -1248,7 +2309,7 @@ def CHF(RVar,value=x,cache=False):
             chffunc=[]
             for i in range(len(sflist)):
                 newfunc=-ln(sflist[i])
-                chffunc.append(simplify(newfunc))
+                chffunc.append(cached_simplify(newfunc))
             # If a value is not specified, return the chf of the
             #   random variable
             if value==x:
@@ -1258,10 +2319,10 @@ def CHF(RVar,value=x,cache=False):
                 return chfrv
             if value!=x:
                 for i in range(len(RVar.support)):
-                    if value>=RVar.func[i]:
+                    if value>=RVar.support[i]:
                         if value<=RVar.support[i+1]:
                             chfvalue=chffunc[i].subs(x,value)
-                            return simplify(chfvalue)
+                            return cached_simplify(chfvalue)
                     
     # If the random variable is discrete, find and return the chf
     if RVar.ftype[0]=='discrete':
@@ -1293,16 +2354,19 @@ def CHF(RVar,value=x,cache=False):
                     return chffunc[RVar.support.index(value)]
                     
 
+@memoize_conversion('hf')
 def HF(RVar,value=x,cache=False):
     """
     Procedure Name: HF
     Purpose: Compute the hf of a random variable
     Arguments:  1. RVar: A random variable
-                2. value: An integer or floating point number
-                    (optional)
+                2. value: An integer or floating point number, or a
+                    list or numpy array of numbers (optional)
     Output:     1. HF of a random variable (if value not specified)
                 2. Value of the HF at a given point
                     (if value is specified)
+                3. A numpy array of HF values (if a list or array of
+                    values is specified)
     """
     
     # Check to make sure the value given is within the random
@@ -1333,7 +2397,7 @@ def HF(RVar,value=x,cache=False):
                     if value>=RVar.support[i]:
                         if value<=RVar.support[i+1]:
                             hfvalue=RVar.func[i].subs(x,value)
-                            return simplify(hfvalue)
+                            return cached_simplify(hfvalue)
         # If the distribution is in chf form, use differentiation
         #   to find the hf
         if RVar.ftype[1]=='chf':
@@ -1353,7 +2417,7 @@ def HF(RVar,value=x,cache=False):
                     if value>=RVar.support[i]:
                         if value<=RVar.support[i+1]:
                             hfvalue=hflist[i].subs(x,value)
-                            return simplify(hfvalue)
+                            return cached_simplify(hfvalue)
         # In all other cases, use the pdf and the sf to find the hf
         else:
             X_pdf=PDF(RVar).func
@@ -1362,7 +2426,7 @@ def HF(RVar,value=x,cache=False):
             hflist=[]
             for i in range(len(RVar.func)):
                 hfunc=(X_pdf[i])/(X_sf[i])
-                hflist.append(simplify(hfunc))
+                hflist.append(cached_simplify(hfunc))
             if value==x:
                 hfrv=RV(hflist,RVar.support,['continuous','hf'])
                 if cache==True:
@@ -1373,7 +2437,7 @@ def HF(RVar,value=x,cache=False):
                     if value>=RVar.support[i]:
                         if value<=RVar.support[i+1]:
                             hfvalue=hflist[i].subs(x,value)
-                            return simplify(hfvalue)
+                            return cached_simplify(hfvalue)
 
     # If the distribution is a discrete function, find and return the hf of
     #   the random variable
@@ -1394,7 +2458,7 @@ def HF(RVar,value=x,cache=False):
                     if value>=RVar.support[i]:
                         if value<=RVar.support[i+1]:
                             hfvalue=RVar.func[i].subs(x,value)
-                            return simplify(hfvalue)
+                            return cached_simplify(hfvalue)
         # In all other cases, use the pdf and the sf to find the hf
         else:
             X_pdf=PDF(RVar).func
@@ -1403,7 +2467,7 @@ def HF(RVar,value=x,cache=False):
             hflist=[]
             for i in range(len(RVar.func)):
                 hfunc=(X_pdf[i])/(X_sf[i])
-                hflist.append(simplify(hfunc))
+                hflist.append(cached_simplify(hfunc))
             if value==x:
                 hfrv=RV(hflist,RVar.support,['Discrete','hf'])
                 if cache==True:
@@ -1414,7 +2478,7 @@ def HF(RVar,value=x,cache=False):
                     if value>=RVar.support[i]:
                         if value<=RVar.support[i+1]:
                             hfvalue=hflist[i].subs(x,value)
-                            return simplify(hfvalue)
+                            return cached_simplify(hfvalue)
 
     # If the random variable is discrete, find and return the hf
     if RVar.ftype[0]=='discrete':
@@ -1447,16 +2511,22 @@ def HF(RVar,value=x,cache=False):
                     return hffunc[X_pdf.support.index(value)]
 
 
+@time_limited
+@memoize_conversion('idf')
 def IDF(RVar,value=x,cache=False):
     """
     Procedure Name: IDF
     Purpose: Compute the idf of a random variable
     Arguments:  1. RVar: A random variable
-                2. value: An integer or floating point number
-                    (optional)
+                2. value: An integer or floating point number, or a
+                    list or numpy array of numbers (optional)
+                3. timeout: The seconds allowed for the computation, after
+                    which BudgetError is raised (keyword only, optional)
     Output:     1. IDF of a random variable (if value not specified)
                 2. Value of the IDF at a given point
                     (if value is specified)
+                3. A numpy array of IDF values (if a list or array of
+                    values is specified)
     """
     
     # Check to make sure the value given is within the random
@@ -1473,6 +2543,11 @@ def IDF(RVar,value=x,cache=False):
             return RVar.cache['idf']
         else:
             return IDF(RVar.cache['idf'],value)
+
+    # Use the closed form of a named distribution, if there is one
+    result=closed_form_conversion(RVar,'idf',value,cache)
+    if result is not None:
+        return result
         
     # If the distribution is continuous, find and return the idf
     #   of the random variable
@@ -1498,7 +2573,7 @@ def IDF(RVar,value=x,cache=False):
             # Check to see which of the candidate inverse functions is correct
             idffunc=[]
             for i in range(len(X_dummy.func)):
-                invlist=solve(X_dummy.func[i]-t,x)
+                invlist=cached_solve(X_dummy.func[i]-t,x)
                 if len(invlist)==1:
                     idffunc.append(invlist[0])
                 else:
@@ -1524,7 +2599,7 @@ def IDF(RVar,value=x,cache=False):
             idffunc2=[]
             for i in range(len(idffunc)):
                 func=idffunc[i].subs(t,x)
-                idffunc2.append(simplify(func))
+                idffunc2.append(cached_simplify(func))
             # Return the IDF
             idfrv=RV(idffunc2,idfsup,['continuous','idf'])
             if cache==True:
@@ -1538,7 +2613,7 @@ def IDF(RVar,value=x,cache=False):
             for i in range(len(X_dummy.support)):
                 if value>=X_dummy.support[i] and value<=X_dummy.support[i+1]:
                     idfvalue=X_dummy.func[i].subs(x,value)
-                    return simplify(idfvalue)
+                    return cached_simplify(idfvalue)
                 
     # If the distribution is a discrete function, find and return the idf
     #   of the random variable
@@ -1570,7 +2645,7 @@ def IDF(RVar,value=x,cache=False):
             # Check to see which of the candidate inverse functions is correct
             idffunc=[]
             for i in range(len(X_dummy.func)):
-                invlist=solve(X_dummy.func[i]-t,x)
+                invlist=cached_solve(X_dummy.func[i]-t,x)
                 if len(invlist)==1:
                     idffunc.append(invlist[0])
                 else:
@@ -1596,7 +2671,7 @@ def IDF(RVar,value=x,cache=False):
             idffunc2=[]
             for i in range(len(idffunc)):
                 func=idffunc[i].subs(t,x)
-                idffunc2.append(simplify(func))
+                idffunc2.append(cached_simplify(func))
             # Return the IDF
             idfsup[0] = 0
             idfrv=RV(idffunc2,idfsup,['Discrete','idf'])
@@ -1611,7 +2686,7 @@ def IDF(RVar,value=x,cache=False):
             for i in range(len(X_dummy.support)):
                 if value>=X_dummy.support[i] and value<=X_dummy.support[i+1]:
                     idfvalue=X_dummy.func[i].subs(x,value)
-                    return simplify(idfvalue)
+                    return cached_simplify(idfvalue)
             #varlist=RVar.variate(s=value)
             #return varlist[0]
 
@@ -1650,14 +2725,18 @@ def IDF(RVar,value=x,cache=False):
             
 
 
+@memoize_conversion('pdf')
 def PDF(RVar,value=x,cache=False):
     """
     Procedure Name: PDF
     Purpose: Compute the pdf of a random variable
     Arguments:  1. RVar: A random variable
-                2. value: An integer or floating point number (optional)
+                2. value: An integer or floating point number, or a
+                    list or numpy array of numbers (optional)
     Output:     1. PDF of a random variable (if value not specified)
                 2. Value of the PDF at a given point (if value is specified)
+                3. A numpy array of PDF values (if a list or array of
+                    values is specified)
     """
     
     # Check to make sure the value given is within the random
@@ -1686,7 +2765,7 @@ def PDF(RVar,value=x,cache=False):
                 for i in range(len(RVar.support)):
                     if value>=RVar.support[i] and value<=RVar.support[i+1]:
                         pdfvalue=RVar.func[i].subs(x,value)
-                        return simplify(pdfvalue)
+                        return cached_simplify(pdfvalue)
         # If the distribution is a hf or chf, use integration to find the pdf
         if RVar.ftype[1]=='hf' or RVar.ftype[1]=='chf':
             X_dummy=HF(RVar)
@@ -1698,7 +2777,8 @@ def PDF(RVar,value=x,cache=False):
             # Integrate the hazard function
             intlist=[]
             for i in range(len(hfsubslist)):
-                newfunc=integrate(hfsubslist[i],(t,X_dummy.support[i],x))
+                newfunc=cached_integrate(hfsubslist[i],
+                                         (t,X_dummy.support[i],x))
                 # Correct the constant of integration
                 if i!=0:
                     const=intlist[i-1].subs(x,X_dummy.support[i])
@@ -1707,12 +2787,12 @@ def PDF(RVar,value=x,cache=False):
                 if i==0:
                     const=0-newfunc.subs(x,X_dummy.support[i])
                     newfunc=newfunc+const
-                intlist.append(simplify(newfunc))
+                intlist.append(cached_simplify(newfunc))
             # Multiply to find the pdf
             pdffunc=[]
             for i in range(len(intlist)):
                 newfunc=X_dummy.func[i]*exp(-intlist[i])
-                pdffunc.append(simplify(newfunc))
+                pdffunc.append(cached_simplify(newfunc))
             if value==x:
                 pdfrv=RV(pdffunc,RVar.support,['continuous','pdf'])
                 if cache==True:
@@ -1723,7 +2803,7 @@ def PDF(RVar,value=x,cache=False):
                     if value>=X_dummy.support[i]:
                         if value<=X_dummy.support[i+1]:
                             pdfvalue=pdffunc[i].subs(x,value)
-                            return simplify(pdfvalue)
+                            return cached_simplify(pdfvalue)
         # In all other cases, find the pdf by differentiating the cdf
         else:
             X_dummy=CDF(RVar)
@@ -1742,7 +2822,7 @@ def PDF(RVar,value=x,cache=False):
                             if value<=X_dummy.support[i+1]:
                                 pdffunc=diff(X_dummy.func[i],x)
                                 pdfvalue=pdffunc.subs(x,value)
-                                return simplify(pdfvalue)
+                                return cached_simplify(pdfvalue)
 
     # If the distribution is a discrete function, find and return the pdf
     if RVar.ftype[0]=='Discrete':
@@ -1754,7 +2834,7 @@ def PDF(RVar,value=x,cache=False):
                 for i in range(len(RVar.support)):
                     if value>=RVar.support[i] and value<=RVar.support[i+1]:
                         pdfvalue=RVar.func[i].subs(x,value)
-                        return simplify(pdfvalue)
+                        return cached_simplify(pdfvalue)
         # If the support is finite, then convert to expanded form and compute
         #   the PDF
         if oo not in RVar.support:
@@ -1781,12 +2861,12 @@ def PDF(RVar,value=x,cache=False):
                 if i==0:
                     const=0-newfunc.subs(x,X_dummy.support[i])
                     newfunc=newfunc+const
-                intlist.append(simplify(newfunc))
+                intlist.append(cached_simplify(newfunc))
             # Multiply to find the pdf
             pdffunc=[]
             for i in range(len(intlist)):
                 newfunc=X_dummy.func[i]*exp(-sumlist[i])
-                pdffunc.append(simplify(newfunc))
+                pdffunc.append(cached_simplify(newfunc))
             if value==x:
                 pdfrv=RV(pdffunc,RVar.support,['Discrete','pdf'])
                 if cache==True:
@@ -1796,7 +2876,7 @@ def PDF(RVar,value=x,cache=False):
                 for i in range(len(X_dummy.support)):
                     if value>=X_dummy.support[i] and value<=X_dummy.support[i+1]:
                         pdfvalue=pdffunc[i].subs(x,value)
-                        return simplify(pdfvalue)
+                        return cached_simplify(pdfvalue)
         # In all other cases, find the pdf by differentiating the cdf
         else:
             X_dummy=CDF(RVar)
@@ -1806,7 +2886,7 @@ def PDF(RVar,value=x,cache=False):
                 for i in range(len(X_dummy.func)):
                     funcX1=X_dummy.func[i]
                     funcX0=X_dummy.func[i].subs(x,x-1)
-                    pmf=simplify(funcX1-funcX0)
+                    pmf=cached_simplify(funcX1-funcX0)
                     pdflist.append(pmf)
                 pdfrv=RV(pdflist,RVar.support,['Discrete','pdf'])
                 if cache==True:
@@ -1819,9 +2899,9 @@ def PDF(RVar,value=x,cache=False):
                             if value<=X_dummy.support[i+1]:
                                 funcX1=X_dummy.func[i]
                                 funcX0=X_dummy.func[i].subs(x,x-1)
-                                pmf=simplify(funcX1-funcX0)
+                                pmf=cached_simplify(funcX1-funcX0)
                                 pdfvalue=pmf.subs(x,value)
-                                return simplify(pdfvalue)
+                                return cached_simplify(pdfvalue)
                         
     # If the distribution is discrete, find and return the pdf of the
     # random variable
@@ -1856,14 +2936,18 @@ def PDF(RVar,value=x,cache=False):
                 else:
                     return pdffunc.func[X_dummy.support.index(value)]
 
+@memoize_conversion('sf')
 def SF(RVar,value=x,cache=False):
     """
     Procedure Name: SF
     Purpose: Compute the SF of a random variable
     Arguments:  1. RVar: A random variable
-                2. value: An integer or floating point number (optional)
+                2. value: An integer or floating point number, or a
+                    list or numpy array of numbers (optional)
     Output:     1. SF of a random variable (if value not specified)
                 2. Value of the SF at a given point (if value is specified)
+                3. A numpy array of SF values (if a list or array of
+                    values is specified)
     """
     
     # Check to make sure the value given is within the random
@@ -1881,6 +2965,11 @@ def SF(RVar,value=x,cache=False):
             return RVar.cache['sf']
         else:
             return SF(RVar.cache['sf'],value)
+
+    # Use the closed form of a named distribution, if there is one
+    result=closed_form_conversion(RVar,'sf',value,cache)
+    if result is not None:
+        return result
         
     # If the distribution is continuous, find and return the sf of the
     # random variable
@@ -2054,27 +3143,42 @@ def SF(RVar,value=x,cache=False):
                     return Xsf.func[Xsf.support.index(value)]
         
 
-def BootstrapRV(varlist,symbolic=False):
+def BootstrapRV(varlist,symbolic=False,numeric=False):
     """
     Procedure Name: Bootstrap RV
     Purpose: Generate a discrete random variable from a list of variates
     Arguments: 1. varlist: A list of variates
+               2. symbolic: Retained for compatibility
+               3. numeric: A binary variable. If True, the result is
+                    an array backed random variable (see DiscreteArrayRV)
+                    with float probabilities
     Output:    1. A discrete random variable, where each element in the
                     given variate list is equally probable
     """
-    # Sort the list of variables
-    varlist.sort()
     # Find the number of elements in the list of variates
     numel=len(varlist)
-    # Use varlist to generate the function and support for the random variable
-    #   Count number of times element appears in varlist, divide by number
-    #   of elements
-    funclist=[]
-    supplist=[]
-    for i in range(len(varlist)):
-        if varlist[i] not in supplist:
-            supplist.append(varlist[i])
-            funclist.append(Rational(varlist.count(varlist[i]),numel))
+    # Find the distinct values and the number of times each one
+    #   appears. Numerical samples of a single type are counted with
+    #   numpy, other samples (such as sympy numbers, or a mix of
+    #   integers and floats, which numpy would turn into floats) with
+    #   a dictionary. Neither changes the order of the caller's list.
+    values=np.asarray(varlist)
+    if isinstance(varlist,np.ndarray):
+        uniform=True
+    else:
+        uniform=len(set(type(value) for value in varlist))<=1
+    if uniform and values.ndim==1 and values.dtype.kind in 'biuf':
+        supplist,counts=np.unique(values,return_counts=True)
+        supplist=supplist.tolist()
+        counts=counts.tolist()
+    else:
+        supplist,counts=aggregate_discrete(varlist,[1]*numel)
+    # Divide the counts by the number of elements to find the
+    #   probability of each value
+    if numeric==True:
+        funclist=np.asarray(counts,dtype=float)/numel
+        return DiscreteArrayRV(funclist,supplist)
+    funclist=[Rational(count,numel) for count in counts]
     # Return the result as a discrete random variable
     return RV(funclist,supplist,['discrete','pdf'])
 
@@ -2123,17 +3227,84 @@ Procedures:
     8. MeanDiscrete(RVar)
     9. MGF(RVar)
     10. MinimumIID(RVar,n)
-    11. OrderStat(RVar,n,r)
-    12. Power(Rvar,n)
-    13. ProductIID(RVar,n)
-    14. Skewness(RVar)
-    15. SqRt(RVar)
-    16. Transform(RVar,gX)
-    17. Truncate(RVar,[lw,up])
-    18. Variance(RVar)
-    19. VarDiscrete(RVar)
+    11. Moments(RVar,k)
+    12. OrderStat(RVar,n,r)
+    13. Power(Rvar,n)
+    14. ProductIID(RVar,n)
+    15. Skewness(RVar)
+    16. SqRt(RVar)
+    17. Transform(RVar,gX)
+    18. Truncate(RVar,[lw,up])
+    19. Variance(RVar)
+    20. VarDiscrete(RVar)
 """
 
+def iid_power(RVar,n,operation,tag):
+    # Not intended for use by end user
+    """
+    Procedure Name: iid_power
+    Purpose: Combines n iid copies of a random variable with a binary
+                operation using repeated squaring, so that only O(log n)
+                operations are needed. The powers X, X.X, (X.X).(X.X), ...
+                are stored in the process-wide cache, so later calls with
+                a different n reuse them.
+    Arguments:  1. RVar: A random variable
+                2. n: A positive integer
+                3. operation: The binary operation (Convolution or Product)
+                4. tag: A label for the operation in the cache
+    Output:     1. The combination of n iid copies of the random variable
+    """
+    X_dummy=PDF(RVar)
+    # Array backed random variables are cheap to combine and expensive
+    #   to hash, so their powers are not cached
+    cacheable=not isinstance(X_dummy,DiscreteArrayRV)
+    power=X_dummy
+    result=None
+    size=1
+    while n>0:
+        if n%2==1:
+            if result is None:
+                result=power
+            else:
+                result=operation(result,power)
+        n=n//2
+        if n==0:
+            break
+        # Find the power with twice as many copies, from the cache if
+        #   it has already been computed
+        size=2*size
+        key=None
+        if cacheable==True:
+            key=structure_key(X_dummy,(tag,size))
+        entry=None
+        if key!=None:
+            entry=procedure_cache.get(key)
+        if entry!=None:
+            power=copy_power(entry)
+        else:
+            power=PDF(operation(power,power))
+            if key!=None:
+                procedure_cache.put(key,copy_power(power))
+    return result
+
+def copy_power(RVar):
+    # Not intended for use by end user
+    """
+    Procedure Name: copy_power
+    Purpose: Copies a random variable stored by iid_power. The copy
+                keeps the class of the original (a closed form rule may
+                return a named distribution, such as an ErlangRV) and is
+                given fresh lists, so callers are free to modify it
+    Arguments:  1. RVar: A random variable
+    Output:     1. A copy of the random variable
+    """
+    X_copy=copy.copy(RVar)
+    X_copy.func=list(RVar.func)
+    X_copy.support=list(RVar.support)
+    X_copy.ftype=list(RVar.ftype)
+    X_copy.cache=None
+    return X_copy
+
 def ConvolutionIID(RVar,n):
     """
     Procedure Name: ConvolutionIID
@@ -2146,19 +3317,22 @@ def ConvolutionIID(RVar,n):
     if type(n)!=int:
         raise RVError('The second argument must be an integer')
 
-    # Compute the iid convolution
-    X_dummy=PDF(RVar)
-    X_final=X_dummy
-    for i in range(n-1):
-        X_final+=X_dummy
-    return PDF(X_final)
+    if n<1:
+        raise RVError('The second argument must be positive')
 
-def CoefOfVar(RVar,cache=False):
+    # Compute the iid convolution by repeated squaring
+    return PDF(iid_power(RVar,n,Convolution,'convolutioniid'))
+
+def CoefOfVar(RVar,cache=False,mode=None):
     """
     Procedure Name: CoefOfVar
     Purpose: Compute the coefficient of variation of a random variable
     Arguments:  1. RVar: A random variable
-    Output:     1. The coefficient of variation
+                2. mode: 'symbolic','numeric' or 'auto', the integration
+                    mode for continuous random variables
+    Output:     1. The coefficient of variation, or a NumericValue
+                    carrying an error estimate if it was found by
+                    numerical integration
     """
     # If the input is a list of data, compute the CoefofVar
     #   for the data set
@@ -2171,21 +3345,28 @@ def CoefOfVar(RVar,cache=False):
     if RVar.cache != None and 'cov' in RVar.cache:
         return RVar.cache['cov']
     
-    # Compute the coefficient of varation
-    expect=Mean(RVar)
-    sig=Variance(RVar)
+    # Compute the coefficient of varation from the mean and the
+    #   variance, which use the closed forms of named distributions
+    expect=Mean(RVar,mode=mode)
+    sig=Variance(RVar,mode=mode)
     cov=(sqrt(sig))/expect
-    cov=simplify(cov)
+    cov=combine_values(cov,[(sig,abs(1/(2*sqrt(sig)*expect))),
+                            (expect,abs(sqrt(sig)/expect**2))])
+    if not isinstance(cov,NumericValue):
+        cov=cached_simplify(cov)
     if cache==True:
         RVar.add_to_cache('cov',cov)
     return cov
 
-def ExpectedValue(RVar,gX=x):
+def ExpectedValue(RVar,gX=x,mode=None):
     """
     Procedure Name: ExpectedValue
     Purpose: Computes the expected value of X
     Arguments:  1. RVar: A random variable
                 2. gX: A transformation of x
+                3. mode: 'symbolic','numeric' or 'auto', the integration
+                    mode for continuous random variables (default is set
+                    by SetIntegrationMode)
     Output:     1. E(gX)
     """
     # If the input is a list of data, compute the Expected Value
@@ -2196,14 +3377,27 @@ def ExpectedValue(RVar,gX=x):
     
     # Convert the random variable to its PDF form
     fx=PDF(RVar)
+    # If the random variable is array backed, evaluate g(x) over the
+    #   whole support and take the dot product with the probabilities
+    if isinstance(fx,DiscreteArrayRV):
+        gX=S(gX)
+        if fx.exact==True:
+            values=np.array([gX.subs(x,value) for value in fx.support],
+                            dtype=object)
+        else:
+            points=np.asarray(fx.support,dtype=float)
+            values=np.broadcast_to(lambdify_array(x,gX)(points),
+                                   points.shape)
+        Expect=np.dot(fx.func,values)
+        return cached_simplify(Expect)
     # If the distribution is continuous, compute the expected
     #   value
     if fx.ftype[0]=='continuous':
-        Expect=0
-        for i in range(len(fx.func)):
-            Expect+=integrate(gX*fx.func[i],
-                              (x,fx.support[i],fx.support[i+1]))
-        return simplify(Expect)
+        funclist=[gX*fx.func[i] for i in range(len(fx.func))]
+        Expect=integrate_segments(funclist,fx.support,mode=mode)
+        if isinstance(Expect,NumericValue):
+            return Expect
+        return cached_simplify(Expect)
 
     # If the distribution is a discrete function, compute the expected
     #   value
@@ -2212,7 +3406,7 @@ def ExpectedValue(RVar,gX=x):
         for i in range(len(fx.func)):
             Expect+=summation(gX*fx.func[i],
                               (x,fx.support[i],fx.support[i+1]))
-        return simplify(Expect)
+        return cached_simplify(Expect)
 
     # If the distribution is discrete, compute the expected
     #   value
@@ -2223,13 +3417,15 @@ def ExpectedValue(RVar,gX=x):
         fx_trans = RV(fx.func,fx_support,fx.ftype)
         #fx_trans=Transform(fx,[[gX],[-oo,oo]])
         Expect=MeanDiscrete(fx_trans)
-        return simplify(Expect)
+        return cached_simplify(Expect)
 
-def Entropy(RVar,cache=False):
+def Entropy(RVar,cache=False,mode=None):
     """
     Procedure Name: Entropy
     Purpose: Compute the entory of a random variable
     Arguments:  1. RVar: A random variable
+                2. mode: 'symbolic','numeric' or 'auto', the integration
+                    mode for continuous random variables
     Output:     1. The entropy of a random variable
     """
     # If the input is a list of data, compute the entropy
@@ -2243,18 +3439,23 @@ def Entropy(RVar,cache=False):
     if RVar.cache != None and 'entropy' in RVar.cache:
         return RVar.cache['entropy']
     
-    entropy=ExpectedValue(RVar,log(x,2))
-    entropy=simplify(entropy)
+    entropy=ExpectedValue(RVar,log(x,2),mode)
+    if not isinstance(entropy,NumericValue):
+        entropy=cached_simplify(entropy)
     if cache==True:
         RVar.add_to_cache('entropy',entropy)
-    return simplify(entropy)
+    return entropy
 
-def Kurtosis(RVar,cache=False):
+def Kurtosis(RVar,cache=False,mode=None):
     """
     Procedure Name: Kurtosis
     Purpose: Compute the Kurtosis of a random variable
     Arguments:  1. RVar: A random variable
-    Output:     1. The kurtosis of a random variable
+                2. mode: 'symbolic','numeric' or 'auto', the integration
+                    mode for continuous random variables
+    Output:     1. The kurtosis of a random variable, or a NumericValue
+                    carrying an error estimate if it was found by
+                    numerical integration
     """
     # If the input is a list of data, compute the kurtosis
     #   for the data set
@@ -2266,20 +3467,89 @@ def Kurtosis(RVar,cache=False):
     #   retriew the value of the kurtosis and return in.
     if RVar.cache != None and 'kurtosis' in RVar.cache:
         return RVar.cache['kurtosis']
+
+    # Use the closed form of a named distribution, if there is one
+    kurt=closed_form(RVar,'kurtosis')
+    if kurt is not None:
+        if cache==True:
+            RVar.add_to_cache('kurtosis',kurt)
+        return kurt
     
-    # Compute the kurtosis
-    expect=Mean(RVar)
-    sig=sqrt(Variance(RVar))
-    Term1=ExpectedValue(RVar,x**4)
-    Term2=4*expect*ExpectedValue(RVar,x**3)
-    Term3=6*(expect**2)*ExpectedValue(RVar,x**2)
+    # Compute the kurtosis from the first four moments. The errors of
+    #   numerical moments are carried over to the kurtosis.
+    moments=Moments(RVar,4,mode=mode)
+    expect=moments[0]
+    var=moments[1]-expect**2
+    sig=sqrt(var)
+    Term1=moments[3]
+    Term2=4*expect*moments[2]
+    Term3=6*(expect**2)*moments[1]
     Term4=3*expect**4
-    kurt=(Term1-Term2+Term3-Term4)/(sig**4)
-    kurt=simplify(kurt)
-
+    central=Term1-Term2+Term3-Term4
+    kurt=central/(sig**4)
+    kurt=combine_values(kurt,[(moments[3],1/var**2),
+                              (moments[2],abs(4*expect/var**2)),
+                              (moments[1],abs(6*expect**2/var**2-
+                                              2*central/var**3)),
+                              (moments[0],abs((12*expect*moments[1]-
+                                               4*moments[2]-
+                                               12*expect**3)/var**2+
+                                              4*expect*central/var**3))])
+    if not isinstance(kurt,NumericValue):
+        kurt=cached_simplify(kurt)
     if cache==True:
         RVar.add_to_cache('kurtosis',kurt)
-    return simplify(kurt)
+    return kurt
+
+def extreme_iid(RVar,n,extreme):
+    # Not intended for use by end user
+    """
+    Procedure Name: extreme_iid
+    Purpose: Computes the maximum or minimum of n iid random variables
+                in closed form. The maximum has cdf F(x)**n and the
+                minimum has cdf 1-(1-F(x))**n, so each segment of the cdf
+                is transformed and converted back to a pdf once. The
+                result is stored in the process-wide cache.
+    Arguments:  1. RVar: A random variable
+                2. n: A positive integer
+                3. extreme: 'maximum' or 'minimum'
+    Output:     1. The pdf of the maximum or minimum
+    """
+    if n<1:
+        raise RVError('The second argument must be positive')
+    key=None
+    if not isinstance(RVar,DiscreteArrayRV):
+        key=structure_key(RVar,(extreme+'iid',n))
+    if key!=None:
+        entry=procedure_cache.get(key)
+        if entry!=None:
+            return RV(list(entry[0]),list(entry[1]),list(entry[2]))
+
+    # The cdf of an explicit discrete random variable is defined at its
+    #   support points, so the minimum uses 1-(1-F(x))**n there
+    X_dummy=CDF(RVar)
+    if isinstance(X_dummy,DiscreteArrayRV):
+        if extreme=='maximum':
+            funclist=X_dummy.func**n
+        else:
+            funclist=1-(1-X_dummy.func)**n
+        return PDF(DiscreteArrayRV(funclist,X_dummy.support,
+                                   ['discrete','cdf'],X_dummy.exact))
+    if X_dummy.ftype[0]=='discrete':
+        if extreme=='maximum':
+            funclist=[value**n for value in X_dummy.func]
+        else:
+            funclist=[1-(1-value)**n for value in X_dummy.func]
+    elif extreme=='maximum':
+        funclist=[cached_simplify(value**n) for value in X_dummy.func]
+    else:
+        funclist=[cached_simplify(1-(1-value)**n) for value in X_dummy.func]
+    X_final=PDF(RV(funclist,X_dummy.support,[X_dummy.ftype[0],'cdf']))
+    if key!=None:
+        procedure_cache.put(key,(tuple(X_final.func),
+                                 tuple(X_final.support),
+                                 tuple(X_final.ftype)))
+    return X_final
 
 def MaximumIID(RVar,n=Symbol('n')):
     """
@@ -2299,20 +3569,20 @@ def MaximumIID(RVar,n=Symbol('n')):
     #   efficient than using the for loop for non symbolic parameters)
     if n.__class__.__name__=='Symbol':
         return OrderStat(RVar,n,n)
-    # Compute the iid maximum
+    # Compute the iid maximum from F(x)**n
     else:
-        X_dummy=RVar
-        X_final=X_dummy
-        for i in range(n-1):
-            X_final=Maximum(X_final,X_dummy)
-        return PDF(X_final)
+        return extreme_iid(RVar,n,'maximum')
 
-def Mean(RVar,cache=False):
+def Mean(RVar,cache=False,mode=None):
     """
     Procedure Name: Mean
     Purpose: Compute the mean of a random variable
     Arguments: 1. RVar: A random variable
-    Output:    1. The mean of a random variable
+               2. mode: 'symbolic','numeric' or 'auto', the integration
+                    mode for continuous random variables
+    Output:    1. The mean of a random variable, or a NumericValue
+                    carrying an error estimate if it was found by
+                    numerical integration
     """
     # If the input is a list of data, compute the mean
     #   for the data set
@@ -2325,62 +3595,16 @@ def Mean(RVar,cache=False):
     if RVar.cache != None and 'mean' in RVar.cache:
         return RVar.cache['mean']
     
-    # Find the PDF of the random variable
-
-    # If the random variable is continuous, find and return the mean
-    X_dummy=PDF(RVar)
-    if X_dummy.ftype[0]=='continuous':
-        # Create list of x*f(x)
-        meanfunc=[]
-        for i in range(len(X_dummy.func)):
-            meanfunc.append(x*X_dummy.func[i])
-        # Integrate to find the mean
-        meanval=0
-        for i in range(len(X_dummy.func)):
-            val=integrate(meanfunc[i],(x,X_dummy.support[i],
-                                       X_dummy.support[i+1]))
-            meanval+=val
-        meanval=simplify(meanval)
-        if cache==True:
-            RVar.add_to_cache('mean',meanval)
-        return simplify(meanval)
-
-    # If the random variable is a discrete function, find and return the mean
-    if X_dummy.ftype[0]=='Discrete':
-        # Create list of x*f(x)
-        meanfunc=[]
-        for i in range(len(X_dummy.func)):
-            meanfunc.append(x*X_dummy.func[i])
-        # Sum to find the mean
-        meanval=0
-        for i in range(len(X_dummy.func)):
-            val=Sum(meanfunc[i],(x,X_dummy.support[i],
-                                       X_dummy.support[i+1])).doit()
-            meanval+=val
-        meanval=simplify(meanval)
-        if cache==True:
-            RVar.add_to_cache('mean',meanval)
-        return simplify(meanval)
-
-    # If the random variable is discrete, find and return the variance
-    if X_dummy.ftype[0]=='discrete':
-        meanval=MeanDiscrete(RVar)
-        if cache==True:
-            RVar.add_to_cache('mean',meanval)
-        return simplify(meanval)
-        #
-        # Legacy mean code ... update uses faster numpy implementation
-        #
-        # Create a list of x*f(x)
-        #meanlist=[]
-        #for i in range(len(X_dummy.func)):
-        #    meanlist.append(X_dummy.func[i]*X_dummy.support[i])
-        # Sum to find the mean
-        #meanval=0
-        #for i in range(len(meanlist)):
-        #    meanval+=meanlist[i]
-        #return simplify(meanval)
-
+    # Use the closed form of a named distribution, if there is one,
+    #   otherwise find the mean from the (cached) moments
+    meanval=closed_form(RVar,'mean')
+    if meanval is None:
+        meanval=Moments(RVar,1,mode=mode)[0]
+    if not isinstance(meanval,NumericValue):
+        meanval=cached_simplify(meanval)
+    if cache==True:
+        RVar.add_to_cache('mean',meanval)
+    return meanval
 
 def MeanDiscrete(RVar):
     """
@@ -2423,9 +3647,16 @@ def MGF(RVar,cache=False):
     #   retriew the value of the MGF and return in.
     if RVar.cache != None and 'mgf' in RVar.cache:
         return RVar.cache['mgf']
+
+    # Use the closed form of a named distribution, if there is one
+    mgf=closed_form(RVar,'mgf')
+    if mgf is not None:
+        if cache==True:
+            RVar.add_to_cache('mgf',mgf)
+        return mgf
     
     mgf=ExpectedValue(RVar,exp(t*x))
-    mgf=simplify(mgf)
+    mgf=cached_simplify(mgf)
     if cache==True:
         RVar.add_to_cache('mgf',mgf)
     return mgf
@@ -2443,18 +3674,161 @@ def MinimumIID(RVar,n):
         if n.__class__.__name__!='Symbol':
             raise RVError('The second argument must be an integer')
 
-    # If n is symbolic, find and return the maximum using
-    #   OrderStat (may need to test and see if this is more
-    #   efficient than using the for loop for non symbolic parameters)
+    # If n is symbolic, find and return the minimum as the first
+    #   of n order statistics, OrderStat(RVar,n,1)
     if n.__class__.__name__=='Symbol':
-        return OrderStat(RVar,1,n)
-    # Compute the iid minimum
+        return OrderStat(RVar,n,1)
+    # Compute the iid minimum from 1-(1-F(x))**n
     else:
-        X_dummy=RVar
-        X_final=X_dummy
-        for i in range(n-1):
-            X_final=Minimum(X_final,X_dummy)
-        return PDF(X_final)
+        return extreme_iid(RVar,n,'minimum')
+
+def closed_moments(RVar,k):
+    # Not intended for use by end user
+    """
+    Procedure Name: closed_moments
+    Purpose: Finds the moments about the origin of a named distribution
+                from the closed forms of its mean, variance, skewness and
+                kurtosis, and the higher moments from the derivatives of
+                its moment generating function at zero
+    Arguments:  1. RVar: A random variable
+                2. k: The number of moments
+    Output:     1. A list of the first moments that have closed forms,
+                    which is empty if there are none
+    """
+    values=[]
+    for name in ['mean','variance','skewness','kurtosis'][:k]:
+        value=closed_form(RVar,name)
+        if value is None:
+            break
+        values.append(S(value))
+    moments=[]
+    if len(values)>=1:
+        mean=values[0]
+        moments.append(mean)
+    if len(values)>=2:
+        var=values[1]
+        moments.append(var+mean**2)
+    if len(values)>=3:
+        # E((X-mu)^3) is the skewness times the cube of the standard
+        #   deviation
+        third=values[2]*var**Rational(3,2)
+        moments.append(third+3*mean*var+mean**3)
+    if len(values)>=4:
+        moments.append(values[3]*var**2+4*mean*third+6*mean**2*var+
+                       mean**4)
+    mgf=closed_form(RVar,'mgf')
+    if mgf is not None:
+        for j in range(len(moments)+1,k+1):
+            moment=diff(mgf,t,j).subs(t,0)
+            if not moment.is_finite:
+                break
+            moments.append(moment)
+    return [cached_simplify(moment) for moment in moments]
+
+def Moments(RVar,k=4,cache=False,mode=None):
+    """
+    Procedure Name: Moments
+    Purpose: Compute the first k moments about the origin of a random
+                variable. The random variable is converted to its pdf
+                once, and the moments are kept in the process-wide
+                cache, so Mean, Variance, Skewness, Kurtosis and
+                CoefOfVar share one computation. Only the moments that
+                are not already known are computed. Named distributions
+                use their closed forms and moment generating function,
+                and numerical moments are integrated in one pass.
+    Arguments:  1. RVar: A random variable
+                2. k: The number of moments
+                3. cache: A binary variable. If True, the moments are
+                    also stored on the random variable
+                4. mode: 'symbolic','numeric' or 'auto', the integration
+                    mode for continuous random variables
+    Output:     1. A list [E(X),E(X^2),...,E(X^k)]
+    """
+    # If the input is a list of data, compute the moments
+    #   for the data set
+    if type(RVar)==list:
+        Xstar=BootstrapRV(RVar)
+        return Moments(Xstar,k)
+
+    # Retrieve the moments that have already been computed. Moments
+    #   found numerically are stored separately from exact ones.
+    mode=resolve_mode(mode)
+    name='moments'
+    if mode!='symbolic':
+        name='moments_'+mode
+    moments=[]
+    key=None
+    if not isinstance(RVar,DiscreteArrayRV):
+        key=structure_key(RVar,(name,))
+    if RVar.cache != None and name in RVar.cache:
+        moments=list(RVar.cache[name])
+    elif key!=None:
+        moments=list(procedure_cache.get(key,()))
+    # A named distribution gives its moments in closed form, without
+    #   converting it to a pdf
+    if len(moments)<k:
+        closed=closed_moments(RVar,k)
+        if len(closed)>len(moments):
+            moments=closed
+    if len(moments)>=k:
+        if key!=None:
+            procedure_cache.put(key,tuple(moments))
+        return moments[:k]
+
+    # Find the PDF of the random variable. A discrete function with a
+    #   finite, numeric support is summed as an explicit distribution
+    X_dummy=PDF(RVar)
+    if X_dummy.ftype[0]=='Discrete':
+        numeric=True
+        for bound in X_dummy.support:
+            if bound in [-oo,oo]:
+                numeric=False
+            elif len(getattr(bound,'free_symbols',set()))>0:
+                numeric=False
+        if numeric:
+            X_dummy=PDF(Convert(X_dummy))
+    for j in range(len(moments)+1,k+1):
+        # If the random variable is continuous, integrate x^j*f(x)
+        #   over each segment. Numerical moments (in numeric mode, or
+        #   once sympy has fallen back to them) are found together in
+        #   one pass over the segments.
+        if X_dummy.ftype[0]=='continuous':
+            if mode=='numeric' or (len(moments)>0 and
+                                   isinstance(moments[-1],NumericValue)):
+                rest=integrate_moments(X_dummy.func,X_dummy.support,
+                                       range(j,k+1))
+                if rest!=None:
+                    moments+=rest
+                    break
+            funclist=[(x**j)*func for func in X_dummy.func]
+            moment=integrate_segments(funclist,X_dummy.support,mode=mode)
+        # If the random variable is a discrete function, sum x^j*f(x)
+        #   over each segment
+        elif X_dummy.ftype[0]=='Discrete':
+            moment=0
+            for i in range(len(X_dummy.func)):
+                moment+=summation((x**j)*X_dummy.func[i],
+                                  (x,X_dummy.support[i],
+                                   X_dummy.support[i+1]))
+        # If the random variable is discrete, use numpy to sum x^j*f(x)
+        #   over the support. The powers are taken in floating point,
+        #   or with exact numbers if the pdf is exact, so that large
+        #   integer supports do not overflow
+        else:
+            pdf=np.asarray(X_dummy.func)
+            if pdf.dtype==object:
+                support=np.asarray(X_dummy.support,dtype=object)
+            else:
+                support=np.asarray(X_dummy.support,dtype=float)
+            moment=np.multiply(support**j,pdf).sum()
+        if not isinstance(moment,NumericValue):
+            moment=cached_simplify(moment)
+        moments.append(moment)
+    if key!=None:
+        procedure_cache.put(key,tuple(moments))
+    if cache==True:
+        RVar.add_to_cache(name,moments)
+    return moments
 
 def NextCombination(Previous,N):
     """
@@ -2535,6 +3909,7 @@ def NextPermutation(Previous):
                     Next[m]=Temp2[n+indx-m]
     return(Next)
             
+@time_limited
 def OrderStat(RVar,n,r,replace='w'):
     """
     Procedure Name: OrderStat
@@ -2543,6 +3918,8 @@ def OrderStat(RVar,n,r,replace='w'):
     Arguments:  1. RVar: A random variable
                 2. n: The number of items randomly drawn from the rv
                 3. r: The index of the order statistic
+                4. timeout: The seconds allowed for the computation, after
+                    which BudgetError is raised (keyword only, optional)
     Output:     1. The desired r out of n OrderStatistic
     """
     if r.__class__.__name__!='Symbol' and n.__class__.__name__!='Symbol':
@@ -2572,10 +3949,30 @@ def OrderStat(RVar,n,r,replace='w'):
             Fx=cdf_dummy.func[i]
             Sx=sf_dummy.func[i]
             ordfunc=const*(Fx**(r-1))*(Sx**(n-r))*fx
-            ordstat_func.append(simplify(ordfunc))
+            ordstat_func.append(cached_simplify(ordfunc))
         # Return the distribution of the order statistic
         return RV(ordstat_func,RVar.support,['continuous','pdf'])
 
+    # If the random variable is array backed, find the cdf of the order
+    #   statistic from the binomial probability that at least r of the
+    #   n draws are at most each support value
+    if isinstance(RVar,DiscreteArrayRV):
+        X_dummy=RVar.convert('cdf')
+        if replace=='wo':
+            return OrderStat(RV(list(PDF(RVar).func),list(X_dummy.support),
+                                ['discrete','pdf']),n,r,replace)
+        Fx=X_dummy.func
+        OSprob=0
+        for j in range(r,n+1):
+            if X_dummy.exact==True:
+                const=binomial(n,j)
+            else:
+                const=float(binomial(n,j))
+            OSprob=OSprob+const*(Fx**j)*((1-Fx)**(n-j))
+        OSproblist=np.diff(np.concatenate([[0],OSprob]))
+        return DiscreteArrayRV(OSproblist,X_dummy.support,
+                               exact=X_dummy.exact)
+
     # If the distribution is in discrete symbolic form, convert it to
     #   discrete explicit form and find the order statistic
     if RVar.ftype[0]=='Discrete':
@@ -2749,12 +4146,11 @@ def ProductIID(RVar,n):
     if type(n)!=int:
         raise RVError('The second argument must be an integer')
 
-    # Compute the iid convolution
-    X_dummy=PDF(RVar)
-    X_final=X_dummy
-    for i in range(n-1):
-        X_final*=X_dummy
-    return PDF(X_final)
+    if n<1:
+        raise RVError('The second argument must be positive')
+
+    # Compute the iid product by repeated squaring
+    return PDF(iid_power(RVar,n,Product,'productiid'))
 
 def RangeStat(RVar,n,replace='w'):
     """
@@ -2785,7 +4181,7 @@ def RangeStat(RVar,n,replace='w'):
         nsegs = len(FX.func)
         fXRange = []
         for i in range(nsegs):
-            ffX = integrate( n*(n-1)*
+            ffX = cached_integrate( n*(n-1)*
                              (FX.func[i].subs(x,z) -
                               FX.func[i].subs(x,z-x))**(n-2)
                              *fX.func[i].subs(x,z-x)
@@ -2882,12 +4278,16 @@ def RangeStat(RVar,n,replace='w'):
                 
 
 
-def Skewness(RVar,cache=False):
+def Skewness(RVar,cache=False,mode=None):
     """
     Procedure Name: Skewness
     Purpose: Compute the skewness of a random variable
     Arguments:  1. RVar: A random variable
-    Output:     1. The skewness of the random variable
+                2. mode: 'symbolic','numeric' or 'auto', the integration
+                    mode for continuous random variables
+    Output:     1. The skewness of the random variable, or a NumericValue
+                    carrying an error estimate if it was found by
+                    numerical integration
     """
     # If the input is a list of data, compute the Skewness
     #   for the data set
@@ -2899,18 +4299,36 @@ def Skewness(RVar,cache=False):
     #   retriew the value of the skewness and return in.
     if RVar.cache != None and 'skewness' in RVar.cache:
         return RVar.cache['skewness']
+
+    # Use the closed form of a named distribution, if there is one
+    skew=closed_form(RVar,'skewness')
+    if skew is not None:
+        if cache==True:
+            RVar.add_to_cache('skewness',skew)
+        return skew
     
-    # Compute the skewness
-    expect=Mean(RVar)
-    sig=sqrt(Variance(RVar))
-    Term1=ExpectedValue(RVar,x**3)
-    Term2=3*expect*ExpectedValue(RVar,x**2)
+    # Compute the skewness from the first three moments. The errors of
+    #   numerical moments are carried over to the skewness.
+    moments=Moments(RVar,3,mode=mode)
+    expect=moments[0]
+    var=moments[1]-expect**2
+    sig=sqrt(var)
+    Term1=moments[2]
+    Term2=3*expect*moments[1]
     Term3=2*expect**3
-    skew=(Term1-Term2+Term3)/(sig**3)
-    skew=simplify(skew)
+    central=Term1-Term2+Term3
+    skew=central/(sig**3)
+    skew=combine_values(skew,[(moments[2],1/sig**3),
+                              (moments[1],abs(3*expect/sig**3+
+                                              3*central/(2*sig**5))),
+                              (moments[0],abs((6*expect**2-3*moments[1])/
+                                              sig**3+
+                                              3*expect*central/sig**5))])
+    if not isinstance(skew,NumericValue):
+        skew=cached_simplify(skew)
     if cache==True:
         RVar.add_to_cache('skewness',skew)
-    return simplify(skew)
+    return skew
 
 def Sqrt(RVar):
     """
@@ -2928,6 +4346,7 @@ def Sqrt(RVar):
     NewRvar=Transform(RVar,u)
     return NewRvar           
 
+@time_limited
 def Transform(RVar,gXt):
     """
     Procedure Name: Transform
@@ -2935,6 +4354,8 @@ def Transform(RVar,gXt):
                 by a a function g(x)
     Arguments:  1. RVar: A random variable
                 2. gX: A transformation in list of two lists format
+                3. timeout: The seconds allowed for the computation, after
+                    which BudgetError is raised (keyword only, optional)
     Output:     1. The transformation of RVar       
     """
     
@@ -3042,8 +4463,10 @@ def Transform(RVar,gXt):
                 c=gX[1][i]+1
             else:
                 c=(gX[1][i]+gX[1][i+1])/2
-            # Create a list of possible inverses
-            invlist=solve(gX[0][i]-t,x)           
+            # Create a list of possible inverses, unless the time
+            #   budget has run out
+            checkpoint()
+            invlist=cached_solve(gX[0][i]-t,x)
             # Use the test point to determine the correct inverse
             for j in range(len(invlist)):
                 # If g-1(g(c))=c, then the inverse is correct
@@ -3085,8 +4508,9 @@ def Transform(RVar,gXt):
         # Substitute x into the transformed random variable
         trans_func2=[]
         for i in range(len(trans_func)):
+            checkpoint()
             if type(trans_func[i]) not in [int,float]:
-                trans_func2.append(simplify(trans_func[i].subs(t,x)))
+                trans_func2.append(cached_simplify(trans_func[i].subs(t,x)))
             else:
                 trans_func2.append(trans_func[i])
         # Create and return the random variable
@@ -3142,12 +4566,14 @@ def Transform(RVar,gXt):
         # Return the transformed random variable
         return RV(funclist2,translist2,['discrete','pdf'])
 
-def Truncate(RVar,supp):
+def Truncate(RVar,supp,mode=None):
     """
     Procedure Name: Truncate
     Purpose: Truncate a random variable
     Arguments: 1. RVar: A random variable
                2. supp: The support of the truncated random variable
+               3. mode: 'symbolic','numeric' or 'auto', the integration
+                    mode used for the area of a continuous random variable
     Output:    1. A truncated random variable
     """
     # Check to make sure the support of the truncated random
@@ -3157,13 +4583,17 @@ def Truncate(RVar,supp):
     
     # Conver the random variable to its pdf form
     X_dummy=PDF(RVar)
-    cdf_dummy=CDF(RVar)
 
     # If the random variable is continuous, find and return
     #   the truncated random variable
     if RVar.ftype[0]=='continuous':
         # Find the area of the truncated random variable
-        area=CDF(cdf_dummy,supp[1])-CDF(cdf_dummy,supp[0])
+        if resolve_mode(mode)=='symbolic':
+            cdf_dummy=CDF(RVar)
+            area=CDF(cdf_dummy,supp[1])-CDF(cdf_dummy,supp[0])
+        else:
+            area=integrate_segments(X_dummy.func,X_dummy.support,
+                                    supp[0],supp[1],mode)
         #area=0
         #for i in range(len(X_dummy.func)):
         #    val=integrate(X_dummy.func[i],(x,X_dummy.support[i],
@@ -3182,7 +4612,7 @@ def Truncate(RVar,supp):
         truncfunc=[]
         for i in range(len(X_dummy.func)):
             if i>=lwindx and i<=upindx:
-                truncfunc.append(simplify(X_dummy.func[i]/area))
+                truncfunc.append(cached_simplify(X_dummy.func[i]/area))
         truncsupp=[supp[0]]
         upindx+=1
         for i in range(len(X_dummy.support)):
@@ -3196,6 +4626,7 @@ def Truncate(RVar,supp):
     #   the truncated random variable
     if RVar.ftype[0]=='Discrete':
         # Find the area of the truncated random variable
+        cdf_dummy=CDF(RVar)
         area=CDF(cdf_dummy,supp[1])-CDF(cdf_dummy,supp[0])
         # Cut out parts of the distribution that don't fall
         #   within the new limits
@@ -3241,12 +4672,16 @@ def Truncate(RVar,supp):
         return RV(truncfunc,truncsupp,['discrete','pdf'])     
 
 
-def Variance(RVar,cache=False):
+def Variance(RVar,cache=False,mode=None):
     """
     Procedure Name: Variance
     Purpose: Compute the variance of a random variable
     Arguments: 1. RVar: A random variable
-    Output:    1. The variance of a random variable
+               2. mode: 'symbolic','numeric' or 'auto', the integration
+                    mode for continuous random variables
+    Output:    1. The variance of a random variable, or a NumericValue
+                    carrying an error estimate if it was found by
+                    numerical integration
     """
     # If the input is a list of data, compute the variance
     #   for the data set
@@ -3259,76 +4694,25 @@ def Variance(RVar,cache=False):
     if RVar.cache != None and 'variance' in RVar.cache:
         return RVar.cache['variance']
     
-    # Find the PDF of the random variable
-    X_dummy=PDF(RVar)
-    # If the random variable is continuous, find and return the variance
-    if X_dummy.ftype[0]=='continuous':
-        # Find the mean of the random variable
-        EX=Mean(X_dummy)
-        # Find E(X^2)
-        # Create list of (x**2)*f(x)
-        varfunc=[]
-        for i in range(len(X_dummy.func)):
-            varfunc.append((x**2)*X_dummy.func[i])
-        # Integrate to find E(X^2)
-        exxval=0
-        for i in range(len(X_dummy.func)):
-            val=integrate(varfunc[i],(x,X_dummy.support[i],
-                                      X_dummy.support[i+1]))
-            exxval+=val
-        # Find Var(X)=E(X^2)-E(X)^2
-        var=exxval-(EX**2)
-        var=simplify(var)
-        if cache==True:
-            RVar.add_to_cache('variance',var)
-        return simplify(var)
-
-    # If the random variable is a discrete function, find and return
-    # the variance
-    if X_dummy.ftype[0]=='Discrete':
-        # Find the mean of the random variable
-        EX=Mean(X_dummy)
-        # Find E(X^2)
-        # Create list of (x**2)*f(x)
-        varfunc=[]
-        for i in range(len(X_dummy.func)):
-            varfunc.append((x**2)*X_dummy.func[i])
-        # Sum to find E(X^2)
-        exxval=0
-        for i in range(len(X_dummy.func)):
-            val=summation(varfunc[i],(x,X_dummy.support[i],
-                                      X_dummy.support[i+1]))
-            exxval+=val
-        # Find Var(X)=E(X^2)-E(X)^2
-        var=exxval-(EX**2)
-        var=simplify(var)
-        if cache==True:
-            RVar.add_to_cache('variance',var)
-        return simplify(var)
-
-    # If the random variable is discrete, find and return the variance
-    if X_dummy.ftype[0]=='discrete':
-        var=VarDiscrete(RVar)
+    # Use the closed form of a named distribution, if there is one
+    var=closed_form(RVar,'variance')
+    if var is not None:
+        var=cached_simplify(var)
         if cache==True:
             RVar.add_to_cache('variance',var)
-        return simplify(var)
-        #
-        # Legacy variance code ... update uses faster numpy implementation
-        #
-        # Find the mean of the random variable
-        #EX=Mean(X_dummy)
-        # Find E(X^2)
-        # Create a list of (x**2)*f(x)
-        #exxlist=[]
-        #for i in range(len(X_dummy.func)):
-        #    exxlist.append(X_dummy.func[i]*(X_dummy.support[i])**2)
-        # Sum to find E(X^2)
-        #exxval=0
-        #for i in range(len(exxlist)):
-        #    exxval+=exxlist[i]
-        # Find Var(X)=E(X^2)-E(X)^2
-        #var=exxval-(EX**2)
-        #return simplify(var)
+        return var
+
+    # Find Var(X)=E(X^2)-E(X)^2 from the (cached) moments of the
+    #   random variable. The errors of numerical moments are carried
+    #   over to the variance.
+    moments=Moments(RVar,2,mode=mode)
+    var=moments[1]-moments[0]**2
+    var=combine_values(var,[(moments[1],1),(moments[0],2*abs(moments[0]))])
+    if not isinstance(var,NumericValue):
+        var=cached_simplify(var)
+    if cache==True:
+        RVar.add_to_cache('variance',var)
+    return var
 
 def VarDiscrete(RVar):
     """
@@ -3353,8 +4737,8 @@ def VarDiscrete(RVar):
     EX=MeanDiscrete(RVar)
     # Convert the values and support of the random variable
     #   to vector form
-    support=np.matrix(RVar.support)
-    pdf=np.matrix(RVar.func)
+    support=np.matrix(X_dummy.support)
+    pdf=np.matrix(X_dummy.func)
     # Find E(X^2) by creating a vector containing the values
     #   of f(x)*x**2 and summing the result
     supportsqr=np.multiply(support,support)
@@ -3383,8 +4767,188 @@ Procedures:
     3. Minimum(RVar1,RVar2)
     4. Mixture(MixParameters,MixRVs)
     5. Product(RVar1,RVar2)
+    6. RegisterRule(operation,class1,class2,rule)
 """
-                    
+
+# Closed-form results for named distributions, keyed by the operation
+#   and the class names of the two random variables (see RegisterRule)
+algebra_rules={}
+
+def RegisterRule(operation,class1,class2,rule):
+    """
+    Procedure Name: RegisterRule
+    Purpose: Registers a closed-form result for an operation on two
+                independent random variables from named distributions.
+                The rule is consulted before the general algorithm, and
+                applies to the random variables in either order.
+    Arguments:  1. operation: 'convolution', 'product', 'maximum' or
+                    'minimum'
+                2. class1: The distribution class (or its name) of the
+                    first random variable
+                3. class2: The distribution class (or its name) of the
+                    second random variable
+                4. rule: A function of the parameter lists of the two
+                    random variables that returns the resulting random
+                    variable, or None if the rule does not apply to
+                    those parameters
+    Output:     1. None
+    """
+    operation_list=['convolution','product','maximum','minimum']
+    if operation not in operation_list:
+        err_string='operation must be convolution, product, maximum'
+        err_string+=' or minimum'
+        raise RVError(err_string)
+    names=[]
+    for cls in [class1,class2]:
+        if type(cls)!=str:
+            cls=cls.__name__
+        names.append(cls)
+    algebra_rules[(operation,names[0],names[1])]=rule
+
+def apply_rule(operation,RVar1,RVar2):
+    # Not intended for use by end user
+    """
+    Procedure Name: apply_rule
+    Purpose: Finds the closed-form result of an operation on two random
+                variables from named distributions, if a rule for their
+                distributions has been registered
+    Arguments:  1. operation: The name of the operation
+                2. RVar1: A random variable
+                3. RVar2: A random variable
+    Output:     1. The resulting random variable, or None if no rule
+                    applies
+    """
+    if len(algebra_rules)==0:
+        return None
+    param1=getattr(RVar1,'parameter',None)
+    param2=getattr(RVar2,'parameter',None)
+    if param1==None or param2==None:
+        return None
+    name1=RVar1.__class__.__name__
+    name2=RVar2.__class__.__name__
+    # The operations are symmetric, so a rule registered for the
+    #   reverse order applies with the parameters swapped
+    if (operation,name1,name2) in algebra_rules:
+        rule=algebra_rules[(operation,name1,name2)]
+        params=(param1,param2)
+    elif (operation,name2,name1) in algebra_rules:
+        rule=algebra_rules[(operation,name2,name1)]
+        params=(param2,param1)
+    else:
+        return None
+    # If the parameters do not allow the closed form (for instance a
+    #   symbolic shape parameter), fall back to the general algorithm
+    try:
+        return rule(*params)
+    except (RVError,TypeError):
+        return None
+
+def aggregate_discrete(support,probs):
+    # Not intended for use by end user
+    """
+    Procedure Name: aggregate_discrete
+    Purpose: Combines the probabilities of repeated support values in
+                a single pass using a dictionary
+    Arguments:  1. support: A list of support values
+                2. probs: A list of the corresponding probabilities
+    Output:     1. A sorted list of the distinct support values
+                2. A list of the total probability of each value
+    """
+    totals={}
+    for value,prob in zip(support,probs):
+        if value in totals:
+            totals[value]+=prob
+        else:
+            totals[value]=prob
+    keys=sorted(totals)
+    return keys,[totals[value] for value in keys]
+
+def is_integer_value(value):
+    # Not intended for use by end user
+    """
+    Procedure Name: is_integer_value
+    Purpose: Checks if a support value is an integer, either as a python,
+                numpy or sympy integer
+    Arguments:  1. value: A support value
+    Output:     1. True if the value is an integer, False otherwise
+    """
+    if isinstance(value,(int,long,np.integer)):
+        return True
+    return getattr(value,'is_Integer',False)==True
+
+def is_float_value(value):
+    # Not intended for use by end user
+    """
+    Procedure Name: is_float_value
+    Purpose: Checks if a probability is a floating point number, either
+                as a python, numpy or sympy float
+    Arguments:  1. value: A probability
+    Output:     1. True if the value is a float, False otherwise
+    """
+    if isinstance(value,(float,np.floating)):
+        return True
+    return getattr(value,'is_Float',False)==True
+
+def lattice_convolution(X1_dummy,X2_dummy):
+    # Not intended for use by end user
+    """
+    Procedure Name: lattice_convolution
+    Purpose: Convolves two discrete pdfs with floating point
+                probabilities whose supports lie on the integers. The
+                probabilities are placed on a dense integer grid and
+                convolved with numpy (using an FFT for long grids), which
+                avoids forming all of the pairwise sums.
+    Arguments:  1. X1_dummy: A discrete random variable in pdf form
+                2. X2_dummy: A discrete random variable in pdf form
+    Output:     1. The support of the convolution, or None if the
+                    random variables are not on an integer lattice
+                2. The probabilities of the convolution
+    """
+    for RVar in [X1_dummy,X2_dummy]:
+        for value in RVar.support:
+            if not is_integer_value(value):
+                return None,None
+        for prob in RVar.func:
+            if not is_float_value(prob):
+                return None,None
+    grids=[]
+    masks=[]
+    lows=[]
+    for RVar in [X1_dummy,X2_dummy]:
+        values=np.array([int(value) for value in RVar.support])
+        low=values.min()
+        # Use the grid only if it is not much longer than the
+        #   support, otherwise the pairwise sums are cheaper
+        if values.max()-low+1>64*len(values):
+            return None,None
+        grid=np.zeros(values.max()-low+1)
+        mask=np.zeros(values.max()-low+1)
+        np.add.at(grid,values-low,[float(prob) for prob in RVar.func])
+        mask[values-low]=1
+        grids.append(grid)
+        masks.append(mask)
+        lows.append(low)
+    size=len(grids[0])+len(grids[1])-1
+    if min(len(grids[0]),len(grids[1]))<=64:
+        probs=np.convolve(grids[0],grids[1])
+        attained=np.convolve(masks[0],masks[1])>0.5
+    else:
+        fftsize=1
+        while fftsize<size:
+            fftsize*=2
+        probs=np.fft.irfft(np.fft.rfft(grids[0],fftsize)*
+                           np.fft.rfft(grids[1],fftsize),fftsize)[:size]
+        attained=np.fft.irfft(np.fft.rfft(masks[0],fftsize)*
+                              np.fft.rfft(masks[1],fftsize),fftsize)[:size]
+        attained=attained>0.5
+        # Remove the round-off error of the transform
+        probs=np.clip(probs,0,None)
+    # Keep only the sums that can be attained by the two supports
+    index=np.nonzero(attained)[0]
+    support=[int(value) for value in index+lows[0]+lows[1]]
+    return support,[float(prob) for prob in probs[index]]
+
+@time_limited
 def Convolution(RVar1,RVar2):
     """
     Procedure Name: Convolution
@@ -3392,6 +4956,8 @@ def Convolution(RVar1,RVar2):
                 random variables
     Arguments:  1. RVar1: A random variable
                 2. RVar2: A random variable
+                3. timeout: The seconds allowed for the computation, after
+                    which BudgetError is raised (keyword only, optional)
     Output:     1. The convolution of RVar1 and RVar2        
     """
     # If the two random variables are not both continuous or
@@ -3401,6 +4967,24 @@ def Convolution(RVar1,RVar2):
         if (RVar1.ftype[0] not in discr) and (RVar2.ftype[0] not in discr):
             raise RVError('Both random variables must have the same type')
 
+    # Use the closed form for named distributions, if there is one
+    result=apply_rule('convolution',RVar1,RVar2)
+    if result is not None:
+        return result
+
+    # Array backed random variables are convolved with numpy
+    if isinstance(RVar1,DiscreteArrayRV) or isinstance(RVar2,DiscreteArrayRV):
+        X1_dummy=as_array_rv(RVar1)
+        X2_dummy=as_array_rv(RVar2)
+        exact=X1_dummy.exact and X2_dummy.exact
+        if exact==False:
+            convlist,funclist=lattice_convolution(X1_dummy,X2_dummy)
+            if convlist!=None:
+                return DiscreteArrayRV(funclist,convlist)
+        convlist=np.add.outer(X1_dummy.support,X2_dummy.support).ravel()
+        funclist=np.multiply.outer(X1_dummy.func,X2_dummy.func).ravel()
+        return DiscreteArrayRV(funclist,convlist,exact=exact)
+
     # Convert both random variables to their PDF form
     X1_dummy=PDF(RVar1)
     X2_dummy=PDF(RVar2)
@@ -3418,10 +5002,10 @@ def Convolution(RVar1,RVar2):
             func1=X1_dummy.func[0]
             func2=X2_dummy.func[0].subs(x,z-x)
             int_func=expand(func1*func2)
-            conv=integrate(int_func,(x,0,z),conds='none')
+            conv=cached_integrate(int_func,(x,0,z),conds='none')
             conv_final=conv.subs(z,x)
             conv=expand(conv_final)
-            conv=simplify(conv_final)
+            conv=cached_simplify(conv_final)
             return RV([conv_final],[0,oo],['continuous','pdf'])
         # Otherwise, compute the convolution using the product method
         elif RVar1.support==[0,1] and RVar2.support==[0,1]:
@@ -3429,9 +5013,9 @@ def Convolution(RVar1,RVar2):
             xx = Symbol('xx', positive = True)
             func1 = X1_dummy.func[0].subs(x,xx)
             func2 = X2_dummy.func[0].subs(x,z-xx)
-            fz1 = integrate(func1*func2, (xx,0,z))
+            fz1 = cached_integrate(func1*func2, (xx,0,z))
             fz1 = fz1.subs(z,x)
-            fz2 = integrate(func1*func2, (xx,z-1,1))
+            fz2 = cached_integrate(func1*func2, (xx,z-1,1))
             fz2 = fz2.subs(z,x)
             return RV([fz1,fz2],[0,1,2],['continuous','pdf'])
         else:
@@ -3443,7 +5027,7 @@ def Convolution(RVar1,RVar2):
             fz=Transform(temp3,gln)
             convfunc=[]
             for i in range(len(fz.func)):
-                convfunc.append(simplify(fz.func[i]))
+                convfunc.append(cached_simplify(fz.func[i]))
             return RV(convfunc,fz.support,['continuous','pdf'])
             
     # If the two random variables are discrete in functinonal form,
@@ -3469,33 +5053,23 @@ def Convolution(RVar1,RVar2):
         # Convert each random variable to its pdf form
         X1_dummy=PDF(RVar1)
         X2_dummy=PDF(RVar2)
-        # Create function and support lists for the convolution of the
-        #   two random variables
+        # If both supports lie on the integers and the probabilities
+        #   are floats, convolve the probabilities on the lattice
+        convlist,funclist=lattice_convolution(X1_dummy,X2_dummy)
+        if convlist!=None:
+            return RV(funclist,convlist,['discrete','pdf'])
+        # Otherwise, create function and support lists for the
+        #   convolution of the two random variables
         convlist=[]
         funclist=[]
         for i in range(len(X1_dummy.support)):
             for j in range(len(X2_dummy.support)):
                 convlist.append(X1_dummy.support[i]+X2_dummy.support[j])
                 funclist.append(X1_dummy.func[i]*X2_dummy.func[j])
-        # Sort the function and support lists for the convolution
-        sortlist=zip(convlist,funclist)
-        sortlist.sort()
-        convlist2=[]
-        funclist2=[]
-        for i in range(len(sortlist)):
-            convlist2.append(sortlist[i][0])
-            funclist2.append(sortlist[i][1])
-        # Remove redundant elements in the support list
-        convlist3=[]
-        funclist3=[]
-        for i in range(len(convlist2)):
-            if convlist2[i] not in convlist3:
-                convlist3.append(convlist2[i])
-                funclist3.append(funclist2[i])
-            else:
-                funclist3[convlist3.index(convlist2[i])]+=funclist2[i]
+        # Combine the probabilities of repeated support values
+        convlist,funclist=aggregate_discrete(convlist,funclist)
         # Create and return the new random variable
-        return RV(funclist3,convlist3,['discrete','pdf'])
+        return RV(funclist,convlist,['discrete','pdf'])
 
 def Maximum(*argv):
     """
@@ -3533,6 +5107,11 @@ def MaximumRV(RVar1,RVar2):
     if RVar1.ftype[0]!=RVar2.ftype[0]:
         raise RVError('The RVs must both be discrete or continuous')
 
+    # Use the closed form for named distributions, if there is one
+    result=apply_rule('maximum',RVar1,RVar2)
+    if result is not None:
+        return result
+
     # If the distributions are continuous, find and return the max
     if RVar1.ftype[0]=='continuous':
         #X1_dummy.drop_assumptions()
@@ -3544,7 +5123,8 @@ def MaximumRV(RVar1,RVar2):
             cdf1=cdf_dummy1.func[0]
             cdf2=cdf_dummy2.func[0]
             maxfunc=cdf1*cdf2
-            return PDF(RV(simplify(maxfunc),[0,oo],['continuous','cdf']))
+            return PDF(RV(cached_simplify(maxfunc),[0,oo],
+                          ['continuous','cdf']))
         # Otherwise, compute the max using the full algorithm
         # Set up the support for X
         Fx=CDF(RVar1)
@@ -3578,7 +5158,7 @@ def MaximumRV(RVar1,RVar2):
                 if value>=Fy.support[j] and value<Fy.support[j+1]:
                     currFy=Fy.func[j]   
             Fmax=currFx*currFy
-            max_func.append(simplify(Fmax))
+            max_func.append(cached_simplify(Fmax))
         return PDF(RV(max_func,max_supp2,['continuous','cdf']))
         
     # If the two random variables are discrete in functinonal form,
@@ -3681,6 +5261,11 @@ def MinimumRV(RVar1,RVar2):
     if RVar1.ftype[0]!=RVar2.ftype[0]:
         raise RVError('The RVs must both be discrete or continuous')
 
+    # Use the closed form for named distributions, if there is one
+    result=apply_rule('minimum',RVar1,RVar2)
+    if result is not None:
+        return result
+
     # If the distributions are continuous, find and return the min
     if RVar1.ftype[0]=='continuous':
         #X1_dummy.drop_assumptions()
@@ -3692,7 +5277,8 @@ def MinimumRV(RVar1,RVar2):
             sf1=sf_dummy1.func[0]
             sf2=sf_dummy2.func[0]
             minfunc=1-(sf1*sf2)
-            return PDF(RV(simplify(minfunc),[0,oo],['continuous','cdf']))
+            return PDF(RV(cached_simplify(minfunc),[0,oo],
+                          ['continuous','cdf']))
         # Otherwise, compute the min using the full algorithm
         Fx=CDF(RVar1)
         Fy=CDF(RVar2)
@@ -3727,7 +5313,7 @@ def MinimumRV(RVar1,RVar2):
                 if value>=Fy.support[j] and value<=Fy.support[j+1]:
                     currFy=Fy.func[j] 
             Fmin=1-((1-currFx)*(1-currFy))
-            min_func.append(simplify(Fmin))
+            min_func.append(cached_simplify(Fmin))
         
         # Return the random variable
         return PDF(RV(min_func,min_supp2,['continuous','cdf']))
@@ -3856,27 +5442,34 @@ def Mixture(MixParameters,MixRVs):
                         if MixSupp[i+1]<=Mixfx[j].support[k+1]:
                             buildfx=Mixfx[j].func[k]*MixParameters[j]
                             newMixfx+=buildfx
-            simplify(newMixfx)
+            cached_simplify(newMixfx)
             fxnew.append(newMixfx)
         # Return the mixture rv
         return RV(fxnew,MixSupp,['continuous','pdf'])
 
-    # If the two random variables are discrete in functinonal form,
-    #   find and return the mixture of the two random variables
-    if RVar1.ftype[0]=='Discrete':
-        for num in RVar1.support:
-            if type(num) not in [int,float]:
-                err_string='Mixture does not currently work with'
-                err_string=' RVs that have symbolic or infinite support'
-                raise RVError(err_string)
-        RVar1=Convert(RVar1)
-    if RVar2.ftype[0]=='Discrete':
-        for num in RVar1.support:
-            if type(num) not in [int,float]:
-                err_string='Mixture does not currently work with'
-                err_string=' RVs that have symbolic or infinite support'
-                raise RVError(err_string)
-        RVar2=Convert(RVar2)
+    # If the random variables are discrete in functional form,
+    #   convert them to explicit form
+    for i in range(len(Mixfx)):
+        if Mixfx[i].ftype[0]=='Discrete':
+            for num in Mixfx[i].support:
+                if type(num) not in [int,float]:
+                    err_string='Mixture does not currently work with'
+                    err_string+=' RVs that have symbolic or infinite support'
+                    raise RVError(err_string)
+            Mixfx[i]=PDF(Convert(Mixfx[i]))
+
+    # If any of the random variables are array backed, find and return
+    #   the mixture pdf with numpy
+    array_rvs=[fx for fx in Mixfx if isinstance(fx,DiscreteArrayRV)]
+    if len(array_rvs)>0:
+        Mixfx=[as_array_rv(fx) for fx in Mixfx]
+        exact=True
+        for fx in Mixfx:
+            exact=exact and fx.exact
+        MixSupp=np.concatenate([fx.support for fx in Mixfx])
+        fxnew=np.concatenate([fx.func*MixParameters[i]
+                              for i,fx in enumerate(Mixfx)])
+        return DiscreteArrayRV(fxnew,MixSupp,exact=exact)
 
     # If the distributions are discrete, find and return the
     #   mixture pdf
@@ -3886,25 +5479,13 @@ def Mixture(MixParameters,MixRVs):
         fxnew=[]
         for i in range(len(Mixfx)):
             for j in range(len(Mixfx[i].support)):
-                if Mixfx[i].support[j] not in MixSupp:
-                    MixSupp.append(Mixfx[i].support[j])
-                    fxnew.append(Mixfx[i].func[j]*MixParameters[i])
-                else:
-                    indx=MixSupp.index(Mixfx[i].support[j])
-                    val=Mixfx[i].func[j]*MixParameters[i]
-                    fxnew[indx]+=val
-        # Sort the values
-        zip_list=zip(MixSupp,fxnew)
-        zip_list.sort()
-        fxnew=[]
-        MixSupp=[]
-        for i in range(len(zip_list)):
-            fxnew.append(zip_list[i][1])
-            MixSupp.append(zip_list[i][0])
+                MixSupp.append(Mixfx[i].support[j])
+                fxnew.append(Mixfx[i].func[j]*MixParameters[i])
+        # Combine the probabilities of repeated support values
+        MixSupp,fxnew=aggregate_discrete(MixSupp,fxnew)
         return RV(fxnew,MixSupp,['discrete','pdf'])
-        
-
 
+@time_limited
 def Product(RVar1,RVar2):
     """
     Procedure Name: Product
@@ -3912,8 +5493,15 @@ def Product(RVar1,RVar2):
                 random variables
     Arguments:  1. RVar1: A random variable
                 2. RVar2: A random variable
+                3. timeout: The seconds allowed for the computation, after
+                    which BudgetError is raised (keyword only, optional)
     Output:     1. The product of RVar1 and RVar2        
     """
+    # Use the closed form for named distributions, if there is one
+    result=apply_rule('product',RVar1,RVar2)
+    if result is not None:
+        return result
+
     # If the random variable is continuous, find and return the
     #   product of the two random variables
     if RVar1.ftype[0]=='continuous':
@@ -3964,6 +5552,8 @@ def Product(RVar1,RVar2):
         for i in range(len(X_dummy.func)):
             # Loop through each piecewise segment of Y
             for j in range(len(Y_dummy.func)):
+                # Stop here if the time budget has run out
+                checkpoint()
                 # Define the corner of the rectangular region
                 a=X_dummy.support[i]
                 b=X_dummy.support[i+1]
@@ -3978,13 +5568,13 @@ def Product(RVar1,RVar2):
                     else:
                         gj=Y_dummy.func[j]
                     fi=X_dummy.func[i]
-                    pv=integrate(fi*gj*(1/x),(x,a,b))
+                    pv=cached_integrate(fi*gj*(1/x),(x,a,b))
                     if d<oo:
-                        qv=integrate(fi*gj*(1/x),(x,v/d,b))
+                        qv=cached_integrate(fi*gj*(1/x),(x,v/d,b))
                     if c>0:
-                        rv=integrate(fi*gj*(1/x),(x,a,v/c))
+                        rv=cached_integrate(fi*gj*(1/x),(x,a,v/c))
                     if c>0 and d<oo and a*d<b*c:
-                        sv=integrate(fi*gj*(1/x),(x,v/d,v/c))
+                        sv=cached_integrate(fi*gj*(1/x),(x,v/d,v/c))
                     # 1st Qd, Scenario 1
                     if c==0 and d==oo:
                         for k in range(len(vfunc)):
@@ -4040,13 +5630,13 @@ def Product(RVar1,RVar2):
                     else:
                         gj=Y_dummy.func[j]
                     fi=X_dummy.func[i]
-                    pv=-integrate(fi*gj*(1/x),(x,a,b))
+                    pv=-cached_integrate(fi*gj*(1/x),(x,a,b))
                     if d<0:
-                        qv=-integrate(fi*gj*(1/x),(x,(v/d),b))
+                        qv=-cached_integrate(fi*gj*(1/x),(x,(v/d),b))
                     if c>-oo:
-                        rv=-integrate(fi*gj*(1/x),(x,a,(v/c)))
+                        rv=-cached_integrate(fi*gj*(1/x),(x,a,(v/c)))
                     if c>-oo and d<0:
-                        sv=-integrate(fi*gj*(1/x),(x,(v/d),(v/c)))
+                        sv=-cached_integrate(fi*gj*(1/x),(x,(v/d),(v/c)))
                     # 2nd Qd, Scenario 1
                     if c==-oo and d==0:
                         for k in range(len(vfunc)):
@@ -4102,13 +5692,13 @@ def Product(RVar1,RVar2):
                     else:
                         gj=Y_dummy.func[j]
                     fi=X_dummy.func[i]
-                    pv=-integrate(fi*gj*(1/x),(x,a,b))
+                    pv=-cached_integrate(fi*gj*(1/x),(x,a,b))
                     if d<oo:
-                        qv=-integrate(fi*gj*(1/x),(x,a,(v/d)))
+                        qv=-cached_integrate(fi*gj*(1/x),(x,a,(v/d)))
                     if c>0:
-                        rv=-integrate(fi*gj*(1/x),(x,(v/b),c))
+                        rv=-cached_integrate(fi*gj*(1/x),(x,(v/b),c))
                     if c>0 and d<oo:
-                        sv=-integrate(fi*gj*(1/x),(x,(v/c),(v/d)))
+                        sv=-cached_integrate(fi*gj*(1/x),(x,(v/c),(v/d)))
                     # 3rd Qd, Scenario 1
                     if c==0 and d==oo:
                         for k in range(len(vfunc)):
@@ -4164,13 +5754,13 @@ def Product(RVar1,RVar2):
                     else:
                         gj=Y_dummy.func[j]
                     fi=X_dummy.func[i]
-                    pv=integrate(fi*gj*(1/x),(x,a,b))
+                    pv=cached_integrate(fi*gj*(1/x),(x,a,b))
                     if d<0:
-                        qv=integrate(fi*gj*(1/x),(x,a,(v/d)))
+                        qv=cached_integrate(fi*gj*(1/x),(x,a,(v/d)))
                     if c>-oo:
-                        rv=integrate(fi*gj*(1/x),(x,(v/c),b))
+                        rv=cached_integrate(fi*gj*(1/x),(x,(v/c),b))
                     if c>-oo and d<0:
-                        sv=integrate(fi*gj*(1/x),(x,(v/c),(v/d)))
+                        sv=cached_integrate(fi*gj*(1/x),(x,(v/c),(v/d)))
                     # 4th Qd, Scenario 1
                     if c==oo and d==0:
                         for k in range(len(vfunc)):
@@ -4220,7 +5810,7 @@ def Product(RVar1,RVar2):
         vfunc_final=[]
         for i in range(len(vfunc)):
             if type(vfunc[i]) not in [int,float]:
-                vfunc_final.append(simplify(vfunc[i]).subs(v,x))
+                vfunc_final.append(cached_simplify(vfunc[i]).subs(v,x))
             else:
                 vfunc_final.append(vfunc[i])
         return RV(vfunc_final,vsupp,['continuous','pdf'])
@@ -4245,91 +5835,61 @@ def Product(RVar1,RVar2):
     # If the distributions are discrete, find and return the product
     #   of the two random variables.
     if RVar1.ftype[0]=='discrete':
-        # Convert each random variable to its pdf form
-        X1_dummy=PDF(RVar1)
-        X2_dummy=PDF(RVar2)
-        # Create function and support lists for the product of the
-        #   two random variables
-        prodlist=[]
-        funclist=[]
-        for i in range(len(X1_dummy.support)):
-            for j in range(len(X2_dummy.support)):
-                prodlist.append(X1_dummy.support[i]*X2_dummy.support[j])
-                funclist.append(X1_dummy.func[i]*X2_dummy.func[j])
-        # Sort the function and support lists for the convolution
-        sortlist=zip(prodlist,funclist)
-        sortlist.sort()
-        prodlist2=[]
-        funclist2=[]
-        for i in range(len(sortlist)):
-            prodlist2.append(sortlist[i][0])
-            funclist2.append(sortlist[i][1])
-        # Remove redundant elements in the support list
-        prodlist3=[]
-        funclist3=[]
-        for i in range(len(prodlist2)):
-            if prodlist2[i] not in prodlist3:
-                prodlist3.append(prodlist2[i])
-                funclist3.append(funclist2[i])
-            else:
-                funclist3[prodlist3.index(prodlist2[i])]+=funclist2[i]
-        # Create and return the new random variable
-        return RV(funclist3,prodlist3,['discrete','pdf'])
+        return ProductDiscrete(RVar1,RVar2)
 
-def ProductDiscrete(RVar1,RVar2):
+def ProductDiscrete(RVar1,RVar2,numeric=False):
     """
     Procedure Name: ProductDiscrete
     Purpose: Compute the product of two independent
                 discrete random variables
     Arguments:  1. RVar1: A random variable
                 2. RVar2: A random variable
+                3. numeric: A binary variable. If True, the support and
+                    the probabilities are computed as floats with numpy,
+                    which is much faster for large supports
     Output:     1. The product of RVar1 and RVar2        
     """
     # Ensure that both random variables are discrete
     if RVar1.ftype[0]!='discrete' or RVar2.ftype[0]!='discrete':
         raise RVError('both random variables must be discrete')
+    # Array backed random variables are multiplied with numpy
+    if isinstance(RVar1,DiscreteArrayRV) or isinstance(RVar2,DiscreteArrayRV):
+        X_dummy1=as_array_rv(RVar1)
+        X_dummy2=as_array_rv(RVar2)
+        exact=X_dummy1.exact and X_dummy2.exact and numeric==False
+        prodlist=np.multiply.outer(X_dummy1.support,X_dummy2.support)
+        funclist=np.multiply.outer(X_dummy1.func,X_dummy2.func)
+        return DiscreteArrayRV(funclist.ravel(),prodlist.ravel(),
+                               exact=exact)
     # Convert both random variables to pdf form
     X_dummy1=PDF(RVar1)
     X_dummy2=PDF(RVar2)
-    # Convert the support and the value of each random variable
-    #   into a numpy matrix
-    support1=np.matrix(X_dummy1.support)
-    support2=np.matrix(X_dummy2.support)
-    pdf1=np.matrix(X_dummy1.func)
-    pdf2=np.matrix(X_dummy2.func)
-    # Find all possible values of support1*support2 and val1*val2
-    #   by computing (X1)'*X2, flatten into a row vector
-    prodsupport=support1.T*support2
-    prodsupport=prodsupport.flatten()
-    prodpdf=pdf1.T*pdf2
-    prodpdf=prodpdf.flatten()
-    #
-    # Stack the support vector and the value vector into a matrix
-    #prodmatrix=np.vstack([prodsupport,prodpdf]).T
-    #
-    #
-    # Convert the resulting vectors into lists
-    supportlist=prodsupport.tolist()[0]
-    pdflist=prodpdf.tolist()[0]
-    # Sort the function and support lists for the product
-    sortlist=zip(supportlist,pdflist)
-    sortlist.sort()
-    prodlist2=[]
-    funclist2=[]
-    for i in range(len(sortlist)):
-        prodlist2.append(sortlist[i][0])
-        funclist2.append(sortlist[i][1])
-    # Remove redundant elements in the support list
-    prodlist3=[]
-    funclist3=[]
-    for i in range(len(prodlist2)):
-        if prodlist2[i] not in prodlist3:
-            prodlist3.append(prodlist2[i])
-            funclist3.append(funclist2[i])
-        else:
-            funclist3[prodlist3.index(prodlist2[i])]+=funclist2[i]
+    # In numeric mode, find all of the products with numpy outer
+    #   products, then combine repeated support values by finding the
+    #   index of each product in the distinct values
+    if numeric==True:
+        support1=np.array(X_dummy1.support,dtype=float)
+        support2=np.array(X_dummy2.support,dtype=float)
+        pdf1=np.array(X_dummy1.func,dtype=float)
+        pdf2=np.array(X_dummy2.func,dtype=float)
+        prodsupport=np.outer(support1,support2).ravel()
+        prodpdf=np.outer(pdf1,pdf2).ravel()
+        supportlist,index=np.unique(prodsupport,return_inverse=True)
+        pdflist=np.bincount(index,weights=prodpdf)
+        return RV(pdflist.tolist(),supportlist.tolist(),
+                  ['discrete','pdf'])
+    # Otherwise, find all possible values of support1*support2 and
+    #   val1*val2 exactly
+    supportlist=[]
+    pdflist=[]
+    for i in range(len(X_dummy1.support)):
+        for j in range(len(X_dummy2.support)):
+            supportlist.append(X_dummy1.support[i]*X_dummy2.support[j])
+            pdflist.append(X_dummy1.func[i]*X_dummy2.func[j])
+    # Combine the probabilities of repeated support values
+    prodlist,funclist=aggregate_discrete(supportlist,pdflist)
     # Create and return the new random variable
-    return RV(funclist3,prodlist3,['discrete','pdf'])
+    return RV(funclist,prodlist,['discrete','pdf'])
   
 """
 Utilities
@@ -4337,13 +5897,14 @@ Utilities
 Procedures:
     1. Histogram(Sample,bins)
     2. LoadRV(filename)
-    3. PlotClear()
-    4. PlotDist(RVar,suplist)
-    5. PlotDisplay(plot_list,suplist)
-    6. PlotEmpCDF(data)
-    7. PlotLimits(limits, axis)
-    8. PPPlot(RVar,Sample)
-    9. QQPlot(RVar,Sample)
+    3. ParallelVariates(RVar,n,workers)
+    4. PlotClear()
+    5. PlotDist(RVar,suplist)
+    6. PlotDisplay(plot_list,suplist)
+    7. PlotEmpCDF(data)
+    8. PlotLimits(limits, axis)
+    9. PPPlot(RVar,Sample)
+    10. QQPlot(RVar,Sample)
 """
 
 def Histogram(Sample,Bins=None):
@@ -4387,6 +5948,110 @@ def LoadRV(filename):
         print 'WARNING: Object loaded is not a random variable'
     return RVar
 
+# Shared memory array that the variate workers write into
+shared_variates=None
+
+def init_variate_worker(buffer):
+    # Not intended for use by end user
+    """
+    Procedure Name: init_variate_worker
+    Purpose: Gives a variate worker process access to the shared memory
+                array that holds the results
+    Arguments:  1. buffer: A shared memory array of doubles, or None
+    Output:     1. None
+    """
+    global shared_variates
+    shared_variates=buffer
+
+def variate_chunk(task):
+    # Not intended for use by end user
+    """
+    Procedure Name: variate_chunk
+    Purpose: Generates one chunk of variates in a worker process
+    Arguments:  1. task: A tuple holding the random variable, the offset
+                    and size of the chunk, the random stream for the
+                    chunk and the keyword arguments for variate
+    Output:     1. The variates, or None if they were written to the
+                    shared memory array
+    """
+    RVar,start,size,stream,kwargs=task
+    varlist=RVar.variate(n=size,stream=stream,**kwargs)
+    if shared_variates==None:
+        return varlist
+    results=np.frombuffer(shared_variates,dtype=float)
+    results[start:start+size]=varlist
+    return None
+
+def ParallelVariates(RVar,n,workers=None,stream=None,shared=False,
+                     sort=True,**kwargs):
+    """
+    Procedure Name: ParallelVariates
+    Purpose: Generates random variates in a pool of worker processes.
+                Each worker generates a chunk of the variates with the
+                variate method of the random variable, from its own
+                substream of the random stream, so the result is
+                reproducible for a given seed and number of workers, and
+                each chunk is the serial draw from its substream.
+    Arguments:  1. RVar: A random variable
+                2. n: The number of variates
+                3. workers: The number of worker processes (default is
+                    the number of processors)
+                4. stream: The random stream (or seed) the substreams are
+                    spawned from (default is the default stream)
+                5. shared: A binary variable. If True, the workers write
+                    their variates into a shared memory array instead of
+                    sending them back to the calling process
+                6. sort: A binary variable. If True (default), the
+                    variates are returned in increasing order
+                7. kwargs: Keyword arguments passed to variate (s,
+                    method, sensitivity)
+    Output:     1. A numpy array of n random variates
+    """
+    if workers==None:
+        workers=multiprocessing.cpu_count()
+    if workers<1:
+        raise RVError('the number of workers must be positive')
+
+    # Compile the functional forms used by variate once in the calling
+    #   process. The worker processes are forked after this, so they
+    #   share the compiled forms in the process-wide cache. Distributions
+    #   with their own variate method need no preparation.
+    if RVar.__class__.variate==RV.variate:
+        if RVar.ftype[0]!='continuous':
+            RVar.compile('idf')
+        elif kwargs.get('method','newton-raphson')=='inverse':
+            RVar.compile('idf')
+        elif RVar.cache==None or 'sampler' not in RVar.cache:
+            RVar.compile('cdf')
+            RVar.compile('pdf')
+
+    sizes=[len(chunk) for chunk in np.array_split(np.arange(n),workers)]
+    streams=get_stream(stream).spawn(workers)
+    # The chunks are sorted once after they are combined
+    kwargs['sort']=False
+    tasks=[]
+    start=0
+    for i in range(workers):
+        tasks.append((RVar,start,sizes[i],streams[i],kwargs))
+        start+=sizes[i]
+
+    if shared==True:
+        buffer=multiprocessing.sharedctypes.RawArray('d',n)
+    else:
+        buffer=None
+    pool=multiprocessing.Pool(workers,init_variate_worker,(buffer,))
+    try:
+        chunks=pool.map(variate_chunk,tasks)
+    finally:
+        pool.close()
+        pool.join()
+    if shared==True:
+        varlist=np.frombuffer(buffer,dtype=float)
+    else:
+        varlist=np.concatenate(chunks)
+    if sort==True:
+        varlist.sort()
+    return varlist
 
 def PlotClear():
     """
@@ -4608,11 +6273,8 @@ def PPPlot(RVar,Sample):
     fxstar=BootstrapRV(Sample)
     FXstar=CDF(fxstar)
 
-    FittedCDF=[]
-    ObservedCDF=[]
-    for i in range(len(plist)):
-        FittedCDF.append(CDF(FX,Sample[i]))
-        ObservedCDF.append(CDF(FXstar,Sample[i]))
+    FittedCDF=CDF(FX,Sample)
+    ObservedCDF=CDF(FXstar,Sample)
 
     # Plot the results  
     plt.ion()
@@ -4640,10 +6302,8 @@ def QQPlot(RVar,Sample):
     for i in range(1,n+1):
         q=(i-(1/2))/n
         qlist.append(q)
-    # Create 'fitted' list
-    Fitted=[]
-    for i in range(len(qlist)):
-        Fitted.append(RVar.variate(s=qlist[i])[0])
+    # Create 'fitted' list by inverting the cdf at every quantile at once
+    Fitted=numeric_inverse(RVar,qlist)
 
     # Plot the results
     plt.ion()
@@ -0,0 +1,416 @@
+"""
+Sampling Module
+
+Defines the numerical machinery used to generate random variates from
+    APPLPy random variables
+
+Classes:
+    1. InverseTable(RVar,tol)
+    2. RandomStream(seed)
+
+Procedures:
+    1. numeric_inverse(RVar,probs,sensitivity)
+    2. SetSeed(seed)
+"""
+
+from __future__ import division
+import binascii
+import hashlib
+import os
+import numpy as np
+
+"""
+    A Probability Progamming Language (APPL) -- Python Edition
+    Copyright (C) 2001,2002,2008,2010,2014 Andrew Glen, Larry
+    Leemis, Diane Evans, Matthew Robinson
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>
+"""
+
+class RandomStream:
+    """
+    RandomStream Class
+    Defines a reproducible stream of random numbers. A stream wraps a
+        numpy RandomState seeded from an entropy value and a spawn key,
+        and can spawn statistically independent substreams for parallel
+        jobs.
+    """
+    def __init__(self,seed=None,spawn_key=()):
+        """
+        Procedure Name: __init__
+        Purpose: Creates a random stream
+        Arguments:  1. seed: An integer or a sequence of integers
+                        (default is fresh entropy from the operating
+                        system)
+                    2. spawn_key: The position of the stream in the tree
+                        of streams spawned from the seed (default is the
+                        root stream)
+        Output:     1. A random stream
+        """
+        self.reseed(seed,spawn_key)
+
+    def __repr__(self):
+        return 'RandomStream(entropy=%s,spawn_key=%s)'%(self.entropy,
+                                                         self.spawn_key)
+
+    def random(self,n=1):
+        """
+        Procedure Name: random
+        Purpose: Draws uniform random numbers on [0,1)
+        Arguments:  1. n: the number of random numbers
+        Output:     1. A numpy array of n uniform random numbers
+        """
+        return self.generator.random_sample(n)
+
+    def reseed(self,seed=None,spawn_key=()):
+        """
+        Procedure Name: reseed
+        Purpose: Restarts the stream from a new seed
+        Arguments:  1. seed: An integer or a sequence of integers
+                        (default is fresh entropy)
+                    2. spawn_key: The position of the stream in the tree
+                        of spawned streams (default is the root stream)
+        Output:     1. None
+        """
+        if seed is None:
+            seed=int(binascii.hexlify(os.urandom(16)),16)
+        self.entropy=seed
+        self.spawn_key=tuple(spawn_key)
+        self.children=0
+        self.generator=np.random.RandomState(seed_words(seed,
+                                                        self.spawn_key))
+
+    def spawn(self,n=1):
+        """
+        Procedure Name: spawn
+        Purpose: Creates independent substreams of the stream. Spawning
+                    from streams with the same seed always produces the
+                    same substreams.
+        Arguments:  1. n: the number of substreams
+        Output:     1. A list of n random streams
+        """
+        streams=[RandomStream(self.entropy,self.spawn_key+(self.children+i,))
+                 for i in range(n)]
+        self.children+=n
+        return streams
+
+def seed_words(entropy,spawn_key):
+    # Not intended for use by end user
+    """
+    Procedure Name: seed_words
+    Purpose: Mixes an entropy value and a spawn key into the seed of a
+                numpy RandomState by hashing them, so that streams with
+                different spawn keys are seeded independently
+    Arguments:  1. entropy: An integer or a sequence of integers
+                2. spawn_key: A tuple of integers
+    Output:     1. A numpy array of eight 32 bit seed words
+    """
+    if isinstance(entropy,(list,tuple,np.ndarray)):
+        values=[int(value) for value in entropy]
+    else:
+        values=[int(entropy)]
+    text='%s/%s'%(','.join([str(value) for value in values]),
+                  ','.join([str(int(value)) for value in spawn_key]))
+    digest=hashlib.sha256(text.encode('ascii')).digest()
+    return np.frombuffer(digest,dtype='<u4').astype(np.uint32)
+
+# The stream used by the APPLPy samplers when no stream is given. It is
+#   created on first use, so importing APPLPy does not seed a generator.
+default_stream=None
+
+def get_stream(stream=None):
+    # Not intended for use by end user
+    """
+    Procedure Name: get_stream
+    Purpose: Resolves the stream argument of the variate procedures
+    Arguments:  1. stream: A random stream, a seed, or None
+    Output:     1. The given stream, a new stream started from the given
+                    seed, or the default stream
+    """
+    global default_stream
+    if stream is None:
+        if default_stream is None:
+            default_stream=RandomStream()
+        return default_stream
+    if isinstance(stream,RandomStream):
+        return stream
+    return RandomStream(stream)
+
+def SetSeed(seed=None):
+    """
+    Procedure Name: SetSeed
+    Purpose: Restarts the default random stream from a seed, so that
+                subsequent calls to variate are reproducible
+    Arguments:  1. seed: An integer or a sequence of integers
+    Output:     1. None
+    """
+    global default_stream
+    default_stream=RandomStream(seed)
+
+def bracket(cdf,probs,lower,upper,anchor):
+    # Not intended for use by end user
+    """
+    Procedure Name: bracket
+    Purpose: Finds, for each probability, an interval of the support
+                whose end points have cdf values on either side of the
+                probability. Infinite end points of the support are
+                replaced by moving away from an anchor point in steps
+                that double in size.
+    Arguments:  1. cdf: The compiled cdf of the random variable
+                2. probs: An array of probabilities in (0,1)
+                3. lower: The lower end point of the support
+                4. upper: The upper end point of the support
+                5. anchor: A finite point in the support
+    Output:     1. An array of lower end points
+                2. An array of upper end points
+    Raises RVError if the cdf does not cross a probability within the
+        floating point range
+    """
+    from .rv import RVError
+    lw=np.zeros(probs.shape)+lower
+    up=np.zeros(probs.shape)+upper
+    if np.isinf(lower):
+        lw[:]=anchor-1
+        for i in range(1100):
+            wide=~(cdf(lw)<=probs)
+            if not wide.any():
+                break
+            with np.errstate(over='ignore'):
+                lw[wide]=anchor-2*(anchor-lw[wide])
+        else:
+            raise RVError('the cdf does not fall below %s on the support'%
+                          probs[wide].min())
+    if np.isinf(upper):
+        up[:]=anchor+1
+        for i in range(1100):
+            short=~(cdf(up)>=probs)
+            if not short.any():
+                break
+            with np.errstate(over='ignore'):
+                up[short]=anchor+2*(up[short]-anchor)
+        else:
+            raise RVError('the cdf does not reach %s on the support'%
+                          probs[short].max())
+    return lw,up
+
+def numeric_inverse(RVar,probs,sensitivity=None,maxiter=100):
+    # Not intended for use by end user
+    """
+    Procedure Name: numeric_inverse
+    Purpose: Inverts the cdf of a random variable numerically at an
+                array of probabilities. The cdf and pdf are compiled
+                once, and a safeguarded Newton-Raphson iteration is run
+                on all probabilities simultaneously. Any Newton step that
+                leaves the current bracket is replaced by a bisection
+                step, so the iteration honors piecewise supports, flat
+                segments and infinite tails.
+    Arguments:  1. RVar: A fully specified random variable
+                2. probs: A number, list or array of probabilities
+                3. sensitivity: The absolute convergence tolerance for
+                    successive iterates (default is a relative tolerance
+                    of 1e-12)
+                4. maxiter: The maximum number of iterations
+    Output:     1. A numpy array of the quantiles of the random variable
+    """
+    probs=np.asarray(probs,dtype=float)
+    shape=probs.shape
+    probs=probs.ravel()
+    # Discrete random variables are inverted exactly by their compiled
+    #   idf, which searches the cumulative probabilities
+    if RVar.ftype[0] in ['discrete','Discrete']:
+        return RVar.compile('idf')(probs).reshape(shape)
+
+    cdf=RVar.compile('cdf')
+    pdf=RVar.compile('pdf')
+    support=[float(value) for value in RVar.support]
+    lower=support[0]
+    upper=support[-1]
+    finite=[value for value in support if np.isfinite(value)]
+    if len(finite)>0:
+        anchor=finite[0]
+    else:
+        anchor=0.0
+
+    result=np.empty(probs.shape)
+    result[probs<=0]=lower
+    result[probs>=1]=upper
+    result[np.isnan(probs)]=np.nan
+    active=np.where((probs>0)&(probs<1))[0]
+    u=probs[active]
+    lw,up=bracket(cdf,u,lower,upper,anchor)
+    guess=(lw+up)/2
+    for i in range(maxiter):
+        if len(active)==0:
+            break
+        error=cdf(guess)-u
+        # Shrink the bracket around the root
+        left=error<0
+        lw=np.where(left,guess,lw)
+        up=np.where(left,up,guess)
+        with np.errstate(all='ignore'):
+            step=guess-error/pdf(guess)
+        # Fall back on bisection when the Newton step fails or leaves
+        #   the bracket
+        bad=(~np.isfinite(step))|(step<=lw)|(step>=up)
+        step=np.where(bad,(lw+up)/2,step)
+        if sensitivity==None:
+            tolerance=1e-12*(1+np.abs(step))
+        else:
+            tolerance=sensitivity
+        done=(np.abs(step-guess)<=tolerance)|(error==0)
+        result[active[done]]=np.where(error==0,guess,step)[done]
+        keep=~done
+        active=active[keep]
+        u=u[keep]
+        lw=lw[keep]
+        up=up[keep]
+        guess=step[keep]
+    # Variates that failed to converge are given their last iterate
+    result[active]=guess
+    return result.reshape(shape)
+
+class InverseTable:
+    """
+    InverseTable Class
+    Defines a monotone piecewise cubic Hermite interpolation of the
+        inverse cdf of a continuous random variable. The table is
+        refined until the interpolated inverse is accurate to within
+        tol in the probability scale, after which variates are
+        generated by table lookup.
+    """
+    def __init__(self,RVar,tol=1e-10,maxpoints=100000):
+        """
+        Procedure Name: __init__
+        Purpose: Builds the interpolation table for the inverse cdf
+        Arguments:  1. RVar: A fully specified continuous random variable
+                    2. tol: The maximum error |F(X(u))-u| of the
+                        interpolated inverse (default is 1e-10)
+                    3. maxpoints: The maximum number of table nodes
+        Output:     1. An interpolation table for the inverse cdf
+        """
+        self.tol=tol
+        cdf=RVar.compile('cdf')
+        pdf=RVar.compile('pdf')
+        support=[float(value) for value in RVar.support]
+        # Probabilities beyond the table are left to numeric_inverse
+        cut=min(tol,1e-10)
+        # Start from evenly spaced quantiles, the end points of the
+        #   support (when finite) and the break points between segments
+        nodes=[numeric_inverse(RVar,np.linspace(cut,1-cut,33))]
+        nodes.append(np.array([value for value in support
+                               if np.isfinite(value)]))
+        X=np.unique(np.concatenate(nodes))
+        U=cdf(X)
+        for i in range(64):
+            X,U=self.prune(X,U)
+            slopes=self.slopes(X,U,pdf)
+            # Test the interpolant at the midpoint of each interval
+            umid=(U[:-1]+U[1:])/2
+            xmid=self.interpolate(umid,X,U,slopes)
+            error=np.abs(cdf(xmid)-umid)
+            fail=np.where(error>tol)[0]
+            if len(fail)==0 or len(X)+len(fail)>maxpoints:
+                break
+            # Split the failing intervals in half
+            Xnew=(X[fail]+X[fail+1])/2
+            X=np.concatenate([X,Xnew])
+            U=np.concatenate([U,cdf(Xnew)])
+            order=np.argsort(X)
+            X=X[order]
+            U=U[order]
+        else:
+            # The last refinement added nodes after the slopes were
+            #   computed, so prune and compute the slopes again
+            X,U=self.prune(X,U)
+            slopes=self.slopes(X,U,pdf)
+        self.X=X
+        self.U=U
+        self.M=slopes
+
+    def prune(self,X,U):
+        # Not intended for use by end user
+        """
+        Procedure Name: prune
+        Purpose: Removes nodes that do not increase the cdf, so that the
+                    table is strictly increasing in probability
+        Arguments:  1. X: The sorted nodes
+                    2. U: The cdf at the nodes
+        Output:     1. The remaining nodes
+                    2. The cdf at the remaining nodes
+        """
+        keep=np.concatenate([[True],np.diff(U)>0])
+        return X[keep],U[keep]
+
+    def slopes(self,X,U,pdf):
+        # Not intended for use by end user
+        """
+        Procedure Name: slopes
+        Purpose: Computes the derivative of the inverse cdf (1/pdf) at
+                    each node, replacing unusable values with secant
+                    estimates and limiting them so that the interpolant
+                    is monotone (Fritsch-Carlson)
+        Arguments:  1. X: The sorted nodes
+                    2. U: The cdf at the nodes
+                    3. pdf: The compiled pdf of the random variable
+        Output:     1. An array of slopes
+        """
+        delta=np.diff(X)/np.diff(U)
+        secant=np.concatenate([[delta[0]],(delta[:-1]+delta[1:])/2,
+                               [delta[-1]]])
+        with np.errstate(all='ignore'):
+            M=1/pdf(X)
+        M=np.where(np.isfinite(M)&(M>=0),M,secant)
+        M[:-1]=np.minimum(M[:-1],3*delta)
+        M[1:]=np.minimum(M[1:],3*delta)
+        return M
+
+    def interpolate(self,probs,X=None,U=None,M=None):
+        # Not intended for use by end user
+        """
+        Procedure Name: interpolate
+        Purpose: Evaluates the cubic Hermite interpolant of the inverse
+                    cdf at an array of probabilities within the table
+        Arguments:  1. probs: An array of probabilities
+                    2. X,U,M: The nodes, probabilities and slopes of the
+                        table (default is the finished table)
+        Output:     1. An array of interpolated quantiles
+        """
+        if X is None:
+            X,U,M=self.X,self.U,self.M
+        k=np.searchsorted(U,probs,side='right')-1
+        k=np.clip(k,0,len(U)-2)
+        h=U[k+1]-U[k]
+        s=(probs-U[k])/h
+        h00=(1+2*s)*(1-s)**2
+        h10=s*(1-s)**2
+        h01=s**2*(3-2*s)
+        h11=s**2*(s-1)
+        return h00*X[k]+h10*h*M[k]+h01*X[k+1]+h11*h*M[k+1]
+
+    def inverse(self,RVar,probs):
+        """
+        Procedure Name: inverse
+        Purpose: Computes quantiles of the random variable by table
+                    lookup. Probabilities beyond the ends of the table
+                    are inverted with numeric_inverse.
+        Arguments:  1. RVar: The random variable the table was built for
+                    2. probs: A number, list or array of probabilities
+        Output:     1. A numpy array of quantiles
+        """
+        probs=np.asarray(probs,dtype=float)
+        result=self.interpolate(probs.ravel()).reshape(probs.shape)
+        tails=(probs<self.U[0])|(probs>self.U[-1])|np.isnan(probs)
+        if tails.any():
+            result[tails]=numeric_inverse(RVar,probs[tails])
+        return result
@@ -18,6 +18,7 @@ from sympy import (Symbol, symbols, oo, integrate, summation, diff,
                    solve, nan,Add, Mul, Integer, function,
                    binomial, pprint, nsolve,log)
 from random import random
+import numpy as np
 from .rv import (RV, RVError, CDF, PDF, BootstrapRV,
                  ExpectedValue,Mean,Variance)
 x,y,z,t=symbols('x y z t')
@@ -53,21 +54,19 @@ def KSTest(RVar,data):
     Output:     1. The Kolmogorov-Smirnoff test statistics
     """
     # Create an empirical CDF from the data sample
-    EmpCDF=CDF(BootstrapRV(data))
+    EmpCDF=CDF(BootstrapRV(data,numeric=True))
     m=len(EmpCDF.support)
-    # Compute fitted CDF values
-    FX=CDF(RVar)
-    FittedCDFValue=[]
-    for i in EmpCDF.support:
-        FittedCDFValue.append(CDF(FX,i).evalf())
+    # Compute fitted CDF values at every point of the sample at once
+    FittedCDFValue=CDF(RVar,EmpCDF.support)
+    EmpCDFValue=np.array([float(value) for value in EmpCDF.func])
     # Compute the KS test statistic
     KS=0
-    for i in range(m-1):
-        Dpos=abs(EmpCDF.func[i+1]-FittedCDFValue[i]).evalf()
-        Dneg=abs(FittedCDFValue[i]-EmpCDF.func[i]).evalf()
-        KS=max(max(KS,Dpos),Dneg)
-    KS=max(KS,abs(FittedCDFValue[m-1]).evalf())
-    return KS
+    if m>1:
+        Dpos=np.abs(EmpCDFValue[1:]-FittedCDFValue[:-1])
+        Dneg=np.abs(FittedCDFValue[:-1]-EmpCDFValue[:-1])
+        KS=max(Dpos.max(),Dneg.max())
+    KS=max(KS,abs(FittedCDFValue[m-1]))
+    return float(KS)
         
            
 def MOM(RVar,data,parameters,guess=None,numeric=False):